@@ -0,0 +1,220 @@
+import sys
+import threading
+import time
+import types
+from collections import OrderedDict, deque
+from typing import Any, Callable, Hashable
+
+# Objects shared by the whole program rather than owned by a cached value.
+_SHARED = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+class LRUCache:
+    """
+    A thread-safe least-recently-used cache with a memory budget and a time-to-live.
+
+    Every entry is charged a size in bytes. When the total goes over `max_bytes` the
+    least recently used entries are evicted, and entries older than `ttl` seconds are
+    dropped on access.
+    """
+
+    def __init__(self, max_bytes: int = 512 * 1024 * 1024, ttl: float | None = 1800):
+        """
+        Args:
+        - max_bytes (int): The memory budget of the cache in bytes.
+        - ttl (float | None): Seconds an entry stays valid. None keeps entries until evicted.
+        """
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self._loading = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._lookup(key) is not None
+
+    def _lookup(self, key: Hashable):
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        value, size, stored_at = entry
+        if self.ttl is not None and time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            self._bytes -= size
+            self.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _evict(self) -> None:
+        while self._bytes > self.max_bytes and self._entries:
+            _, (_, size, _) = self._entries.popitem(last=False)
+            self._bytes -= size
+            self.evictions += 1
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the cached value for `key`, or `default` if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._lookup(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key: Hashable, value: Any, size: int = 0) -> None:
+        """
+        Store `value` under `key`, charging `size` bytes against the budget.
+
+        Values larger than the whole budget are not stored.
+        """
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, time.monotonic())
+            self._bytes += size
+            self._evict()
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], Any], size: int | Callable[[Any], int] = 0) -> Any:
+        """
+        Return the cached value for `key`, calling `loader` on a miss.
+
+        Concurrent callers asking for the same key wait for a single load instead of
+        each running `loader`. A loader result of None is returned but not cached.
+
+        Args:
+        - key (Hashable): The cache key.
+        - loader (callable): Function that produces the value.
+        - size (int | callable): The size in bytes to charge for the loaded value, or a
+          function computing it from the value.
+
+        Returns:
+        - value: The cached or freshly loaded value.
+        """
+        while True:
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+                pending = self._loading.get(key)
+                if pending is None:
+                    self.misses += 1
+                    pending = self._loading[key] = threading.Event()
+                    break
+            pending.wait()
+            with self._lock:
+                entry = self._lookup(key)
+                if entry is not None:
+                    self.hits += 1
+                    return entry[0]
+            # The other load failed or was not cached; try it ourselves.
+
+        try:
+            value = loader()
+            if value is not None:
+                self.put(key, value, size(value) if callable(size) else size)
+            return value
+        finally:
+            with self._lock:
+                del self._loading[key]
+            pending.set()
+
+    def invalidate(self, key: Hashable) -> None:
+        """
+        Drop `key` from the cache if present.
+        """
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self._bytes -= entry[1]
+
+    def clear(self) -> None:
+        """
+        Drop every entry from the cache. Counters are kept.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        """
+        Get the cache counters.
+
+        Returns:
+        - stats (dict): Hits, misses, evictions, expirations, entries and bytes in use.
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'expirations': self.expirations,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+                'max_bytes': self.max_bytes,
+            }
+
+
+def deep_size(value: Any) -> int:
+    """
+    Estimate the memory held by a value and everything it references, in bytes.
+
+    Follows dicts, lists, tuples, sets, deques and the attributes of objects, counting
+    each object once. NumPy arrays report the data buffer they own.
+
+    Args:
+    - value: The value to measure, e.g. the statistics of an export.
+
+    Returns:
+    - size (int): The estimated size in bytes.
+    """
+    seen = set()
+    size = 0
+    stack = [value]
+    while stack:
+        obj = stack.pop()
+        if id(obj) in seen or isinstance(obj, _SHARED):
+            continue
+        seen.add(id(obj))
+        size += sys.getsizeof(obj)
+        if isinstance(obj, dict):
+            stack.extend(obj.keys())
+            stack.extend(obj.values())
+        elif isinstance(obj, (list, tuple, set, frozenset, deque)):
+            stack.extend(obj)
+        elif hasattr(obj, '__dict__'):
+            stack.append(vars(obj))
+    return size
+
+
+def result_key(digest: str, analysis: str, **params) -> tuple:
+    """
+    Build the cache key of an analysis result.
+
+    Results depend only on the export content, so they are keyed by its digest rather
+    than by who uploaded it, and identical uploads from different users share them.
+
+    Args:
+    - digest (str): The SHA-256 of the export.
+    - analysis (str): The name of the analysis or chart.
+    - params: The parameters the result was computed with, e.g. top_n.
+
+    Returns:
+    - key (tuple): A hashable key for `LRUCache`.
+    """
+    return digest, analysis, tuple(sorted(params.items()))
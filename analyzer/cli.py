@@ -0,0 +1,293 @@
+"""
+Analyze many Telegram chat exports at once, without the bot.
+
+Usage:
+    python -m analyzer exports/ --output reports --format json csv --charts
+"""
+import argparse
+import csv
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from analyzer import tools
+from analyzer.parallel import load_stats_parallel
+from analyzer.ranking import RANK_LIMIT
+from analyzer.sketch import SpaceSaving
+from analyzer.stats import ChatStats, merge_stats
+from analyzer.stream import load_stats
+
+# Report sections, as (name, function). Every function takes the statistics of an export.
+REPORT = (
+    ('chat_info', tools.chat_info),
+    ('oldest_message', tools.get_oldest_message),
+    ('latest_message', tools.get_latest_message),
+    ('forwarded_count', tools.count_forwarded_messages),
+    ('reply_count', tools.count_replies),
+    ('edited_count', tools.count_edited_messages),
+    ('average_message_length', tools.get_average_message_length),
+    ('senders', tools.get_senders),
+    ('forwarders', tools.get_forwarders),
+    ('forward_sources', tools.get_forward_sources),
+    ('repliers', tools.get_repliers),
+    ('editors', tools.get_editors),
+    ('most_common_words', tools.get_most_common_words),
+    ('most_active_hours', tools.get_most_active_hours),
+    ('most_active_days', tools.get_most_active_days),
+    ('most_active_weekdays', tools.get_most_active_weekdays),
+    ('most_active_months', tools.get_most_active_months),
+    ('most_active_year', tools.get_most_active_year),
+    ('most_active_months_all_time', tools.get_most_active_months_all_time),
+    ('most_active_months_by_year', tools.get_most_active_months_by_year),
+    ('average_message_length_by_user', tools.each_average_message_length),
+    ('longest_messages', tools.get_longest_messages),
+    ('user_activity', tools.get_user_activity),
+)
+
+# Sections added when senders, forward sources and words are counted approximately: the
+# same rankings with how much each count may overestimate the true count.
+BOUNDS_REPORT = (
+    ('senders_bounds', lambda stats: tools.get_heavy_hitters(stats, 'senders', None)),
+    ('forward_sources_bounds', lambda stats: tools.get_heavy_hitters(stats, 'forward_sources', RANK_LIMIT)),
+    ('most_common_words_bounds', lambda stats: tools.get_heavy_hitters(stats, 'words', 10)),
+)
+
+SUMMARY_FIELDS = ('export', 'name', 'type', 'id', 'messages', 'seconds', 'error')
+
+
+def find_exports(paths: list) -> list:
+    """
+    Expand the given files and directories into a sorted list of export files.
+
+    Args:
+    - paths (list): Export files, or directories searched recursively for .json files.
+
+    Returns:
+    - exports (list): Paths of the export files.
+    """
+    exports = []
+    for path in paths:
+        if os.path.isdir(path):
+            for root, _, files in os.walk(path):
+                exports += [os.path.join(root, name) for name in files if name.lower().endswith('.json')]
+        else:
+            exports.append(path)
+    return sorted(exports)
+
+
+def report_dirs(exports: list, output: str) -> list:
+    """
+    Pick an output directory per export, named after the file and unique within the run.
+    """
+    dirs, used = [], set()
+    for path in exports:
+        stem = os.path.splitext(os.path.basename(path))[0]
+        name, suffix = stem, 1
+        while name in used:
+            suffix += 1
+            name = f'{stem}-{suffix}'
+        used.add(name)
+        dirs.append(os.path.join(output, name))
+    return dirs
+
+
+def chart_functions() -> list:
+    """
+    Get every visualize_* function in analyzer.visuals, as (module name, function) pairs.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import analyzer.visuals
+
+    charts = []
+    for module_info in pkgutil.iter_modules(analyzer.visuals.__path__):
+        module = importlib.import_module(f'analyzer.visuals.{module_info.name}')
+        charts += [(module_info.name, fn) for name, fn in inspect.getmembers(module, inspect.isfunction)
+                   if fn.__module__ == module.__name__ and name.startswith('visualize')]
+    return charts
+
+
+def _csv_rows(value) -> list | None:
+    """
+    Turn a report section into CSV rows, or None when it has no tabular form.
+    """
+    if isinstance(value, list) and value and all(isinstance(item, dict) for item in value):
+        return value
+    if isinstance(value, list) and all(isinstance(item, (tuple, list)) and len(item) == 2 for item in value):
+        return [{'key': key, 'count': count} for key, count in value]
+    if isinstance(value, dict) and value and all(isinstance(item, list) for item in value.values()):
+        return [{'key': key, **row} for key, rows in value.items() for row in rows if isinstance(row, dict)]
+    if isinstance(value, dict) and all(not isinstance(item, (dict, list)) for item in value.values()):
+        return [{'key': key, 'value': item} for key, item in value.items()]
+    return None
+
+
+def write_csv(file_path: str, rows: list) -> None:
+    fields = list(dict.fromkeys(field for row in rows for field in row))
+    with open(file_path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=fields)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def write_report(stats: ChatStats, output_dir: str, formats: tuple = ('json',), charts: bool = False) -> list:
+    """
+    Run the full report over the statistics of an export and write it to `output_dir`.
+
+    Writes `report.json` with every section when 'json' is in `formats`, one CSV per
+    tabular section when 'csv' is, and one PNG per chart when `charts` is set. Statistics
+    built with a sketch size also get the error bounds of their approximate rankings.
+
+    Args:
+    - stats (ChatStats): The statistics to report on.
+    - output_dir (str): Where to write the results.
+    - formats (tuple): Any of 'json' and 'csv'.
+    - charts (bool): Whether to draw every chart.
+
+    Returns:
+    - failed (list): Descriptions of the charts that could not be drawn.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    report = {name: function(stats) for name, function in REPORT}
+    if isinstance(stats.senders, SpaceSaving):
+        report.update((name, function(stats)) for name, function in BOUNDS_REPORT)
+    if 'json' in formats:
+        with open(os.path.join(output_dir, 'report.json'), 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2, default=str)
+    if 'csv' in formats:
+        os.makedirs(os.path.join(output_dir, 'csv'), exist_ok=True)
+        for name, value in report.items():
+            rows = _csv_rows(value)
+            if rows:
+                write_csv(os.path.join(output_dir, 'csv', f'{name}.csv'), rows)
+
+    failed = []
+    if charts:
+        chart_dir = os.path.join(output_dir, 'charts')
+        os.makedirs(chart_dir, exist_ok=True)
+        for module_name, render in chart_functions():
+            try:
+                png = render(stats).getvalue()
+            except Exception as e:
+                failed.append(f'{render.__name__}: {e}')
+                continue
+            with open(os.path.join(chart_dir, f'{module_name}.{render.__name__}.png'), 'wb') as f:
+                f.write(png)
+    return failed
+
+
+def analyze_export(file_path: str, output_dir: str | None, formats: tuple = ('json',), charts: bool = False,
+                   sketch_size: int | None = None, keep_stats: bool = False, workers: int = 1) -> dict:
+    """
+    Load one export and write its report with `write_report`.
+
+    Args:
+    - file_path (str): The export to analyze.
+    - output_dir (str): Where to write the results. Nothing is written when None.
+    - formats (tuple): Any of 'json' and 'csv'.
+    - charts (bool): Whether to draw every chart.
+    - sketch_size (int): Count senders, forward sources and words approximately, see `ChatStats`.
+    - keep_stats (bool): Return the statistics under 'stats', e.g. to merge them.
+    - workers (int): Processes reading byte ranges of the export in parallel.
+
+    Returns:
+    - summary (dict): The export, chat name, type, id, message count, seconds taken and error, if any.
+    """
+    started = time.perf_counter()
+    summary = {'export': file_path}
+    if workers > 1:
+        stats = load_stats_parallel(file_path, workers, sketch_size=sketch_size)
+    else:
+        stats = load_stats(file_path, sketch_size=sketch_size)
+    if stats is None:
+        return dict(summary, error='Failed to load the JSON file.', seconds=time.perf_counter() - started)
+    summary.update(name=stats.name, type=stats.type, id=stats.id, messages=stats.messages_count)
+
+    if output_dir is not None:
+        failed = write_report(stats, output_dir, formats, charts)
+        if failed:
+            summary['error'] = 'Failed charts: ' + '; '.join(failed)
+    if keep_stats:
+        summary['stats'] = stats
+    summary['seconds'] = time.perf_counter() - started
+    return summary
+
+
+def _status(summary: dict) -> str:
+    return summary.get('error') or f"{summary.get('messages', 0)} messages in {summary.get('seconds', 0):.2f}s"
+
+
+def run(exports: list, output: str, workers: int | None = None, combine: bool = False, **options) -> list:
+    """
+    Analyze exports in a process pool, one export per task. A single export is split
+    into byte ranges read by the workers in parallel instead.
+
+    Args:
+    - exports (list): Paths of the exports.
+    - output (str): Directory receiving one subdirectory per export and `summary.csv`.
+    - workers (int): Number of worker processes. Defaults to the number of CPUs.
+    - combine (bool): Instead of one report per export, merge the statistics of every
+      export into a single report in `output/combined`.
+    - options: Passed to `analyze_export`.
+
+    Returns:
+    - summaries (list): One summary per export, in the order of `exports`.
+    """
+    os.makedirs(output, exist_ok=True)
+    dirs = [None] * len(exports) if combine else report_dirs(exports, output)
+    summaries = [None] * len(exports)
+    if len(exports) == 1:
+        summaries[0] = analyze_export(exports[0], dirs[0], keep_stats=combine,
+                                      workers=workers or os.cpu_count() or 1, **options)
+        print(f"[1/1] {exports[0]}: {_status(summaries[0])}", flush=True)
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = {executor.submit(analyze_export, path, directory, keep_stats=combine, **options): index
+                       for index, (path, directory) in enumerate(zip(exports, dirs))}
+            for done, future in enumerate(as_completed(futures), start=1):
+                index = futures[future]
+                try:
+                    summaries[index] = future.result()
+                except Exception as e:
+                    summaries[index] = {'export': exports[index], 'error': repr(e)}
+                print(f"[{done}/{len(exports)}] {exports[index]}: {_status(summaries[index])}", flush=True)
+
+    if combine:
+        parts = [summary.pop('stats') for summary in summaries if 'stats' in summary]
+        if parts:
+            write_report(merge_stats(parts), os.path.join(output, 'combined'),
+                         options.get('formats', ('json',)), options.get('charts', False))
+    with open(os.path.join(output, 'summary.csv'), 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        writer.writerows(summaries)
+    return summaries
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(prog='python -m analyzer', description='Analyze Telegram chat exports in bulk.')
+    parser.add_argument('paths', nargs='+', help='Export files, or directories searched for .json files.')
+    parser.add_argument('-o', '--output', default='reports', help='Output directory. Defaults to ./reports.')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='Worker processes. Defaults to the number of CPUs.')
+    parser.add_argument('--format', nargs='+', choices=('json', 'csv'), default=['json'], help='Report formats.')
+    parser.add_argument('--charts', action='store_true', help='Also draw every chart as PNG.')
+    parser.add_argument('--combine', action='store_true',
+                        help='Write one report for all exports together, e.g. the parts of a split export.')
+    parser.add_argument('--sketch-size', type=int, default=None,
+                        help='Count senders, forward sources and words approximately, tracking at most this many.')
+    args = parser.parse_args(argv)
+
+    exports = find_exports(args.paths)
+    if not exports:
+        print('No exports found.', file=sys.stderr)
+        return 1
+    summaries = run(exports, args.output, args.workers, combine=args.combine, formats=tuple(args.format),
+                    charts=args.charts, sketch_size=args.sketch_size)
+    failed = sum(1 for summary in summaries if summary.get('error'))
+    print(f'Analyzed {len(summaries) - failed} of {len(summaries)} exports into {args.output}')
+    return 1 if failed else 0
@@ -0,0 +1,192 @@
+from array import array
+
+import numpy as np
+
+from analyzer.ranking import top_k
+from analyzer.stream import iter_messages
+
+# Date strings are converted to datetime64 in blocks of this many messages, so the
+# strings of a large export never sit in memory all at once.
+_DATE_BLOCK = 65536
+
+
+class MessageTable:
+    """
+    The messages of an export stored as NumPy columns.
+
+    Each message costs about twenty bytes instead of a Python dict. Senders and
+    forward sources are interned into integer codes that index `sender_names` and
+    `source_names`, in order of first appearance.
+
+    Columns:
+    - dates (datetime64[s]): The message date, NaT when the message has none.
+    - senders (int32): Code of the `from` field. Messages without one get the code of
+      'Deleted Account', like the rankings that count them.
+    - has_sender (bool): Whether the message has a `from` field.
+    - sources (int32): Code of the `forwarded_from` field, -1 when not forwarded.
+    - is_forwarded, is_reply, is_edited (bool): The message flags.
+    """
+
+    def __init__(self, dates, senders, has_sender, sources, is_forwarded, is_reply, is_edited,
+                 sender_names, source_names, name='Unknown', chat_type='Unknown', chat_id='Unknown'):
+        self.dates = dates
+        self.senders = senders
+        self.has_sender = has_sender
+        self.sources = sources
+        self.is_forwarded = is_forwarded
+        self.is_reply = is_reply
+        self.is_edited = is_edited
+        self.sender_names = sender_names
+        self.source_names = source_names
+        self.name = name
+        self.type = chat_type
+        self.id = chat_id
+
+    def __len__(self) -> int:
+        return len(self.dates)
+
+    @classmethod
+    def from_messages(cls, messages, header: dict | None = None) -> 'MessageTable':
+        """
+        Build a table from an iterable of messages.
+
+        Args:
+        - messages (iterable): The messages, e.g. `data['messages']` or `iter_messages(...)`.
+        - header (dict): The top-level keys of the export. When `messages` is a stream it is
+          read after the stream is exhausted, so keys found while streaming are included.
+
+        Returns:
+        - table (MessageTable): The columnar table.
+        """
+        sender_codes = {}
+        source_codes = {}
+        senders = array('i')
+        sources = array('i')
+        flags = bytearray()
+        date_blocks = []
+        dates = []
+
+        for message in messages:
+            sender = message.get('from')
+            if sender is None:
+                sender = 'Deleted Account'
+            code = sender_codes.get(sender)
+            if code is None:
+                code = sender_codes[sender] = len(sender_codes)
+            senders.append(code)
+
+            if 'forwarded_from' in message:
+                source = message['forwarded_from']
+                if source is None:
+                    source = 'Deleted Account'
+                code = source_codes.get(source)
+                if code is None:
+                    code = source_codes[source] = len(source_codes)
+                sources.append(code)
+            else:
+                sources.append(-1)
+
+            flags.append(('from' in message)
+                         | ('forwarded_from' in message) << 1
+                         | ('reply_to_message_id' in message) << 2
+                         | ('edited' in message) << 3)
+
+            dates.append(message.get('date', 'NaT'))
+            if len(dates) == _DATE_BLOCK:
+                date_blocks.append(np.array(dates, dtype='datetime64[s]'))
+                dates = []
+
+        date_blocks.append(np.array(dates, dtype='datetime64[s]'))
+        flags = np.frombuffer(bytes(flags), dtype=np.uint8)
+        header = header or {}
+
+        return cls(
+            dates=np.concatenate(date_blocks),
+            senders=np.frombuffer(senders, dtype=np.int32).copy(),
+            has_sender=(flags & 1).astype(bool),
+            sources=np.frombuffer(sources, dtype=np.int32).copy(),
+            is_forwarded=(flags & 2).astype(bool),
+            is_reply=(flags & 4).astype(bool),
+            is_edited=(flags & 8).astype(bool),
+            sender_names=list(sender_codes),
+            source_names=list(source_codes),
+            name=header.get('name', 'Unknown'),
+            chat_type=header.get('type', 'Unknown'),
+            chat_id=header.get('id', 'Unknown'),
+        )
+
+    @classmethod
+    def from_data(cls, data: dict) -> 'MessageTable':
+        """
+        Build a table from loaded JSON data.
+        """
+        return cls.from_messages(data.get('messages', []), data)
+
+    def valid_dates(self):
+        """
+        Get the dates of the messages that have one.
+        """
+        return self.dates[~np.isnat(self.dates)]
+
+
+def load_table(file_path: str) -> MessageTable:
+    """
+    Stream an export from disk straight into a columnar table.
+
+    Args:
+    - file_path (str): The path to the JSON file.
+
+    Returns:
+    - table (MessageTable): The columnar table.
+    """
+    header = {}
+    return MessageTable.from_messages(iter_messages(file_path, header), header)
+
+
+def rank(keys) -> tuple:
+    """
+    Count the distinct values of an array and order them from most to least frequent.
+
+    Ties are broken by first appearance, the same order `Counter.most_common` and the
+    stable sorts in `analyzer.tools` give.
+
+    Args:
+    - keys (ndarray): The values to count.
+
+    Returns:
+    - (values, counts) (tuple): Two arrays with the distinct values and their counts.
+    """
+    if keys.size == 0:
+        return keys[:0], np.zeros(0, dtype=np.int64)
+    values, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.lexsort((first, -counts))
+    return values[order], counts[order]
+
+
+def rank_codes(codes, names: list, mask=None, top_n: int | None = None) -> list[tuple[str, int]]:
+    """
+    Rank interned codes by frequency with `bincount`.
+
+    Args:
+    - codes (ndarray): Integer codes indexing `names`; negative codes are ignored.
+    - names (list): The name of each code.
+    - mask (ndarray): Optional boolean mask selecting the rows to count.
+    - top_n (int): Number of entries to return, kept in a heap with `top_k`. None returns all of them.
+
+    Returns:
+    - ranking (list): List of (name, count) tuples from most to least frequent.
+    """
+    if mask is not None:
+        codes = codes[mask]
+    codes = codes[codes >= 0]
+    if codes.size == 0:
+        return []
+    counts = np.bincount(codes, minlength=len(names))
+    present, first = np.unique(codes, return_index=True)
+    if top_n is not None:
+        # Codes in order of first appearance, so ties rank like the full sort below.
+        seen = present[np.argsort(first)]
+        ranked = top_k(zip(seen.tolist(), counts[seen].tolist()), top_n)
+        return [(names[code], count) for code, count in ranked]
+    order = present[np.lexsort((first, -counts[present]))]
+    return [(names[code], int(counts[code])) for code in order]
@@ -0,0 +1,145 @@
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Hashable
+
+
+class QueueFull(Exception):
+    """
+    Raised when a task is submitted while the executor's queue is full.
+    """
+
+
+class KeyedExecutor:
+    """
+    A thread pool that runs tasks with different keys concurrently and tasks with the
+    same key one after another, in the order they were submitted.
+
+    At most `max_pending` tasks can be queued or running at once; `submit` waits up to
+    `timeout` seconds for room and then raises `QueueFull`.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int = 256, timeout: float = 0):
+        """
+        Args:
+        - max_workers (int): Number of worker threads. Defaults to ThreadPoolExecutor's default.
+        - max_pending (int): Maximum number of tasks queued or running at once.
+        - timeout (float): Seconds `submit` waits for room when the queue is full.
+        """
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='handler')
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._queues = {}
+        self._lock = threading.Lock()
+
+    def submit(self, key: Hashable, fn: Callable, *args, **kwargs) -> Future:
+        """
+        Run `fn(*args, **kwargs)` after every earlier task with the same key has finished.
+
+        Args:
+        - key (Hashable): Tasks sharing a key never run at the same time, e.g. a user id.
+        - fn (callable): The task.
+
+        Returns:
+        - future (Future): Resolves to the task's result.
+
+        Raises:
+        - QueueFull: If the executor has no room within `timeout`.
+        """
+        acquired = self._slots.acquire(timeout=self.timeout) if self.timeout else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise QueueFull(f'{self.max_pending} tasks are already pending')
+
+        future = Future()
+        with self._lock:
+            queue = self._queues.get(key)
+            start = queue is None
+            if start:
+                queue = self._queues[key] = deque()
+            queue.append((future, fn, args, kwargs))
+        if start:
+            self._executor.submit(self._run_next, key)
+        return future
+
+    def _run_next(self, key: Hashable) -> None:
+        with self._lock:
+            future, fn, args, kwargs = self._queues[key][0]
+
+        try:
+            if future.set_running_or_notify_cancel():
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except BaseException as e:
+                    future.set_exception(e)
+        finally:
+            self._slots.release()
+            with self._lock:
+                queue = self._queues[key]
+                queue.popleft()
+                if not queue:
+                    del self._queues[key]
+                    queue = None
+            # Resubmit rather than loop, so one busy key cannot hold a worker forever.
+            if queue is not None:
+                self._executor.submit(self._run_next, key)
+
+    def pending(self) -> int:
+        """
+        Get the number of tasks queued or running.
+        """
+        with self._lock:
+            return sum(len(queue) for queue in self._queues.values())
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker threads once the queued tasks have run.
+        """
+        if wait:
+            while self.pending():
+                time.sleep(0.05)
+        self._executor.shutdown(wait=wait)
+
+
+class Job(Future):
+    """
+    A future for a call that runs exactly once, either on a background worker or in the
+    first thread that needs its result before a worker got to it.
+
+    Submit `run` to an executor to compute the result ahead of time, and call
+    `run_or_wait` where the result is needed. Whichever starts first runs the call;
+    everyone else waits for it.
+    """
+
+    def __init__(self, fn: Callable, *args, **kwargs):
+        super().__init__()
+        self._call = (fn, args, kwargs)
+        self._claim = threading.Lock()
+        self._claimed = False
+
+    def run(self) -> None:
+        """
+        Run the call unless it has already started or was cancelled.
+        """
+        with self._claim:
+            if self._claimed:
+                return
+            self._claimed = True
+        if not self.set_running_or_notify_cancel():
+            return
+        fn, args, kwargs = self._call
+        self._call = None
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self.set_exception(e)
+        else:
+            self.set_result(result)
+
+    def run_or_wait(self, timeout: float | None = None):
+        """
+        Run the call here if no worker has started it yet, then return its result.
+        """
+        self.run()
+        return self.result(timeout)
@@ -0,0 +1,252 @@
+import json
+import sys
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+STAGES = ('load', 'compute', 'render', 'send')
+# Upper bounds of the latency histogram buckets, in seconds.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+def max_rss() -> int:
+    """
+    Get the peak resident memory of this process in bytes, or 0 where it is not available.
+    """
+    if resource is None:
+        return 0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class Usage:
+    """
+    Measures the wall time, CPU time and memory growth of a block of code on the current thread.
+
+    The CPU time is that of the calling thread. The memory growth is how much the block
+    raised the process's peak resident memory (its RSS high-water mark). That mark only
+    ever rises and is shared by every thread, so it is 0 for most blocks and may include
+    memory allocated by other requests running at the same time.
+    """
+
+    def __init__(self):
+        self.wall = self.cpu = 0.0
+        self.rss_growth_bytes = 0
+
+    def __enter__(self) -> 'Usage':
+        self._memory = max_rss()
+        self._cpu = time.thread_time()
+        self._wall = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.wall = time.perf_counter() - self._wall
+        self.cpu = time.thread_time() - self._cpu
+        self.rss_growth_bytes = max(0, max_rss() - self._memory)
+
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(labels: dict) -> str:
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}'
+
+
+class Metrics:
+    """
+    Per-handler, per-stage latency and resource metrics, exposed in the Prometheus text format.
+    """
+
+    def __init__(self, buckets: tuple = BUCKETS, log_requests: bool = True):
+        """
+        Args:
+        - buckets (tuple): Upper bounds of the latency histogram buckets, in seconds.
+        - log_requests (bool): Whether finished requests print a JSON log line.
+        """
+        self.buckets = tuple(buckets)
+        self.log_requests = log_requests
+        self._lock = threading.Lock()
+        self._stages = {}
+        self._requests = {}
+
+    def observe(self, handler: str, stage: str, wall: float, cpu: float = 0.0, rss_growth_bytes: int = 0) -> None:
+        """
+        Record one run of a stage.
+
+        Args:
+        - handler (str): The handler or button, e.g. 'rank_senders'.
+        - stage (str): One of STAGES.
+        - wall (float): Wall time in seconds.
+        - cpu (float): CPU time in seconds.
+        - rss_growth_bytes (int): How much the stage raised the peak resident memory, in bytes.
+        """
+        with self._lock:
+            entry = self._stages.get((handler, stage))
+            if entry is None:
+                entry = self._stages[(handler, stage)] = {
+                    'buckets': [0] * len(self.buckets), 'count': 0, 'wall': 0.0, 'cpu': 0.0, 'rss_growth_bytes': 0
+                }
+            index = bisect_left(self.buckets, wall)
+            if index < len(self.buckets):
+                entry['buckets'][index] += 1
+            entry['count'] += 1
+            entry['wall'] += wall
+            entry['cpu'] += cpu
+            entry['rss_growth_bytes'] = max(entry['rss_growth_bytes'], rss_growth_bytes)
+
+    def count_request(self, handler: str, outcome: str) -> None:
+        """
+        Count a finished request by handler and outcome, e.g. 'ok' or 'error'.
+        """
+        with self._lock:
+            self._requests[(handler, outcome)] = self._requests.get((handler, outcome), 0) + 1
+
+    def trace(self, handler: str, **fields) -> 'Trace':
+        """
+        Start tracing one request. Extra fields, e.g. a user id, are added to its log line.
+        """
+        return Trace(self, handler, fields)
+
+    def exposition(self) -> str:
+        """
+        Render every metric in the Prometheus text exposition format.
+        """
+        with self._lock:
+            stages = {key: dict(entry, buckets=list(entry['buckets'])) for key, entry in self._stages.items()}
+            requests = dict(self._requests)
+
+        lines = [
+            '# HELP analyzer_requests_total Finished requests by handler and outcome.',
+            '# TYPE analyzer_requests_total counter',
+        ]
+        for (handler, outcome), count in sorted(requests.items()):
+            lines.append(f'analyzer_requests_total{_labels({"handler": handler, "outcome": outcome})} {count}')
+
+        lines += [
+            '# HELP analyzer_stage_seconds Wall time of each request stage.',
+            '# TYPE analyzer_stage_seconds histogram',
+        ]
+        for (handler, stage), entry in sorted(stages.items()):
+            cumulative = 0
+            for bound, count in zip(self.buckets, entry['buckets']):
+                cumulative += count
+                lines.append(f'analyzer_stage_seconds_bucket{_labels({"handler": handler, "stage": stage, "le": bound})} {cumulative}')
+            lines.append(f'analyzer_stage_seconds_bucket{_labels({"handler": handler, "stage": stage, "le": "+Inf"})} {entry["count"]}')
+            lines.append(f'analyzer_stage_seconds_sum{_labels({"handler": handler, "stage": stage})} {entry["wall"]}')
+            lines.append(f'analyzer_stage_seconds_count{_labels({"handler": handler, "stage": stage})} {entry["count"]}')
+
+        lines += [
+            '# HELP analyzer_stage_cpu_seconds_total CPU time spent in each request stage.',
+            '# TYPE analyzer_stage_cpu_seconds_total counter',
+        ]
+        for (handler, stage), entry in sorted(stages.items()):
+            lines.append(f'analyzer_stage_cpu_seconds_total{_labels({"handler": handler, "stage": stage})} {entry["cpu"]}')
+
+        lines += [
+            '# HELP analyzer_stage_rss_growth_bytes Largest rise of the process peak resident memory in each request stage.',
+            '# TYPE analyzer_stage_rss_growth_bytes gauge',
+        ]
+        for (handler, stage), entry in sorted(stages.items()):
+            lines.append(f'analyzer_stage_rss_growth_bytes{_labels({"handler": handler, "stage": stage})} {entry["rss_growth_bytes"]}')
+        return '\n'.join(lines) + '\n'
+
+
+class Trace:
+    """
+    The stages of one request. Each stage is recorded in the metrics as it ends, and
+    `finish` counts the request and prints one JSON log line with every stage.
+    """
+
+    def __init__(self, metrics: Metrics, handler: str, fields: dict):
+        self.metrics = metrics
+        self.handler = handler
+        self.fields = fields
+        self.stages = {}
+        self.started = time.perf_counter()
+        self._finished = False
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Measure the block as the stage `name` of this request.
+        """
+        usage = Usage()
+        try:
+            with usage:
+                yield usage
+        finally:
+            self.add(name, usage.wall, usage.cpu, usage.rss_growth_bytes)
+
+    def add(self, name: str, wall: float, cpu: float = 0.0, rss_growth_bytes: int = 0) -> None:
+        """
+        Record a stage measured elsewhere, e.g. charts rendered in worker processes.
+        """
+        stage = self.stages.setdefault(name, {'wall': 0.0, 'cpu': 0.0, 'rss_growth_bytes': 0})
+        stage['wall'] += wall
+        stage['cpu'] += cpu
+        stage['rss_growth_bytes'] = max(stage['rss_growth_bytes'], rss_growth_bytes)
+        self.metrics.observe(self.handler, name, wall, cpu, rss_growth_bytes)
+
+    def finish(self, outcome: str = 'ok') -> None:
+        """
+        Count the request and write its log line. Later calls do nothing.
+        """
+        if self._finished:
+            return
+        self._finished = True
+        self.metrics.count_request(self.handler, outcome)
+        if self.metrics.log_requests:
+            record = {
+                'event': 'request',
+                'handler': self.handler,
+                'outcome': outcome,
+                'seconds': round(time.perf_counter() - self.started, 6),
+                **self.fields,
+                'stages': {
+                    name: {'wall': round(stage['wall'], 6), 'cpu': round(stage['cpu'], 6), 'rss_growth_bytes': stage['rss_growth_bytes']}
+                    for name, stage in self.stages.items()
+                },
+            }
+            print(json.dumps(record, default=str), flush=True)
+
+
+def serve(metrics: Metrics, port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve the metrics at http://host:port/metrics from a background thread.
+
+    Args:
+    - metrics (Metrics): The metrics to expose.
+    - port (int): The port to listen on.
+    - host (str): The address to bind. Defaults to localhost only.
+
+    Returns:
+    - server (ThreadingHTTPServer): The running server; call `shutdown` to stop it.
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split('?')[0] != '/metrics':
+                self.send_error(404)
+                return
+            body = metrics.exposition().encode()
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, name='metrics', daemon=True).start()
+    return server
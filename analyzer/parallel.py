@@ -0,0 +1,275 @@
+import codecs
+import json
+import multiprocessing
+import os
+import re
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+
+from analyzer.stats import ChatStats, merge_stats
+from analyzer.stream import _Reader, _read_message, load_stats
+
+# Smallest share of an export worth a worker process of its own.
+MIN_CHUNK_MESSAGES = 20000
+MIN_CHUNK_BYTES = 4 << 20
+
+# Exports write "id" as the first key of every message. JSON strings escape their quotes,
+# so this only ever matches the start of an object.
+_MESSAGE_START = re.compile(rb'\{\s*"id"\s*:')
+_SYNC_WINDOW = 1 << 16
+
+# The messages of `chat_stats_parallel`, inherited by forked workers instead of pickled.
+_shared_messages = None
+
+
+class _Slice:
+    """
+    A file-like view of the bytes [start, end) of a UTF-8 file, read as text by `_Reader`.
+    """
+
+    def __init__(self, file_path: str, start: int, end: int):
+        self.file = open(file_path, 'rb')
+        self.file.seek(start)
+        self.remaining = end - start
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+
+    def __enter__(self) -> '_Slice':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.file.close()
+
+    def read(self, size: int) -> str:
+        while True:
+            block = self.file.read(min(size, self.remaining)) if self.remaining > 0 else b''
+            self.remaining -= len(block)
+            text = self.decoder.decode(block, final=not block)
+            # A block may end inside a multi-byte character and decode to nothing.
+            if text or not block:
+                return text
+
+
+def _context():
+    """
+    Fork workers when it is safe, so they start at once and can share loaded messages.
+    """
+    if 'fork' in multiprocessing.get_all_start_methods() and threading.active_count() == 1:
+        return multiprocessing.get_context('fork')
+    return multiprocessing.get_context('spawn')
+
+
+def _messages_start(file_path: str) -> tuple:
+    """
+    Read the top-level keys before the messages of an export.
+
+    Returns:
+    - header (dict): The keys read, e.g. name, type and id.
+    - start (int): Byte offset just after the opening bracket of the messages, or None when
+      the export has no messages.
+    """
+    header = {}
+    with open(file_path, encoding='utf-8', newline='') as f:
+        reader = _Reader(f, 1 << 16)
+        reader.expect('{')
+        while reader.peek() != '}':
+            key = reader.value()
+            reader.expect(':')
+            if key == 'messages':
+                reader.expect('[')
+                chars = reader.offset + reader.pos
+                break
+            header[key] = reader.value()
+            if reader.peek() == ',':
+                reader.pos += 1
+        else:
+            return header, None
+
+    with open(file_path, encoding='utf-8', newline='') as f:
+        return header, len(f.read(chars).encode('utf-8'))
+
+
+def _is_message(file_path: str, start: int, size: int) -> bool:
+    try:
+        with _Slice(file_path, start, size) as source:
+            value = _Reader(source, 1 << 12).value()
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        return False
+    return isinstance(value, dict) and 'type' in value and 'date' in value
+
+
+def _find_message_start(file_path: str, position: int, size: int) -> int:
+    """
+    Find the byte offset of the first message starting at or after `position`, or `size`.
+    """
+    with open(file_path, 'rb') as f:
+        while position < size:
+            f.seek(position)
+            window = f.read(_SYNC_WINDOW + 64)
+            for match in _MESSAGE_START.finditer(window):
+                if match.start() >= _SYNC_WINDOW:
+                    break
+                if _is_message(file_path, position + match.start(), size):
+                    return position + match.start()
+            position += _SYNC_WINDOW
+    return size
+
+
+def _scan_range(file_path: str, start: int, end: int, last: bool, sketch_size: int | None) -> tuple:
+    """
+    Build the statistics of the messages stored in bytes [start, end) of an export.
+
+    The range must hold whole messages separated by commas. The last range runs to the end
+    of the file, and the top-level keys after the messages are read from it too.
+
+    Returns:
+    - stats (ChatStats): The statistics of the messages in the range.
+    - header (dict): The top-level keys after the messages, read by the last range.
+
+    Raises:
+    - json.JSONDecodeError: If the range does not hold whole messages.
+    """
+    stats = ChatStats(sketch_size=sketch_size)
+    header = {}
+    with _Slice(file_path, start, end) as source:
+        reader = _Reader(source, 1 << 16)
+        while True:
+            char = reader.peek()
+            if char == '' and not last:
+                break
+            if char == ']' and last:
+                reader.pos += 1
+                break
+            stats.add(_read_message(reader))
+            char = reader.peek()
+            if char == ',':
+                reader.pos += 1
+            elif char != ']':
+                raise json.JSONDecodeError("Expecting ',' delimiter", reader.buffer, reader.pos)
+
+        while last:
+            char = reader.peek()
+            reader.pos += 1
+            if char == '}':
+                break
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", reader.buffer, reader.pos - 1)
+            key = reader.value()
+            reader.expect(':')
+            header[key] = reader.value()
+    stats.flush()
+    return stats, header
+
+
+def load_stats_parallel(file_path: str = 'result.json', workers: int | None = None,
+                        sketch_size: int | None = None) -> ChatStats | None:
+    """
+    Build the statistics of an export by streaming byte ranges of it in several processes.
+
+    The file is cut into one range per worker at message boundaries, each worker streams
+    its range into its own `ChatStats`, and the parts are merged in file order, which gives
+    the same statistics as `load_stats`. Only the compact statistics travel back from the
+    workers, never messages. Small exports, and exports whose ranges cannot be split
+    cleanly, are read in one pass with `load_stats`.
+
+    Args:
+    - file_path (str): The path to the JSON file.
+    - workers (int): Number of worker processes. Defaults to the number of CPUs.
+    - sketch_size (int): Count senders, forward sources and words approximately, see `ChatStats`.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    - None: If an error occurs during file opening or JSON parsing.
+    """
+    workers = workers or os.cpu_count() or 1
+    try:
+        header, start = _messages_start(file_path)
+        size = os.path.getsize(file_path)
+    except (FileNotFoundError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"An error occurred while loading the JSON file: {e}")
+        return None
+
+    workers = min(workers, (size - start) // MIN_CHUNK_BYTES) if start is not None else 1
+    if workers < 2:
+        return load_stats(file_path, sketch_size)
+
+    bounds = [start]
+    for index in range(1, workers):
+        position = max(start + (size - start) * index // workers, bounds[-1] + 1)
+        bound = _find_message_start(file_path, position, size)
+        if bound == size:
+            break
+        bounds.append(bound)
+    bounds.append(size)
+
+    lasts = [False] * (len(bounds) - 2) + [True]
+    try:
+        with ProcessPoolExecutor(max_workers=len(lasts), mp_context=_context()) as executor:
+            results = list(executor.map(_scan_range, repeat(file_path), bounds[:-1], bounds[1:], lasts,
+                                        repeat(sketch_size)))
+    except (UnicodeDecodeError, json.JSONDecodeError):
+        # A range did not start on a message, e.g. in an export written with another key order.
+        return load_stats(file_path, sketch_size)
+
+    header.update(results[-1][1])
+    stats = merge_stats([part for part, _ in results])
+    stats.name = header.get('name', 'Unknown')
+    stats.type = header.get('type', 'Unknown')
+    stats.id = header.get('id', 'Unknown')
+    return stats
+
+
+def _scan_shared(start: int, end: int, sketch_size: int | None) -> ChatStats:
+    stats = ChatStats(sketch_size=sketch_size)
+    stats.update(_shared_messages[start:end])
+    return stats
+
+
+def _scan_messages(messages: list, sketch_size: int | None) -> ChatStats:
+    stats = ChatStats(sketch_size=sketch_size)
+    stats.update(messages)
+    return stats
+
+
+def chat_stats_parallel(data: dict, workers: int | None = None, sketch_size: int | None = None) -> ChatStats:
+    """
+    Build the statistics of a loaded export by scanning chunks of its messages in several processes.
+
+    The messages are cut into one contiguous chunk per worker and the statistics of the
+    chunks are merged in order, which gives the same statistics as `ChatStats.from_data`.
+    Where processes are forked, workers read the messages inherited from this process, so
+    only their statistics are pickled.
+
+    Args:
+    - data (dict): The JSON data.
+    - workers (int): Number of worker processes. Defaults to the number of CPUs.
+    - sketch_size (int): Count senders, forward sources and words approximately, see `ChatStats`.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    """
+    global _shared_messages
+
+    messages = data.get('messages', [])
+    workers = min(workers or os.cpu_count() or 1, len(messages) // MIN_CHUNK_MESSAGES)
+    if workers < 2:
+        return ChatStats.from_data(data, sketch_size)
+
+    bounds = [len(messages) * index // workers for index in range(workers + 1)]
+    context = _context()
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+        if context.get_start_method() == 'fork':
+            _shared_messages = messages
+            try:
+                parts = list(executor.map(_scan_shared, bounds[:-1], bounds[1:], repeat(sketch_size)))
+            finally:
+                _shared_messages = None
+        else:
+            chunks = (messages[start:end] for start, end in zip(bounds[:-1], bounds[1:]))
+            parts = list(executor.map(_scan_messages, chunks, repeat(sketch_size)))
+
+    stats = merge_stats(parts)
+    stats.name = data.get('name', 'Unknown')
+    stats.type = data.get('type', 'Unknown')
+    stats.id = data.get('id', 'Unknown')
+    return stats
@@ -0,0 +1,70 @@
+import threading
+from collections import Counter, OrderedDict
+from typing import Hashable
+
+from analyzer.ranking import top_k
+
+
+class Transitions:
+    """
+    Counts which button each user presses after another, to predict what they will press next.
+
+    The probability of going from `a` to `b` is the share of presses following `a` that
+    were `b`. An optional prior adds `prior_weight` presses of an expected follow-up to
+    every button, so predictions are useful before anything has been observed.
+    """
+
+    def __init__(self, prior: dict | None = None, prior_weight: float = 1.0, max_users: int = 10000):
+        """
+        Args:
+        - prior (dict): Expected next callback_data for a callback_data, e.g. the chart button
+          offered after a ranking.
+        - prior_weight (float): How many observed presses the prior counts as.
+        - max_users (int): Number of users whose last press is remembered.
+        """
+        self.prior = prior or {}
+        self.prior_weight = prior_weight
+        self.max_users = max_users
+        self._counts = {}
+        self._last = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record(self, user: Hashable, callback: str) -> None:
+        """
+        Record a press, counting the transition from the user's previous press.
+        """
+        with self._lock:
+            previous = self._last.pop(user, None)
+            if previous is not None:
+                self._counts.setdefault(previous, Counter())[callback] += 1
+            self._last[user] = callback
+            while len(self._last) > self.max_users:
+                self._last.popitem(last=False)
+
+    def probabilities(self, callback: str) -> dict:
+        """
+        Get the probability of every press observed to follow `callback`.
+        """
+        with self._lock:
+            counts = Counter(self._counts.get(callback, ()))
+        expected = self.prior.get(callback)
+        if expected is not None:
+            counts[expected] += self.prior_weight
+        total = sum(counts.values())
+        return {following: count / total for following, count in counts.items()} if total else {}
+
+    def predict(self, callback: str, min_probability: float = 0.3, limit: int | None = None) -> list:
+        """
+        Get the presses likely to follow `callback`.
+
+        Args:
+        - callback (str): The callback_data just pressed.
+        - min_probability (float): Leave out presses less likely than this.
+        - limit (int): Maximum number of presses returned. All when None.
+
+        Returns:
+        - predictions (list): (callback_data, probability) tuples, most likely first.
+        """
+        likely = {following: probability for following, probability in self.probabilities(callback).items()
+                  if probability >= min_probability}
+        return top_k(likely, limit)
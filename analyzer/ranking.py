@@ -0,0 +1,31 @@
+import heapq
+from operator import itemgetter
+from typing import Hashable, Iterable, Mapping
+
+# Number of entries shown by the bot's "Top 100" rankings.
+RANK_LIMIT = 100
+
+_count = itemgetter(1)
+
+
+def top_k(counts: Mapping | Iterable[tuple[Hashable, int]], k: int | None = None) -> list[tuple[Hashable, int]]:
+    """
+    Get the k keys with the highest counts, highest first.
+
+    Ties keep the order the keys have in `counts`, exactly like a stable
+    `sorted(..., reverse=True)[:k]`. With a k smaller than the number of keys only a heap
+    of k entries is kept instead of sorting everything.
+
+    Args:
+    - counts (Mapping | Iterable): A mapping of keys to counts, or (key, count) pairs.
+    - k (int): Number of keys to return. All keys, fully ranked, when None.
+
+    Returns:
+    - ranked (list): List of (key, count) tuples.
+    """
+    items = counts.items() if hasattr(counts, 'items') else counts
+    if k is None:
+        return sorted(items, key=_count, reverse=True)
+    if k <= 0:
+        return []
+    return heapq.nlargest(k, items, key=_count)
@@ -0,0 +1,163 @@
+import heapq
+from itertools import count as sequence
+from typing import Hashable, Iterable, Iterator
+
+from analyzer.ranking import top_k
+
+
+class SpaceSaving:
+    """
+    Approximate counts of the most frequent keys in a stream, in bounded memory.
+
+    Implements the Space-Saving algorithm (Metwally et al., 2005). At most `capacity` keys
+    are tracked. A new key seen while the table is full replaces the key with the lowest
+    count and inherits that count as its error. For every tracked key the true count lies
+    in `[count - error, count]`. Every key seen more than `total / capacity` times is
+    guaranteed to be tracked.
+
+    It can stand in for a `Counter`. `sketch[key] += n` and `update(keys)` add to a key,
+    and `most_common`, `items` and `len` report the tracked keys.
+    """
+
+    def __init__(self, capacity: int = 10000):
+        """
+        Args:
+        - capacity (int): Maximum number of keys tracked.
+        """
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1')
+        self.capacity = capacity
+        self.total = 0
+        self._counts = {}
+        self._errors = {}
+        # One (count, order, key) entry per tracked key. Counts in the heap may lag behind
+        # `_counts` and are refreshed lazily when an entry reaches the top.
+        self._heap = []
+        self._order = sequence()
+
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        state['_order'] = next(self._order)
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._order = sequence(state['_order'])
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._counts
+
+    def __iter__(self) -> Iterator:
+        return iter(self._counts)
+
+    def __getitem__(self, key: Hashable) -> int:
+        return self._counts.get(key, 0)
+
+    def __setitem__(self, key: Hashable, value: int) -> None:
+        # Supports `sketch[key] += n`, which reads the estimate and writes it back increased.
+        self.add(key, value - self[key])
+
+    def add(self, key: Hashable, n: int = 1) -> None:
+        """
+        Count `n` more occurrences of a key.
+        """
+        self.total += n
+        counts = self._counts
+        if key in counts:
+            counts[key] += n
+        elif len(counts) < self.capacity:
+            counts[key] = n
+            self._errors[key] = 0
+            heapq.heappush(self._heap, (n, next(self._order), key))
+        else:
+            minimum = self._pop_minimum()
+            counts[key] = minimum + n
+            self._errors[key] = minimum
+            heapq.heappush(self._heap, (minimum + n, next(self._order), key))
+
+    def _pop_minimum(self) -> int:
+        heap, counts = self._heap, self._counts
+        while True:
+            stale, order, key = heap[0]
+            current = counts[key]
+            if current == stale:
+                heapq.heappop(heap)
+                del counts[key]
+                del self._errors[key]
+                return current
+            heapq.heapreplace(heap, (current, order, key))
+
+    def update(self, keys: Iterable[Hashable]) -> None:
+        """
+        Count one occurrence of every key in an iterable.
+        """
+        counts, add = self._counts, self.add
+        for key in keys:
+            if key in counts:
+                counts[key] += 1
+                self.total += 1
+            else:
+                add(key)
+
+    def _floor(self) -> int:
+        # No key missing from a full sketch can have been seen more often than its minimum.
+        return min(self._counts.values()) if len(self._counts) >= self.capacity else 0
+
+    def merge(self, other: 'SpaceSaving') -> 'SpaceSaving':
+        """
+        Add the counts of another sketch, e.g. one built from another shard of the messages.
+
+        A key missing from one of the sketches is counted with that sketch's minimum,
+        the most it can have been seen there, which is also added to its error. The merged
+        sketch keeps the `capacity` keys with the highest counts and the
+        `[count - error, count]` guarantee.
+
+        Returns:
+        - self (SpaceSaving): This sketch, updated.
+        """
+        floor, other_floor = self._floor(), other._floor()
+        counts, errors = {}, {}
+        for key in dict.fromkeys([*self._counts, *other._counts]):
+            counts[key] = self._counts.get(key, floor) + other._counts.get(key, other_floor)
+            errors[key] = self._errors.get(key, floor) + other._errors.get(key, other_floor)
+
+        self._counts = dict(top_k(counts, self.capacity))
+        self._errors = {key: errors[key] for key in self._counts}
+        self._heap = [(count, next(self._order), key) for key, count in self._counts.items()]
+        heapq.heapify(self._heap)
+        self.total += other.total
+        return self
+
+    def error(self, key: Hashable) -> int:
+        """
+        Get the most a key's count may overestimate its true count.
+        """
+        return self._errors.get(key, 0)
+
+    def items(self) -> Iterator[tuple]:
+        return iter(self._counts.items())
+
+    def values(self) -> Iterator[int]:
+        return iter(self._counts.values())
+
+    def most_common(self, top_n: int | None = None) -> list:
+        """
+        Get the tracked keys with the highest counts, as (key, count) pairs, highest first.
+        """
+        return top_k(self._counts, top_n)
+
+    def heavy_hitters(self, top_n: int | None = None) -> list:
+        """
+        Get the tracked keys with the highest counts along with their error bounds.
+
+        Args:
+        - top_n (int): Number of keys to return. All tracked keys when None.
+
+        Returns:
+        - heavy_hitters (list): (key, count, error) tuples, highest count first. The true
+          count of each key is between count - error and count.
+        """
+        return [(key, count, self._errors[key]) for key, count in self.most_common(top_n)]
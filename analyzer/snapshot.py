@@ -0,0 +1,254 @@
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+
+from analyzer.stats import ChatStats
+from analyzer.stream import iter_messages
+
+# Bump when the layout of ChatStats changes so old snapshots are rebuilt.
+SNAPSHOT_VERSION = 2
+
+
+def file_digest(file_path: str) -> str:
+    """
+    Compute the SHA-256 of a file, reading it in 1 MB blocks.
+
+    Args:
+    - file_path (str): The path to the file.
+
+    Returns:
+    - digest (str): The hex digest of the file content.
+    """
+    sha = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            sha.update(block)
+    return sha.hexdigest()
+
+
+def snapshot_path(root: str, digest: str) -> str:
+    """
+    Get the directory holding the snapshot of the export with the given digest.
+    """
+    return os.path.join(root, digest)
+
+
+def save_snapshot(root: str, digest: str, stats: ChatStats) -> None:
+    """
+    Write the statistics of an export to disk.
+
+    The snapshot is a directory named after the digest, holding `stats.pickle` and
+    `meta.json` with the snapshot version. It is written to a temporary directory first
+    and renamed into place, so readers never see a partial one.
+
+    Args:
+    - root (str): The directory holding all snapshots.
+    - digest (str): The SHA-256 of the export.
+    - stats (ChatStats): The statistics of the export.
+    """
+    os.makedirs(root, exist_ok=True)
+    target = snapshot_path(root, digest)
+    staging = tempfile.mkdtemp(prefix=f'.{digest}.', dir=root)
+    try:
+        with open(os.path.join(staging, 'stats.pickle'), 'wb') as f:
+            pickle.dump(stats, f, protocol=pickle.HIGHEST_PROTOCOL)
+        with open(os.path.join(staging, 'meta.json'), 'w', encoding='utf-8') as f:
+            json.dump({'version': SNAPSHOT_VERSION}, f)
+
+        shutil.rmtree(target, ignore_errors=True)
+        os.replace(staging, target)
+    except BaseException:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def load_snapshot(root: str, digest: str) -> ChatStats | None:
+    """
+    Load the statistics of an export from its snapshot.
+
+    Args:
+    - root (str): The directory holding all snapshots.
+    - digest (str): The SHA-256 of the export.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    - None: If there is no usable snapshot for the digest.
+    """
+    path = snapshot_path(root, digest)
+    try:
+        with open(os.path.join(path, 'meta.json'), encoding='utf-8') as f:
+            if json.load(f).get('version') != SNAPSHOT_VERSION:
+                return None
+        with open(os.path.join(path, 'stats.pickle'), 'rb') as f:
+            return pickle.load(f)
+    except (OSError, ValueError, pickle.UnpicklingError, EOFError, AttributeError):
+        return None
+
+
+def _chat_file(root: str, owner, chat_id) -> str:
+    key = json.dumps([str(owner), str(chat_id)])
+    return os.path.join(root, 'chats', hashlib.sha256(key.encode()).hexdigest())
+
+
+def _history_key(message: dict) -> bytes:
+    # Edits change the text of a message, but never its id, date or author.
+    return (f"{message.get('id')}\x1f{message.get('date')}\x1f{message.get('from_id')}"
+            f"\x1f{message.get('actor_id')}\n").encode()
+
+
+def load_chat_snapshot(root: str, owner, chat_id) -> ChatStats | None:
+    """
+    Load the statistics of the newest export of a chat uploaded by someone.
+
+    Args:
+    - root (str): The directory holding all snapshots.
+    - owner: Who uploaded the exports, e.g. a Telegram user id.
+    - chat_id: The chat id from the export.
+
+    Returns:
+    - stats (ChatStats): A fresh copy of the statistics, safe to modify.
+    - None: If no export of the chat has been snapshotted.
+    """
+    try:
+        with open(_chat_file(root, owner, chat_id), encoding='utf-8') as f:
+            digest = f.read().strip()
+    except OSError:
+        return None
+    return load_snapshot(root, digest)
+
+
+def _save_chat_snapshot(root: str, owner, chat_id, digest: str, stats: ChatStats) -> None:
+    previous = load_chat_snapshot(root, owner, chat_id)
+    if previous is not None and previous.last_message_id > stats.last_message_id:
+        return
+    path = _chat_file(root, owner, chat_id)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    staging = f'{path}.{os.getpid()}.tmp'
+    with open(staging, 'w', encoding='utf-8') as f:
+        f.write(digest)
+    os.replace(staging, path)
+
+
+def _hashed(messages, history):
+    """
+    Yield the messages, adding the id, date and author of each to the `history` hash.
+    """
+    for message in messages:
+        history.update(_history_key(message))
+        yield message
+
+
+def _fold_newer(stats: ChatStats, messages) -> bool:
+    """
+    Fold the messages of a newer export into the statistics of an older export of the same chat.
+
+    Messages past the old export's last id are added. Earlier ones are only checked: their
+    ids, dates and authors must hash to the old export's `history`, and edits made since
+    the old export are applied with `ChatStats.revise`.
+
+    Returns:
+    - exact (bool): False when the result would differ from analyzing the new export alone:
+      an edit that cannot be applied, messages deleted or cut off by a date range, or an
+      export of another chat that reuses the ids. The statistics are then left part-way
+      through and must be discarded.
+    """
+    last_id, last_edit, count = stats.last_message_id, stats.last_edit, stats.messages_count
+    seen = 0
+    overlap = hashlib.sha256()
+    for message in messages:
+        message_id = message.get('id')
+        if isinstance(message_id, int) and message_id <= last_id:
+            seen += 1
+            overlap.update(_history_key(message))
+            if message.get('edited', '') > last_edit and not stats.revise(message):
+                return False
+        else:
+            stats.add(message)
+    return seen == count and overlap.hexdigest() == stats.history
+
+
+def build_snapshot(file_path: str, root: str, digest: str | None = None, owner=None) -> ChatStats:
+    """
+    Stream an export once into its statistics and save them as a snapshot.
+
+    When the same owner uploaded an older export of the same chat, its statistics are
+    reused and only the newer messages and recent edits are folded in. If that cannot give
+    the same result as a full analysis, the statistics are rebuilt from the file.
+
+    Args:
+    - file_path (str): The path to the JSON file.
+    - root (str): The directory holding all snapshots.
+    - digest (str): The SHA-256 of the file, computed when not given.
+    - owner: Who uploaded the export, e.g. a Telegram user id. Older exports are only
+      reused when given.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    """
+    digest = digest or file_digest(file_path)
+    header = {}
+    messages = iter_messages(file_path, header)
+    # The chat id precedes the messages, so it is known once the first message is read.
+    first = next(messages, None)
+    indexed = owner is not None and 'id' in header
+    previous = load_chat_snapshot(root, owner, header['id']) if indexed else None
+    stats = previous if previous is not None else ChatStats()
+    history = hashlib.sha256()
+
+    def feed():
+        if first is not None:
+            yield first
+        yield from messages
+
+    if previous is None:
+        stats.update(_hashed(feed(), history))
+    elif not _fold_newer(stats, _hashed(feed(), history)):
+        stats = ChatStats()
+        history = hashlib.sha256()
+        stats.update(_hashed(iter_messages(file_path, header), history))
+    stats.flush()
+    stats.history = history.hexdigest()
+    stats.name = header.get('name', 'Unknown')
+    stats.type = header.get('type', 'Unknown')
+    stats.id = header.get('id', 'Unknown')
+
+    save_snapshot(root, digest, stats)
+    if indexed:
+        _save_chat_snapshot(root, owner, header['id'], digest, stats)
+    return stats
+
+
+def load_export(file_path: str | None, root: str, digest: str | None = None, owner=None) -> ChatStats | None:
+    """
+    Get the statistics of an export from its snapshot, parsing the file only when there is none.
+
+    Args:
+    - file_path (str): The path to the JSON file. May be None or missing once a snapshot exists.
+    - root (str): The directory holding all snapshots.
+    - digest (str): The SHA-256 of the file, computed from the file when not given.
+    - owner: Who uploaded the export, see `build_snapshot`.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    - None: If there is no snapshot and the file cannot be read or parsed.
+    """
+    try:
+        digest = digest or file_digest(file_path)
+    except (OSError, TypeError) as e:
+        print(f"An error occurred while loading the JSON file: {e}")
+        return None
+
+    stats = load_snapshot(root, digest)
+    if stats is not None:
+        return stats
+    if file_path is None:
+        return None
+
+    try:
+        return build_snapshot(file_path, root, digest, owner)
+    except (FileNotFoundError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"An error occurred while loading the JSON file: {e}")
+        return None
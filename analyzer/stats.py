@@ -0,0 +1,428 @@
+from collections import Counter, OrderedDict, defaultdict
+
+import numpy as np
+
+from analyzer.ranking import top_k
+from analyzer.sketch import SpaceSaving
+from analyzer.text import WordCounter
+from analyzer.timeline import (
+    MONTH_NAMES,
+    NAT,
+    TimeBuckets,
+    count_into,
+    day_label,
+    first_seen_counts,
+    grouped_first_seen_counts,
+    month_label,
+    month_name_label,
+    to_epoch,
+    weekday_label,
+    year_label
+)
+
+# Dates are buffered and bucketed with NumPy in blocks of this many messages.
+_DATE_BLOCK = 65536
+# Number of most recent messages remembered so later edits to them can be applied.
+RECENT_MESSAGES = 5000
+# The fields of a remembered message; the only ones an edit can change that ChatStats uses.
+_REVISED_FIELDS = ('id', 'from', 'text', 'edited')
+# Counters whose number of keys grows with the export, and the time counters charts draw.
+_RANKED_COUNTERS = ('senders', 'forwarders', 'forward_sources', 'repliers', 'editors', 'words')
+_CHART_COUNTERS = ('hours', 'weekdays', 'months', 'years', 'month_names')
+
+
+def _activity_counters():
+    return defaultdict(Counter)
+
+
+def _text_length(text) -> int:
+    if isinstance(text, str):
+        return len(text)
+    return sum(len(part['text']) for part in text if isinstance(part, dict))
+
+
+class ChatStats:
+    """
+    Every statistic reported by `analyzer.tools`, collected in a single pass over the messages.
+
+    The counters keep keys in the order they were first seen, so rankings built from them
+    break ties exactly like the per-function loops they replace.
+
+    Message dates are buffered and turned into the time counters a block at a time by
+    `analyzer.timeline`. `update` flushes the buffer when it returns; after calling `add`
+    directly, call `flush` before reading the time counters.
+
+    With `sketch_size`, senders, forward sources and words are counted approximately by
+    `analyzer.sketch.SpaceSaving` in bounded memory instead of exactly.
+    """
+
+    def __init__(self, name='Unknown', chat_type='Unknown', chat_id='Unknown', sketch_size: int | None = None):
+        """
+        Args:
+        - name (str): The chat name.
+        - chat_type (str): The chat type.
+        - chat_id: The chat id.
+        - sketch_size (int): Track at most this many senders, forward sources and words,
+          approximately. Everything is counted exactly when None.
+        """
+        self.name = name
+        self.type = chat_type
+        self.id = chat_id
+        self.messages_count = 0
+
+        self.oldest_message = {'date': '9999-12-31T23:59:59'}
+        self.latest_message = {'date': '0000-01-01T00:00:00'}
+
+        self.senders = SpaceSaving(sketch_size) if sketch_size else Counter()
+        self.forwarded_count = 0
+        self.forwarders = Counter()
+        self.forward_sources = SpaceSaving(sketch_size) if sketch_size else Counter()
+        self.reply_count = 0
+        self.repliers = Counter()
+        self.edited_count = 0
+        self.editors = Counter()
+
+        self.longest_messages = []
+        self.longest_length = 0
+        self.total_text_length = 0
+        self.user_text_lengths = defaultdict(int)
+        self.user_message_counts = defaultdict(int)
+
+        self.words = SpaceSaving(sketch_size) if sketch_size else Counter()
+        self._word_counter = WordCounter(self.words)
+
+        self.hours = Counter()
+        self.days = Counter()
+        self.weekdays = Counter()
+        self.months = Counter()
+        self.years = Counter()
+        self.month_names = Counter()
+        self.months_by_year = {}
+        self.user_activity = defaultdict(_activity_counters)
+        self._pending_dates = []
+        self._pending_senders = []
+
+        self.last_message_id = 0
+        self.last_edit = ''
+        self._recent = OrderedDict()
+        # Digest of the ids, dates and authors of the counted messages, set by snapshots.
+        self.history = ''
+
+    def __getstate__(self) -> dict:
+        self.flush()
+        state = self.__dict__.copy()
+        del state['_word_counter']
+        return state
+
+    def __setstate__(self, state: dict) -> None:
+        self.__dict__.update(state)
+        self._word_counter = WordCounter(self.words)
+
+    @classmethod
+    def from_data(cls, data: dict, sketch_size: int | None = None) -> 'ChatStats':
+        """
+        Build the statistics for a loaded export.
+
+        Args:
+        - data (dict): The JSON data.
+        - sketch_size (int): Count senders, forward sources and words approximately, see `ChatStats`.
+
+        Returns:
+        - stats (ChatStats): The collected statistics.
+        """
+        stats = cls(data.get('name', 'Unknown'), data.get('type', 'Unknown'), data.get('id', 'Unknown'), sketch_size)
+        stats.update(data.get('messages', []))
+        return stats
+
+    def update(self, messages) -> None:
+        """
+        Fold an iterable of messages into the statistics.
+        """
+        for message in messages:
+            self.add(message)
+        self.flush()
+
+    def add(self, message: dict) -> None:
+        """
+        Fold a single message into every counter.
+        """
+        self.messages_count += 1
+
+        message_id = message.get('id')
+        if isinstance(message_id, int):
+            self.last_message_id = max(self.last_message_id, message_id)
+            self._recent[message_id] = {field: message[field] for field in _REVISED_FIELDS if field in message}
+            if len(self._recent) > RECENT_MESSAGES:
+                self._recent.popitem(last=False)
+        if 'edited' in message and message['edited'] > self.last_edit:
+            self.last_edit = message['edited']
+
+        if 'date' in message:
+            if message['date'] < self.oldest_message['date']:
+                self.oldest_message = message
+            if message['date'] > self.latest_message['date']:
+                self.latest_message = message
+
+        sender = message.get('from')
+        author = sender if sender is not None else 'Deleted Account'
+        if 'from' in message:
+            self.senders[author] += 1
+        if 'forwarded_from' in message:
+            self.forwarded_count += 1
+            self.forwarders[author] += 1
+            forward_source = message['forwarded_from']
+            self.forward_sources[forward_source if forward_source is not None else 'Deleted Account'] += 1
+        if 'reply_to_message_id' in message:
+            self.reply_count += 1
+            self.repliers[author] += 1
+        if 'edited' in message:
+            self.edited_count += 1
+            self.editors[author] += 1
+
+        self._add_text(message)
+        self._add_date(message)
+
+    def _add_text(self, message: dict) -> None:
+        text = message.get('text', '')
+        length = len(text)
+        self.total_text_length += length
+        if length > self.longest_length:
+            self.longest_messages = [{'text': text, 'sender': message.get('from', 'Unknown')}]
+            self.longest_length = length
+        elif length == self.longest_length:
+            self.longest_messages.append({'text': text, 'sender': message.get('from', 'Unknown')})
+
+        if 'from' in message:
+            self.user_text_lengths[message['from']] += _text_length(text)
+            self.user_message_counts[message['from']] += 1
+
+        self._word_counter.add(text)
+
+    def _remove_text(self, message: dict) -> None:
+        text = message.get('text', '')
+        self.total_text_length -= len(text)
+        if 'from' in message:
+            self.user_text_lengths[message['from']] -= _text_length(text)
+            self.user_message_counts[message['from']] -= 1
+        self._word_counter.subtract(text)
+
+    def revise(self, message: dict) -> bool:
+        """
+        Replace an already counted message with its edited version.
+
+        Only the most recent `RECENT_MESSAGES` messages are remembered. Edits cannot be
+        applied to older messages, to approximate counters, or when they shorten the only
+        longest message; the statistics then have to be rebuilt from the whole export.
+
+        Args:
+        - message (dict): The edited message, with the same id as the counted one.
+
+        Returns:
+        - revised (bool): Whether the edit was applied. Nothing is changed when it was not.
+        """
+        previous = self._recent.get(message.get('id'))
+        if previous is None or isinstance(self.words, SpaceSaving):
+            return False
+        old_text, new_text = previous.get('text', ''), message.get('text', '')
+        if old_text != new_text and len(old_text) == self.longest_length and len(new_text) <= len(old_text):
+            return False
+
+        author = previous.get('from') if previous.get('from') is not None else 'Deleted Account'
+        if 'edited' in message and 'edited' not in previous:
+            self.edited_count += 1
+            self.editors[author] += 1
+        if message.get('edited', '') > self.last_edit:
+            self.last_edit = message['edited']
+        if old_text != new_text:
+            self._remove_text(previous)
+            self._add_text(message)
+
+        for attribute in ('oldest_message', 'latest_message'):
+            if getattr(self, attribute).get('id') == message['id']:
+                setattr(self, attribute, message)
+        self._recent[message['id']] = {field: message[field] for field in _REVISED_FIELDS if field in message}
+        return True
+
+    def _add_date(self, message: dict) -> None:
+        date = message.get('date')
+        if not date:
+            return
+        self._pending_dates.append(date)
+        self._pending_senders.append(message.get('from', 'Deleted Account') or None)
+        if len(self._pending_dates) >= _DATE_BLOCK:
+            self.flush()
+
+    def merge(self, other: 'ChatStats') -> 'ChatStats':
+        """
+        Add the statistics of another set of messages, e.g. the next shard of a split export
+        or another chat.
+
+        Merging is associative, and merging the statistics of consecutive shards in order
+        gives exactly the statistics of the whole export, ties included. The chat name,
+        type and id of `self` are kept.
+
+        Args:
+        - other (ChatStats): The statistics to add. It is flushed but otherwise left unchanged.
+
+        Returns:
+        - self (ChatStats): These statistics, updated.
+        """
+        self.flush()
+        other.flush()
+
+        self.messages_count += other.messages_count
+        if other.oldest_message['date'] < self.oldest_message['date']:
+            self.oldest_message = other.oldest_message
+        if other.latest_message['date'] > self.latest_message['date']:
+            self.latest_message = other.latest_message
+
+        for name in ('senders', 'forwarders', 'forward_sources', 'repliers', 'editors', 'words'):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            if isinstance(mine, SpaceSaving) and isinstance(theirs, SpaceSaving):
+                mine.merge(theirs)
+            elif isinstance(mine, SpaceSaving) or isinstance(theirs, SpaceSaving):
+                raise ValueError('Cannot merge exact and approximate statistics')
+            else:
+                mine.update(theirs)
+        self.forwarded_count += other.forwarded_count
+        self.reply_count += other.reply_count
+        self.edited_count += other.edited_count
+
+        if other.longest_length > self.longest_length:
+            self.longest_messages = list(other.longest_messages)
+            self.longest_length = other.longest_length
+        elif other.longest_length == self.longest_length:
+            self.longest_messages += other.longest_messages
+        self.total_text_length += other.total_text_length
+        for user, length in other.user_text_lengths.items():
+            self.user_text_lengths[user] += length
+        for user, count in other.user_message_counts.items():
+            self.user_message_counts[user] += count
+
+        for name in ('hours', 'days', 'weekdays', 'months', 'years', 'month_names'):
+            getattr(self, name).update(getattr(other, name))
+        for year, months in other.months_by_year.items():
+            self.months_by_year.setdefault(year, Counter()).update(months)
+        for user, dimensions in other.user_activity.items():
+            for dimension, counts in dimensions.items():
+                self.user_activity[user][dimension].update(counts)
+
+        self.last_message_id = max(self.last_message_id, other.last_message_id)
+        self.last_edit = max(self.last_edit, other.last_edit)
+        self.history = ''
+        recent = sorted([*self._recent.items(), *other._recent.items()], key=lambda item: item[0])
+        self._recent = OrderedDict(recent[-RECENT_MESSAGES:])
+        return self
+
+    def chart_view(self, top_n: int = 10) -> 'ChatStats':
+        """
+        Get a small copy of the statistics holding only what the charts draw.
+
+        Rankings keep their top `top_n` rows, in rank order, so charts of at most `top_n`
+        rows draw exactly what they would from the full statistics. The per-day, per-user
+        and per-message statistics are left out. The copy is what gets pickled to a render
+        worker instead of the whole export.
+
+        Args:
+        - top_n (int): Number of rows kept in each ranking.
+
+        Returns:
+        - view (ChatStats): The reduced statistics.
+        """
+        self.flush()
+        view = ChatStats(self.name, self.type, self.id)
+        view.messages_count = self.messages_count
+        for name in _RANKED_COUNTERS:
+            setattr(view, name, Counter(dict(top_k(getattr(self, name), top_n))))
+        view._word_counter = WordCounter(view.words)
+        for name in _CHART_COUNTERS:
+            setattr(view, name, Counter(getattr(self, name)))
+        view.months_by_year = {year: Counter(months) for year, months in self.months_by_year.items()}
+        return view
+
+    def flush(self) -> None:
+        """
+        Count the buffered message texts and bucket the buffered dates into the time counters.
+        """
+        self._word_counter.flush()
+        if not self._pending_dates:
+            return
+        seconds = to_epoch(self._pending_dates)
+        # Dates that could not be parsed are left out of the time counters.
+        valid = seconds != NAT
+        buckets = TimeBuckets(seconds[valid])
+        senders = [sender for sender, keep in zip(self._pending_senders, valid.tolist()) if keep]
+        self._pending_dates = []
+        self._pending_senders = []
+
+        count_into(self.hours, buckets.hour)
+        count_into(self.days, buckets.day, day_label)
+        count_into(self.weekdays, buckets.weekday, weekday_label)
+        count_into(self.months, buckets.month, month_label)
+        count_into(self.years, buckets.year, year_label)
+        count_into(self.month_names, buckets.month_of_year, month_name_label)
+
+        months, counts = first_seen_counts(buckets.month)
+        for month, count in zip(months.tolist(), counts.tolist()):
+            year = year_label(1970 + month // 12)
+            if year not in self.months_by_year:
+                self.months_by_year[year] = Counter()
+            self.months_by_year[year][MONTH_NAMES[month % 12]] += count
+
+        codes = {}
+        sender_codes = np.array([codes.setdefault(sender, len(codes)) if sender else -1 for sender in senders],
+                                dtype=np.int64)
+        names = list(codes)
+        active = sender_codes >= 0
+        for dimension, keys, label in (('Hour', buckets.hour, int),
+                                       ('Day', buckets.day, day_label),
+                                       ('Weekday', buckets.weekday, weekday_label),
+                                       ('Month', buckets.month, month_label)):
+            groups, values, counts = grouped_first_seen_counts(sender_codes[active], keys[active])
+            for code, value, count in zip(groups.tolist(), values.tolist(), counts.tolist()):
+                self.user_activity[names[code]][dimension][label(value)] += count
+
+
+def merge_stats(stats: list, name: str | None = None) -> ChatStats:
+    """
+    Combine the statistics of several shards or chats into new statistics.
+
+    Args:
+    - stats (list): The statistics to combine, in message order for shards of one export.
+    - name (str): Name of the combined chat. Defaults to the names of the distinct chats
+      joined by ' + '; the type and id are kept only when every part shares them.
+
+    Returns:
+    - combined (ChatStats): The combined statistics. The parts are left unchanged.
+    """
+    names = list(dict.fromkeys(part.name for part in stats))
+    types = {part.type for part in stats}
+    ids = {part.id for part in stats}
+    combined = ChatStats(
+        name or ' + '.join(str(part) for part in names),
+        types.pop() if len(types) == 1 else 'combined',
+        ids.pop() if len(ids) == 1 else 'combined',
+        stats[0].senders.capacity if stats and isinstance(stats[0].senders, SpaceSaving) else None
+    )
+    for part in stats:
+        combined.merge(part)
+    return combined
+
+
+def chat_stats(data) -> ChatStats:
+    """
+    Get the statistics for an export.
+
+    A loaded export is scanned on every call, so callers that run several analyses should
+    build its `ChatStats` once, e.g. with `load_stats` or `ChatStats.from_data`, and pass
+    that instead. Data that is already a `ChatStats` is returned as is.
+
+    Args:
+    - data (dict | ChatStats): The JSON data or its statistics.
+
+    Returns:
+    - stats (ChatStats): The statistics for the export.
+    """
+    if isinstance(data, ChatStats):
+        return data
+    return ChatStats.from_data(data)
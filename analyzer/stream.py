@@ -0,0 +1,165 @@
+import json
+import re
+from typing import Any, Iterator
+
+from analyzer.stats import ChatStats
+
+_WHITESPACE = re.compile(r'[ \t\n\r]*')
+_decoder = json.JSONDecoder()
+
+
+class _Reader:
+    """
+    A text buffer over a file that is refilled in chunks as values are decoded from it.
+    """
+
+    def __init__(self, file, chunk_size: int):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.pos = 0
+        # Characters dropped from the front of the buffer, so `offset + pos` is the position in the file.
+        self.offset = 0
+        self.eof = False
+
+    def fill(self) -> bool:
+        if self.eof:
+            return False
+        chunk = self.file.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.offset += self.pos
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """
+        Skip whitespace and return the next character without consuming it, or '' at the end.
+        """
+        while True:
+            self.pos = _WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self.fill():
+                return ''
+
+    def expect(self, char: str) -> None:
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """
+        Decode the next JSON value, reading more of the file until it is complete.
+        """
+        self.peek()
+        while True:
+            try:
+                value, end = _decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if self.fill():
+                    continue
+                raise
+            # A number or literal that touches the end of the buffer may continue in the next chunk.
+            if end == len(self.buffer) and self.fill():
+                continue
+            self.pos = end
+            return value
+
+
+def _read_message(reader: _Reader) -> dict:
+    """
+    Decode the next message, which must be a JSON object.
+    """
+    reader.peek()
+    start = reader.offset + reader.pos
+    message = reader.value()
+    if not isinstance(message, dict):
+        raise json.JSONDecodeError('Expecting a message object', reader.buffer, start - reader.offset)
+    return message
+
+
+def iter_messages(file_path: str, header: dict | None = None, chunk_size: int = 1 << 16) -> Iterator[dict]:
+    """
+    Yield the messages of an export one at a time without loading the whole file.
+
+    Only the message being decoded and one read chunk are held in memory. Every other
+    top-level key of the export (name, type, id, ...) is stored in `header` as it is read.
+
+    Args:
+    - file_path (str): The path to the JSON file.
+    - header (dict): Optional dictionary that receives the top-level keys other than messages.
+    - chunk_size (int): Number of characters read from the file at a time.
+
+    Yields:
+    - message (dict): Each message of the export, in file order.
+
+    Raises:
+    - json.JSONDecodeError: If the file is not a valid export, e.g. a message is not an object.
+    """
+    if header is None:
+        header = {}
+
+    with open(file_path, encoding='utf-8') as f:
+        reader = _Reader(f, chunk_size)
+        reader.expect('{')
+        if reader.peek() == '}':
+            return
+
+        while True:
+            key = reader.value()
+            reader.expect(':')
+            if key == 'messages':
+                reader.expect('[')
+                if reader.peek() == ']':
+                    reader.pos += 1
+                else:
+                    while True:
+                        yield _read_message(reader)
+                        char = reader.peek()
+                        reader.pos += 1
+                        if char == ']':
+                            break
+                        if char != ',':
+                            raise json.JSONDecodeError("Expecting ',' delimiter", reader.buffer, reader.pos - 1)
+            else:
+                header[key] = reader.value()
+
+            char = reader.peek()
+            reader.pos += 1
+            if char == '}':
+                return
+            if char != ',':
+                raise json.JSONDecodeError("Expecting ',' delimiter", reader.buffer, reader.pos - 1)
+
+
+def load_stats(file_path: str = 'result.json', sketch_size: int | None = None) -> ChatStats | None:
+    """
+    Build the statistics of an export while streaming it from disk.
+
+    Unlike `load_json` followed by `chat_stats`, the messages are never all in memory
+    at once, so the peak memory does not grow with the size of the export.
+
+    Args:
+    - file_path (str): The path to the JSON file.
+    - sketch_size (int): Count senders, forward sources and words approximately in bounded
+      memory, see `ChatStats`.
+
+    Returns:
+    - stats (ChatStats): The statistics of the export.
+    - None: If an error occurs during file opening or JSON parsing.
+    """
+    header = {}
+    stats = ChatStats(sketch_size=sketch_size)
+    try:
+        stats.update(iter_messages(file_path, header))
+    except (FileNotFoundError, UnicodeDecodeError, json.JSONDecodeError) as e:
+        print(f"An error occurred while loading the JSON file: {e}")
+        return None
+
+    stats.name = header.get('name', 'Unknown')
+    stats.type = header.get('type', 'Unknown')
+    stats.id = header.get('id', 'Unknown')
+    return stats
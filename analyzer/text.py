@@ -0,0 +1,108 @@
+import os
+import re
+from collections import Counter
+from functools import lru_cache
+from typing import Iterable
+
+STOPWORDS_FILE = os.path.join(os.path.dirname(__file__), 'data', 'stopwords_english.txt')
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]+\b')
+
+
+@lru_cache(maxsize=None)
+def get_stopwords() -> frozenset:
+    """
+    Returns the English stop words from NLTK's stopwords corpus, shipped with the package
+    so nothing is downloaded at runtime.
+    """
+    with open(STOPWORDS_FILE, encoding='utf-8') as file:
+        return frozenset(line.strip() for line in file if line.strip())
+
+
+def message_text(text) -> str:
+    """
+    Get the plain text of a message's text field.
+
+    Args:
+    - text (str | list | dict): The text field. Exports store formatted text as a list of
+      plain strings and entity dicts.
+
+    Returns:
+    - text (str): The text, with only the plain string parts of a formatted text kept.
+    """
+    if isinstance(text, list):
+        return ' '.join(str(item) for item in text if isinstance(item, str))
+    if isinstance(text, dict):
+        return str(text)
+    return text
+
+
+class WordCounter:
+    """
+    Counts words in message texts, excluding stop words.
+
+    Texts are collected into batches. Each batch is joined, lowercased and tokenized with
+    one regex scan, then counted with a single `Counter.update`. Words are counted in the
+    order they appear, so ties in `most_common` come out the same as when texts are
+    counted one by one.
+    """
+
+    def __init__(self, counts: Counter | None = None, stop_words: frozenset | None = None, batch_size: int = 4096):
+        """
+        Args:
+        - counts (Counter): Counter to add the words to. A new one is created when not given.
+        - stop_words (frozenset): Words to skip. Defaults to the English stop words.
+        - batch_size (int): Number of texts collected before they are counted.
+        """
+        self.counts = Counter() if counts is None else counts
+        self.stop_words = get_stopwords() if stop_words is None else stop_words
+        self.batch_size = batch_size
+        self._batch = []
+
+    def add(self, text) -> None:
+        """
+        Queue the text field of a message for counting.
+        """
+        text = message_text(text)
+        if text:
+            self._batch.append(text)
+            if len(self._batch) >= self.batch_size:
+                self.flush()
+
+    def update(self, texts: Iterable) -> None:
+        """
+        Count the words of several text fields.
+        """
+        for text in texts:
+            self.add(text)
+        self.flush()
+
+    def flush(self) -> None:
+        """
+        Count the queued texts.
+        """
+        if not self._batch:
+            return
+        # A newline is not a word character, so joining keeps every text's word boundaries.
+        batch = '\n'.join(self._batch).lower()
+        self._batch = []
+        stop_words = self.stop_words
+        self.counts.update(word for word in WORD_PATTERN.findall(batch) if word not in stop_words)
+
+    def subtract(self, text) -> None:
+        """
+        Uncount the words of a text field counted earlier, e.g. the old version of an edited message.
+        """
+        self.flush()
+        counts = self.counts
+        for word in WORD_PATTERN.findall(message_text(text).lower()):
+            if word in counts and word not in self.stop_words:
+                counts[word] -= 1
+                if counts[word] <= 0:
+                    del counts[word]
+
+    def most_common(self, top_n: int | None = None) -> list:
+        """
+        Get the most common words and their counts.
+        """
+        self.flush()
+        return self.counts.most_common(top_n)
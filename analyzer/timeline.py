@@ -0,0 +1,141 @@
+import numpy as np
+
+MONTH_NAMES = ('Jan', 'Feb', 'Mar', 'Apr', 'May', 'Jun', 'Jul', 'Aug', 'Sep', 'Oct', 'Nov', 'Dec')
+WEEKDAY_NAMES = ('Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday')
+
+
+# The seconds `to_epoch` gives a date it cannot parse, the same as NumPy's NaT.
+NAT = np.iinfo(np.int64).min
+
+
+def to_epoch(dates) -> np.ndarray:
+    """
+    Parse ISO date strings into seconds since the epoch in one vectorized call.
+
+    When a date cannot be parsed, such as 'yesterday', the dates are parsed one by one and
+    that date becomes NAT.
+
+    Args:
+    - dates (list): Date strings such as '2023-05-01T12:30:00'.
+
+    Returns:
+    - seconds (ndarray): int64 array of seconds since 1970-01-01.
+    """
+    try:
+        return np.asarray(dates, dtype='datetime64[s]').astype(np.int64)
+    except (TypeError, ValueError):
+        return np.array([_to_seconds(date) for date in dates], dtype=np.int64)
+
+
+def _to_seconds(date) -> int:
+    try:
+        return int(np.datetime64(date, 's').astype(np.int64))
+    except (TypeError, ValueError):
+        return NAT
+
+
+class TimeBuckets:
+    """
+    The calendar fields of an array of epoch seconds, derived with integer arithmetic.
+
+    Attributes:
+    - hour (ndarray): Hour of the day, 0-23.
+    - day (ndarray): Days since 1970-01-01.
+    - weekday (ndarray): Day of the week, Monday is 0.
+    - month (ndarray): Months since January 1970.
+    - month_of_year (ndarray): Month of the year, January is 0.
+    - year (ndarray): The calendar year.
+    """
+
+    def __init__(self, seconds: np.ndarray):
+        self.seconds = seconds
+        self.hour = seconds // 3600 % 24
+        self.day = seconds // 86400
+        # 1970-01-01 was a Thursday, three days after a Monday.
+        self.weekday = (self.day + 3) % 7
+        self.month = seconds.astype('datetime64[s]').astype('datetime64[M]').astype(np.int64)
+        self.month_of_year = self.month % 12
+        self.year = self.month // 12 + 1970
+
+
+def day_label(day: int) -> str:
+    """
+    Format days since the epoch as 'YYYY-MM-DD'.
+    """
+    return str(np.datetime64(day, 'D'))
+
+
+def month_label(month: int) -> str:
+    """
+    Format months since January 1970 as 'YYYY-MM'.
+    """
+    return f'{1970 + month // 12:04d}-{month % 12 + 1:02d}'
+
+
+def year_label(year: int) -> str:
+    """
+    Format a year as 'YYYY'.
+    """
+    return f'{year:04d}'
+
+
+def weekday_label(weekday: int) -> str:
+    """
+    Get the English name of a weekday number.
+    """
+    return WEEKDAY_NAMES[weekday]
+
+
+def month_name_label(month_of_year: int) -> str:
+    """
+    Get the short English name of a month of the year.
+    """
+    return MONTH_NAMES[month_of_year]
+
+
+def first_seen_counts(keys: np.ndarray) -> tuple:
+    """
+    Count the distinct values of an array, listed in order of first appearance.
+
+    Feeding the result into a `Counter` leaves its keys in the same order as counting
+    the values one at a time would, so ties in `most_common` come out the same.
+
+    Args:
+    - keys (ndarray): The values to count.
+
+    Returns:
+    - (values, counts) (tuple): The distinct values and how often each occurs.
+    """
+    if keys.size == 0:
+        return keys[:0], np.zeros(0, dtype=np.int64)
+    values, first, counts = np.unique(keys, return_index=True, return_counts=True)
+    order = np.argsort(first, kind='stable')
+    return values[order], counts[order]
+
+
+def count_into(counter, keys: np.ndarray, label=int) -> None:
+    """
+    Add the histogram of `keys` to `counter`, labelling each key with `label`.
+    """
+    values, counts = first_seen_counts(keys)
+    for value, count in zip(values.tolist(), counts.tolist()):
+        counter[label(value)] += count
+
+
+def grouped_first_seen_counts(groups: np.ndarray, keys: np.ndarray) -> tuple:
+    """
+    Count the distinct (group, key) pairs of two arrays, in order of first appearance.
+
+    Args:
+    - groups (ndarray): Non-negative integer group codes, e.g. interned senders.
+    - keys (ndarray): Integer keys, e.g. the hour of each message.
+
+    Returns:
+    - (groups, keys, counts) (tuple): The distinct pairs and how often each occurs.
+    """
+    if keys.size == 0:
+        return groups[:0], keys[:0], np.zeros(0, dtype=np.int64)
+    base = keys.min()
+    span = keys.max() - base + 1
+    values, counts = first_seen_counts(groups.astype(np.int64) * span + (keys - base))
+    return values // span, values % span + base, counts
@@ -1,10 +1,14 @@
 import json
 from datetime import datetime
-from collections import defaultdict
-from collections import Counter
-import re
-from typing import Any, List, Tuple
-from nltk.corpus import stopwords
+from typing import Any
+
+import numpy as np
+
+from analyzer.columnar import MessageTable, rank, rank_codes
+from analyzer.ranking import RANK_LIMIT, top_k
+from analyzer.sketch import SpaceSaving
+from analyzer.stats import ChatStats, chat_stats
+from analyzer.timeline import MONTH_NAMES, WEEKDAY_NAMES, TimeBuckets
 
 def load_json(file_path: str = 'result.json') -> Any | None:
     """
@@ -31,11 +35,14 @@ def chat_info(data: dict) -> dict:
     Extract chat information from the JSON data.
 
     Args:
-    - data (dict): The JSON data.
+    - data (dict | ChatStats): The JSON data or its statistics.
 
     Returns:
     - chat_info (dict): Dictionary containing chat information.
     """
+    if isinstance(data, ChatStats):
+        return {'name': data.name, 'type': data.type, 'id': data.id, 'messages_count': data.messages_count}
+
     chat = data
     messages_count = len(data.get('messages', []))
 
@@ -60,13 +67,8 @@ def get_oldest_message(data: dict) -> dict:
     - oldest_message (dict): Dictionary containing the oldest message with full timestamp.
     """
 
-    oldest_message = {'date': '9999-12-31T23:59:59'}
-
-    for message in data.get('messages', []):
-        if 'date' in message and message['date'] < oldest_message['date']:
-            oldest_message = message
-
-    oldest_message['date'] = extract_date_info(oldest_message)
+    oldest_message = chat_stats(data).oldest_message
+    oldest_message = dict(oldest_message, date=extract_date_info(oldest_message))
 
     return oldest_message
 
@@ -107,36 +109,25 @@ def get_latest_message(data: dict) -> dict:
     Returns:
     - latest_message (dict): Dictionary containing the latest message with full timestamp.
     """
-    latest_message = {'date': '0000-01-01T00:00:00'}
-
-    for message in data.get('messages', []):
-        if 'date' in message and message['date'] > latest_message['date']:
-            latest_message = message
-
-    latest_message['date'] = extract_date_info(latest_message)
+    latest_message = chat_stats(data).latest_message
+    latest_message = dict(latest_message, date=extract_date_info(latest_message))
     return latest_message
 
 
-def get_senders(data: dict) -> list:
+def get_senders(data: dict, top_n: int | None = None) -> list:
     """
     Extracts the list of unique senders from the JSON data and ranks them by the number of messages they sent.
 
     Args:
     - data (dict): The JSON data.
+    - top_n (int): Number of top senders to return. All senders when None.
 
     Returns:
     - senders_ranked (list): List of dictionaries containing sender names and the total number of messages they sent.
     """
-    sender_count = defaultdict(int)
-
-    for message in data.get('messages', []):
-        if 'from' in message:
-            sender = message['from']
-            sender = sender if sender is not None else 'Deleted Account'
-            sender_count[sender] += 1
+    sender_count = chat_stats(data).senders
 
-    senders_ranked = [{'sender': sender, 'messages': count} for sender, count in
-                      sorted(sender_count.items(), key=lambda x: x[1], reverse=True)]
+    senders_ranked = [{'sender': sender, 'messages': count} for sender, count in top_k(sender_count, top_n)]
     return senders_ranked
 
 
@@ -150,11 +141,7 @@ def count_forwarded_messages(data: dict) -> int:
     Returns:
     - count (int): The number of forwarded messages.
     """
-    count = 0
-    for message in data.get('messages', []):
-        if 'forwarded_from' in message:
-            count += 1
-    return count
+    return chat_stats(data).forwarded_count
 
 
 def get_forwarded_messages(data: dict) -> list:
@@ -174,50 +161,40 @@ def get_forwarded_messages(data: dict) -> list:
     return forwarded_messages
 
 
-def get_forwarders(data: dict) -> dict:
+def get_forwarders(data: dict, top_n: int = RANK_LIMIT) -> dict:
     """
     Get a ranking of forwarders based on the number of messages they forwarded.
 
     Args:
     - data (dict): The JSON data.
+    - top_n (int): Number of top forwarders to return. Defaults to 100.
 
     Returns:
     - forwarder_ranking (dict): Dictionary containing forwarders ranked by the number of messages they forwarded.
     """
-    forwarder_count = defaultdict(int)
-
-    for message in data.get('messages', []):
-        if 'forwarded_from' in message:
-            forwarder = message['from']
-            forwarder = forwarder if forwarder is not None else 'Deleted Account'
-            forwarder_count[forwarder] += 1
+    forwarder_count = chat_stats(data).forwarders
 
-    sorted_forwarders = sorted(forwarder_count.items(), key=lambda x: x[1], reverse=True)[:100]
+    sorted_forwarders = top_k(forwarder_count, top_n)
     forwarder_ranking = dict(sorted_forwarders)
     return forwarder_ranking
 
 
-def get_forward_sources(data: dict) -> dict:
+def get_forward_sources(data: dict, top_n: int = RANK_LIMIT) -> dict:
     """
     Get a dictionary of users (forward sources) with the number of messages they are the source for,
     sorted from largest to smallest based on the number of messages.
 
     Args:
     - data (dict): The JSON data.
+    - top_n (int): Number of top forward sources to return. Defaults to 100.
 
     Returns:
     - forward_sources_count (dict): Dictionary of users with the number of messages they are the source for,
                                     sorted from largest to smallest based on the number of messages.
     """
-    forward_sources_count = defaultdict(int)
-
-    for message in data.get('messages', []):
-        if 'forwarded_from' in message:
-            forward_source = message['forwarded_from']
-            forward_source = forward_source if forward_source is not None else 'Deleted Account'
-            forward_sources_count[forward_source] += 1
+    forward_sources_count = chat_stats(data).forward_sources
 
-    sorted_forward_sources = sorted(forward_sources_count.items(), key=lambda x: x[1], reverse=True)[:100]
+    sorted_forward_sources = top_k(forward_sources_count, top_n)
     forward_sources_count = dict(sorted_forward_sources)
 
     return forward_sources_count
@@ -233,13 +210,7 @@ def count_replies(data: dict) -> int:
     Returns:
     - reply_count (int): The total number of replies.
     """
-    reply_count = 0
-
-    for message in data.get('messages', []):
-        if 'reply_to_message_id' in message:
-            reply_count += 1
-
-    return reply_count
+    return chat_stats(data).reply_count
 
 
 def get_replies(data: dict) -> list:
@@ -261,24 +232,20 @@ def get_replies(data: dict) -> list:
     return replies
 
 
-def get_repliers(data: dict) -> dict:
+def get_repliers(data: dict, top_n: int = RANK_LIMIT) -> dict:
     """
     Get a ranking of repliers based on the number of messages they replied to.
 
     Args:
     - data (dict): The JSON data.
+    - top_n (int): Number of top repliers to return. Defaults to 100.
 
     Returns:
     - replier_ranking (dict): Dictionary containing repliers ranked by the number of messages they replied to.
     """
-    replier_count = defaultdict(int)
+    replier_count = chat_stats(data).repliers
 
-    for message in data.get('messages', []):
-        replier = message.get('from', 'Deleted Account') if message.get('from') is not None else 'Deleted Account'
-        if 'reply_to_message_id' in message:
-            replier_count[replier] += 1
-
-    sorted_repliers = sorted(replier_count.items(), key=lambda x: x[1], reverse=True)[:100]
+    sorted_repliers = top_k(replier_count, top_n)
     replier_ranking = dict(sorted_repliers)
     return replier_ranking
 
@@ -293,13 +260,7 @@ def count_edited_messages(data: dict) -> int:
     Returns:
     - edited_count (int): The number of edited messages.
     """
-    edited_count = 0
-
-    for message in data.get('messages', []):
-        if 'edited' in message:
-            edited_count += 1
-
-    return edited_count
+    return chat_stats(data).edited_count
 
 
 def get_edited_messages(data: dict) -> list:
@@ -321,26 +282,20 @@ def get_edited_messages(data: dict) -> list:
     return edited_messages
 
 
-def get_editors(data: dict) -> dict:
+def get_editors(data: dict, top_n: int = RANK_LIMIT) -> dict:
     """
     Get a ranking of editors based on the number of edited messages.
 
     Args:
     - data (dict): The JSON data.
+    - top_n (int): Number of top editors to return. Defaults to 100.
 
     Returns:
     - editor_ranking (dict): Dictionary containing editors ranked by the number of edited messages.
     """
-    editor_count = defaultdict(int)
-
-    for message in data.get('messages', []):
-        if 'edited' in message:
-            editor = message.get('from')
-            if editor is None:
-                editor = 'Deleted Account'
-            editor_count[editor] += 1
+    editor_count = chat_stats(data).editors
 
-    sorted_editors = sorted(editor_count.items(), key=lambda x: x[1], reverse=True)[:100]
+    sorted_editors = top_k(editor_count, top_n)
     editor_ranking = dict(sorted_editors)
     return editor_ranking
 
@@ -355,30 +310,8 @@ def get_longest_messages(data: dict) -> list:
     Returns:
     - longest_messages (list): List of dictionaries containing the text and sender of the messages with the longest text.
     """
-    longest_messages = []
-    max_length = 0
-
-    for message in data.get('messages', []):
+    return list(chat_stats(data).longest_messages)
 
-        text = message.get('text', '')
-        length = len(text)
-        if length > max_length:
-            longest_messages = [{'text': text, 'sender': message.get('from', 'Unknown')}]
-            max_length = length
-        elif length == max_length:
-            longest_messages.append({'text': text, 'sender': message.get('from', 'Unknown')})
-
-    return longest_messages
-
-
-import nltk
-nltk.download('stopwords')
-
-def get_stopwords():
-    """
-    Returns a set of stop words using NLTK's stopwords corpus.
-    """
-    return set(stopwords.words('english'))
 
 def get_most_common_words(data: dict, top_n=10) -> list:
     """
@@ -392,23 +325,9 @@ def get_most_common_words(data: dict, top_n=10) -> list:
     Returns:
     - most_common_words (list): List of dictionaries containing the top N most common single words along with their occurrences.
     """
-    stop_words = get_stopwords()
-
-    words_count = Counter()
-
-    for message in data.get('messages', []):
-
-        text = message.get('text', '')
-        if isinstance(text, list):
-            text = ' '.join(str(item) for item in text if isinstance(item, str))
-        elif isinstance(text, dict):
-            text = str(text)
-
-        words = re.findall(r'\b[a-zA-Z]+\b', text.lower())
-        filtered_words = [word for word in words if word not in stop_words]
-        words_count.update(filtered_words)
+    words_count = chat_stats(data).words
 
-    most_common_words = words_count.most_common(top_n)
+    most_common_words = top_k(words_count, top_n)
 
     top_words_list = []
     for word, count in most_common_words:
@@ -416,6 +335,31 @@ def get_most_common_words(data: dict, top_n=10) -> list:
     return top_words_list
 
 
+def get_heavy_hitters(data: dict, counter: str = 'words', top_n: int = 10) -> list:
+    """
+    Get the most frequent senders, forward sources or words with error bounds on their counts.
+
+    Exact statistics report an error of 0. Statistics built with a `sketch_size` report
+    how much each count may overestimate the true count.
+
+    Args:
+    - data (dict | ChatStats): The JSON data or its statistics.
+    - counter (str): One of 'senders', 'forward_sources' or 'words'.
+    - top_n (int): Number of keys to return. All keys when None.
+
+    Returns:
+    - heavy_hitters (list): List of dictionaries with the key, its count and the error of the count.
+    """
+    if counter not in ('senders', 'forward_sources', 'words'):
+        raise ValueError(f"Unknown counter: {counter}")
+    counts = getattr(chat_stats(data), counter)
+    if isinstance(counts, SpaceSaving):
+        ranked = counts.heavy_hitters(top_n)
+    else:
+        ranked = [(key, count, 0) for key, count in top_k(counts, top_n)]
+    return [{'key': key, 'count': count, 'error': error} for key, count, error in ranked]
+
+
 def get_most_active_users(data: dict, top_n: int = 10) -> list:
     """
     Get the top N most active users based on the number of messages they sent, replacing None with "Deleted User".
@@ -427,28 +371,18 @@ def get_most_active_users(data: dict, top_n: int = 10) -> list:
     Returns:
     - top_active_users (list): List of dictionaries containing information about the top active users.
     """
-    user_message_count = defaultdict(int)
+    user_message_count = chat_stats(data).senders
 
-    for message in data.get('messages', []):
-        if 'from' in message:
-            sender = message['from']
-            sender = sender if sender is not None else 'Deleted Account'
-            user_message_count[sender] += 1
-
-    sorted_users = sorted(user_message_count.items(), key=lambda x: x[1], reverse=True)[:top_n]
+    sorted_users = top_k(user_message_count, top_n)
     top_active_users = [{'user': user, 'message_count': count} for user, count in sorted_users]
 
     return top_active_users
 
 
 def get_average_message_length(data):
-    total_length = 0
-    total_messages = 0
-
-    for message in data.get('messages', []):
-        text = message.get('text', '')
-        total_length += len(text)
-        total_messages += 1
+    stats = chat_stats(data)
+    total_length = stats.total_text_length
+    total_messages = stats.messages_count
 
     if total_messages == 0:
         return 0
@@ -458,17 +392,9 @@ def get_average_message_length(data):
 
 
 def each_average_message_length(data: dict) -> dict:
-    from collections import defaultdict
-    user_lengths = defaultdict(int)
-    user_counts = defaultdict(int)
-
-    for message in data.get('messages', []):
-        if 'from' in message:
-            message_text = message.get('text', '')
-            message_length = len(message_text) if isinstance(message_text, str) else sum(
-                len(part['text']) for part in message_text if isinstance(part, dict))
-            user_lengths[message['from']] += message_length
-            user_counts[message['from']] += 1
+    stats = chat_stats(data)
+    user_lengths = stats.user_text_lengths
+    user_counts = stats.user_message_counts
 
     average_lengths = {user: user_lengths[user] / user_counts[user] for user in user_lengths}
     return average_lengths
@@ -485,13 +411,9 @@ def get_most_active_hours(data: dict) -> list[tuple[Any, int]]:
     - active_hours (Counter): A Counter object with hours as keys and message counts as values.
     """
 
-    active_hours = Counter()
+    active_hours = chat_stats(data).hours
 
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        active_hours[message_date.hour] += 1
-
-    return active_hours.most_common()
+    return top_k(active_hours)
 
 
 def get_most_active_days(data: dict) -> list[tuple[Any, int]]:
@@ -505,13 +427,9 @@ def get_most_active_days(data: dict) -> list[tuple[Any, int]]:
     - active_days (Counter): A Counter object with days as keys and message counts as values.
     """
 
-    active_days = Counter()
+    active_days = chat_stats(data).days
 
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        active_days[message_date.strftime('%Y-%m-%d')] += 1
-
-    return active_days.most_common()
+    return top_k(active_days)
 
 
 def get_most_active_weekdays(data: dict) -> list[tuple[Any, int]]:
@@ -525,13 +443,9 @@ def get_most_active_weekdays(data: dict) -> list[tuple[Any, int]]:
     - active_weekdays (Counter): A Counter object with weekdays as keys and message counts as values.
     """
 
-    active_weekdays = Counter()
-
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        active_weekdays[message_date.strftime('%A')] += 1
+    active_weekdays = chat_stats(data).weekdays
 
-    return active_weekdays.most_common()
+    return top_k(active_weekdays)
 
 
 def get_most_active_months(data: dict) -> list[tuple[Any, int]]:
@@ -545,13 +459,9 @@ def get_most_active_months(data: dict) -> list[tuple[Any, int]]:
     - active_months (Counter): A Counter object with months as keys and message counts as values.
     """
 
-    active_months = Counter()
-
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        active_months[message_date.strftime('%Y-%m')] += 1
+    active_months = chat_stats(data).months
 
-    return active_months.most_common()
+    return top_k(active_months)
 
 
 def get_user_activity(data: dict) -> dict:
@@ -565,28 +475,13 @@ def get_user_activity(data: dict) -> dict:
     - user_activity (dict): Dictionary containing user activity information.
     """
 
-    user_activity = defaultdict(lambda: defaultdict(Counter))
-
-    for message in data.get('messages', []):
-        sender = message.get('from', 'Deleted Account')
-        timestamp = message.get('date')
-        if sender and timestamp:
-            message_date = datetime.fromisoformat(timestamp)
-            hour = message_date.hour
-            day = message_date.strftime('%Y-%m-%d')
-            weekday = message_date.strftime('%A')
-            month = message_date.strftime('%Y-%m')
-
-            user_activity[sender]['Hour'][hour] += 1
-            user_activity[sender]['Day'][day] += 1
-            user_activity[sender]['Weekday'][weekday] += 1
-            user_activity[sender]['Month'][month] += 1
+    user_activity = chat_stats(data).user_activity
 
     formatted_user_activity = {}
     for user, activity_info in user_activity.items():
         formatted_activity_info = {}
         for time_dimension, counts in activity_info.items():
-            most_active_info = counts.most_common(1)
+            most_active_info = top_k(counts, 1)
             if most_active_info:
                 most_active_time = most_active_info[0][0]
                 most_active_count = most_active_info[0][1]
@@ -619,13 +514,9 @@ def get_most_active_year(data: dict) -> list[tuple[Any, int]]:
     - active_years (Counter): A Counter object with years as keys and message counts as values.
     """
 
-    active_years = Counter()
-
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        active_years[message_date.strftime('%Y')] += 1
+    active_years = chat_stats(data).years
 
-    return active_years.most_common()
+    return top_k(active_years)
 
 
 def get_most_active_months_all_time(data: dict) -> list:
@@ -639,18 +530,9 @@ def get_most_active_months_all_time(data: dict) -> list:
     - active_months_list (list): A list of dictionaries with 'name' and 'messages' as keys.
     """
 
-    active_months = Counter()
-    month_names = {
-        '01': 'Jan', '02': 'Feb', '03': 'Mar', '04': 'Apr', '05': 'May', '06': 'Jun',
-        '07': 'Jul', '08': 'Aug', '09': 'Sep', '10': 'Oct', '11': 'Nov', '12': 'Dec'
-    }
-
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        month_num = message_date.strftime('%m')
-        active_months[month_names[month_num]] += 1
+    active_months = chat_stats(data).month_names
 
-    active_months_list = sorted([{'name': month, 'messages': count} for month, count in active_months.items()], key=lambda x: x['messages'], reverse=True)
+    active_months_list = [{'name': month, 'messages': count} for month, count in top_k(active_months)]
 
     return active_months_list
 
@@ -668,23 +550,178 @@ def get_most_active_months_by_year(data: dict) -> dict:
     """
 
     active_months_by_year = {}
-    month_names = {
-        '01': 'Jan', '02': 'Feb', '03': 'Mar', '04': 'Apr', '05': 'May', '06': 'Jun',
-        '07': 'Jul', '08': 'Aug', '09': 'Sep', '10': 'Oct', '11': 'Nov', '12': 'Dec'
-    }
 
-    for message in data.get('messages', []):
-        message_date = datetime.fromisoformat(message['date'])
-        year = message_date.strftime('%Y')
-        month_num = message_date.strftime('%m')
-        month_name = month_names[month_num]
+    for year, months_counter in chat_stats(data).months_by_year.items():
+        active_months_by_year[year] = [{'name': month, 'messages': count} for month, count in months_counter.items()]
 
-        if year not in active_months_by_year:
-            active_months_by_year[year] = Counter()
+    return active_months_by_year
 
-        active_months_by_year[year][month_name] += 1
 
-    for year, months_counter in active_months_by_year.items():
-        active_months_by_year[year] = [{'name': month, 'messages': count} for month, count in months_counter.items()]
+def get_senders_columnar(table: MessageTable) -> list:
+    """
+    Columnar variant of `get_senders` that counts with NumPy.
 
-    return active_months_by_year
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - senders_ranked (list): List of dictionaries containing sender names and the total number of messages they sent.
+    """
+    return [{'sender': sender, 'messages': count}
+            for sender, count in rank_codes(table.senders, table.sender_names, table.has_sender)]
+
+
+def get_most_active_users_columnar(table: MessageTable, top_n: int = 10) -> list:
+    """
+    Columnar variant of `get_most_active_users` that counts with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+    - top_n (int): The number of top users to return. Defaults to 10.
+
+    Returns:
+    - top_active_users (list): List of dictionaries containing information about the top active users.
+    """
+    return [{'user': user, 'message_count': count}
+            for user, count in rank_codes(table.senders, table.sender_names, table.has_sender, top_n)]
+
+
+def get_forwarders_columnar(table: MessageTable, top_n: int = RANK_LIMIT) -> dict:
+    """
+    Columnar variant of `get_forwarders` that counts with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+    - top_n (int): Number of top forwarders to return. Defaults to 100.
+
+    Returns:
+    - forwarder_ranking (dict): Dictionary containing forwarders ranked by the number of messages they forwarded.
+    """
+    return dict(rank_codes(table.senders, table.sender_names, table.is_forwarded, top_n))
+
+
+def get_forward_sources_columnar(table: MessageTable, top_n: int = RANK_LIMIT) -> dict:
+    """
+    Columnar variant of `get_forward_sources` that counts with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+    - top_n (int): Number of top forward sources to return. Defaults to 100.
+
+    Returns:
+    - forward_sources_count (dict): Dictionary of users with the number of messages they are the source for,
+                                    sorted from largest to smallest based on the number of messages.
+    """
+    return dict(rank_codes(table.sources, table.source_names, top_n=top_n))
+
+
+def get_repliers_columnar(table: MessageTable, top_n: int = RANK_LIMIT) -> dict:
+    """
+    Columnar variant of `get_repliers` that counts with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+    - top_n (int): Number of top repliers to return. Defaults to 100.
+
+    Returns:
+    - replier_ranking (dict): Dictionary containing repliers ranked by the number of messages they replied to.
+    """
+    return dict(rank_codes(table.senders, table.sender_names, table.is_reply, top_n))
+
+
+def get_editors_columnar(table: MessageTable, top_n: int = RANK_LIMIT) -> dict:
+    """
+    Columnar variant of `get_editors` that counts with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+    - top_n (int): Number of top editors to return. Defaults to 100.
+
+    Returns:
+    - editor_ranking (dict): Dictionary containing editors ranked by the number of edited messages.
+    """
+    return dict(rank_codes(table.senders, table.sender_names, table.is_edited, top_n))
+
+
+def get_most_active_hours_columnar(table: MessageTable) -> list[tuple[int, int]]:
+    """
+    Columnar variant of `get_most_active_hours` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_hours (list): List of (hour, message count) tuples from most to least active.
+    """
+    hours, counts = rank(TimeBuckets(table.valid_dates().astype(np.int64)).hour)
+    return [(int(hour), int(count)) for hour, count in zip(hours, counts)]
+
+
+def get_most_active_days_columnar(table: MessageTable) -> list[tuple[str, int]]:
+    """
+    Columnar variant of `get_most_active_days` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_days (list): List of ('YYYY-MM-DD', message count) tuples from most to least active.
+    """
+    days, counts = rank(table.valid_dates().astype('datetime64[D]'))
+    return [(str(day), int(count)) for day, count in zip(days, counts)]
+
+
+def get_most_active_weekdays_columnar(table: MessageTable) -> list[tuple[str, int]]:
+    """
+    Columnar variant of `get_most_active_weekdays` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_weekdays (list): List of (weekday name, message count) tuples from most to least active.
+    """
+    weekdays, counts = rank(TimeBuckets(table.valid_dates().astype(np.int64)).weekday)
+    return [(WEEKDAY_NAMES[weekday], int(count)) for weekday, count in zip(weekdays, counts)]
+
+
+def get_most_active_months_columnar(table: MessageTable) -> list[tuple[str, int]]:
+    """
+    Columnar variant of `get_most_active_months` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_months (list): List of ('YYYY-MM', message count) tuples from most to least active.
+    """
+    months, counts = rank(table.valid_dates().astype('datetime64[M]'))
+    return [(str(month), int(count)) for month, count in zip(months, counts)]
+
+
+def get_most_active_year_columnar(table: MessageTable) -> list[tuple[str, int]]:
+    """
+    Columnar variant of `get_most_active_year` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_years (list): List of ('YYYY', message count) tuples from most to least active.
+    """
+    years, counts = rank(table.valid_dates().astype('datetime64[Y]'))
+    return [(str(year), int(count)) for year, count in zip(years, counts)]
+
+
+def get_most_active_months_all_time_columnar(table: MessageTable) -> list:
+    """
+    Columnar variant of `get_most_active_months_all_time` that buckets the date column with NumPy.
+
+    Args:
+    - table (MessageTable): The export as a columnar table.
+
+    Returns:
+    - active_months_list (list): A list of dictionaries with 'name' and 'messages' as keys.
+    """
+    month_numbers, counts = rank(TimeBuckets(table.valid_dates().astype(np.int64)).month_of_year)
+    return [{'name': MONTH_NAMES[month], 'messages': int(count)} for month, count in zip(month_numbers, counts)]
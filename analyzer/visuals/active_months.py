@@ -1,4 +1,4 @@
-import uuid
+from io import BytesIO
 from datetime import datetime
 from matplotlib import cm
 import matplotlib.pyplot as plt
@@ -10,14 +10,17 @@ from analyzer.tools import (
     get_most_active_months_by_year,
 chat_info
 )
+from analyzer.visuals.engine import area_chart, bar_chart, line_chart, pie_chart
+from analyzer.visuals.output import save_figure
 
 
-def visualize_bar_chart_months(data: dict):
+def visualize_bar_chart_months(data: dict, buffer: BytesIO | None = None):
     """
     Visualize the most active months in the Telegram group for all months and all years using a bar chart.
 
     Args:
     - data (dict): The JSON data from the Telegram group export.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
     """
 
     active_months_list = get_most_active_months_all_time(data)
@@ -26,28 +29,18 @@ def visualize_bar_chart_months(data: dict):
     message_counts = [month['messages'] for month in active_months_list]
 
     # Plotting
-    plt.figure(figsize=(12, 6))
-    plt.bar(months, message_counts, color='skyblue')
-    plt.xlabel('Month')
-    plt.ylabel('Message Count')
-    plt.title(f'Most Active Months in the {chat_info(data)["name"]} (All Time)')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    file_name = f"bar_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
+    return bar_chart(months, message_counts,
+                     f'Most Active Months in the {chat_info(data)["name"]} (All Time)',
+                     'Month', 'Message Count', figsize=(12, 6), ha='right', buffer=buffer)
 
-    plt.close()
 
-    return file_name
-
-
-def visualize_line_chart_months(data: dict):
+def visualize_line_chart_months(data: dict, buffer: BytesIO | None = None):
     """
     Visualize the most active months in the Telegram group for all months and all years using a line chart.
 
     Args:
     - data (dict): The JSON data from the Telegram group export.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
     """
 
     active_months_list = get_most_active_months_all_time(data)
@@ -56,29 +49,18 @@ def visualize_line_chart_months(data: dict):
     message_counts = [month['messages'] for month in active_months_list]
 
     # Plotting
-    plt.figure(figsize=(12, 6))
-    plt.plot(months, message_counts, marker='o', color='skyblue', linestyle='-')
-    plt.xlabel('Month')
-    plt.ylabel('Message Count')
-    plt.title(f'Most Active Months in the {chat_info(data)["name"]} (All Time)')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.grid(True)
-    file_name = f"line_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
+    return line_chart(months, message_counts,
+                      f'Most Active Months in the {chat_info(data)["name"]} (All Time)',
+                      'Month', 'Message Count', figsize=(12, 6), buffer=buffer)
 
-    plt.close()
 
-    return file_name
-
-
-def visualize_area_chart_months(data: dict):
+def visualize_area_chart_months(data: dict, buffer: BytesIO | None = None):
     """
     Visualize the most active months in the Telegram group for all months and all years using an area chart.
 
     Args:
     - data (dict): The JSON data from the Telegram group export.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
     """
 
     active_months_list = get_most_active_months_all_time(data)
@@ -87,30 +69,18 @@ def visualize_area_chart_months(data: dict):
     message_counts = [month['messages'] for month in active_months_list]
 
     # Plotting
-    plt.figure(figsize=(12, 6))
-    plt.fill_between(months, message_counts, color='skyblue', alpha=0.4)
-    plt.plot(months, message_counts, color='skyblue', alpha=0.8, marker='o', linestyle='-')
-    plt.xlabel('Month')
-    plt.ylabel('Message Count')
-    plt.title(f'Most Active Months in the {chat_info(data)["name"]} (All Time)')
-    plt.xticks(rotation=45, ha='right')
-    plt.tight_layout()
-    plt.grid(True)
-    file_name = f"area_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
-
-    plt.close()
+    return area_chart(months, message_counts,
+                      f'Most Active Months in the {chat_info(data)["name"]} (All Time)',
+                      'Month', 'Message Count', figsize=(12, 6), buffer=buffer)
 
-    return file_name
 
-
-def visualize_pie_chart_months(data: dict):
+def visualize_pie_chart_months(data: dict, buffer: BytesIO | None = None):
     """
     Visualize the most active months in the Telegram group for all months and all years using a pie chart.
 
     Args:
     - data (dict): The JSON data from the Telegram group export.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
     """
 
     active_months_list = get_most_active_months_all_time(data)
@@ -118,20 +88,12 @@ def visualize_pie_chart_months(data: dict):
     months = [month['name'] for month in active_months_list]
     message_counts = [month['messages'] for month in active_months_list]
 
-    plt.figure(figsize=(8, 8))
-    plt.pie(message_counts, labels=months, autopct='%1.1f%%', startangle=140)
-    plt.axis('equal')
-    plt.title(f'Most Active Months in the {chat_info(data)["name"]} (All Time)')
-    file_name = f"pie_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
-
-    plt.close()
-
-    return file_name
+    return pie_chart(months, message_counts,
+                     f'Most Active Months in the {chat_info(data)["name"]} (All Time)',
+                     buffer=buffer)
 
 
-def visualize_most_active_months_trend(data: dict):
+def visualize_most_active_months_trend(data: dict, buffer: BytesIO | None = None):
     active_months = get_most_active_months(data)
 
     months = [datetime.strptime(month, '%Y-%m') for month, _ in active_months]
@@ -145,16 +107,10 @@ def visualize_most_active_months_trend(data: dict):
     plt.xticks(rotation=45)
     plt.tight_layout()
     plt.grid(True)
-    file_name = f"trend_chart_{uuid.uuid4()}.png"
+    return save_figure(buffer)
 
-    plt.savefig(file_name)
 
-    plt.close()
-
-    return file_name
-
-
-def visualize_top_10_most_active_months(data: dict):
+def visualize_top_10_most_active_months(data: dict, buffer: BytesIO | None = None):
     active_months = get_most_active_months(data)
 
     top_10_months = [month for month, _ in active_months[:10]]
@@ -176,16 +132,10 @@ def visualize_top_10_most_active_months(data: dict):
     cbar.set_label('Message Count')
 
     plt.tight_layout()
-    file_name = f"t10_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
-
-    plt.close()
+    return save_figure(buffer)
 
-    return file_name
 
-
-def visualize_most_active_months_by_year(data: dict):
+def visualize_most_active_months_by_year(data: dict, buffer: BytesIO | None = None):
     """
     Visualize the most active months in the Telegram group for each year using a grouped bar plot and export the data.
 
@@ -193,6 +143,7 @@ def visualize_most_active_months_by_year(data: dict):
     - data (dict): The JSON data from the Telegram group export.
     - export_excel (bool): Whether to export the data to an Excel file. Defaults to True.
     - export_json (bool): Whether to export the data to a JSON file. Defaults to True.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
     """
 
     active_months_by_year = get_most_active_months_by_year(data)
@@ -223,10 +174,4 @@ def visualize_most_active_months_by_year(data: dict):
     plt.xticks(index + bar_width * len(years) / 2, month_names)
     plt.legend(title='Year')
     plt.tight_layout()
-    file_name = f"byy_chart_{uuid.uuid4()}.png"
-
-    plt.savefig(file_name)
-
-    plt.close()
-
-    return file_name
+    return save_figure(buffer)
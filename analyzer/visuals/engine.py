@@ -0,0 +1,246 @@
+import colorsys
+import threading
+from io import BytesIO
+
+import numpy as np
+from matplotlib import colormaps, rcParams
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+
+from analyzer.visuals.output import save_figure
+
+_local = threading.local()
+
+
+class Template:
+    """
+    A figure with one axes on its own Agg canvas, reused for every chart of one kind and size.
+
+    Charts drawn through a template only update the data of its artists, the tick labels,
+    the labels and the title, instead of building a new figure through pyplot.
+    """
+
+    def __init__(self, figsize: tuple):
+        self.figure = Figure(figsize=figsize)
+        FigureCanvasAgg(self.figure)
+        self.axes = self.figure.add_subplot()
+        parameters = self.figure.subplotpars
+        self.subplotpars = {name: getattr(parameters, name)
+                            for name in ('left', 'right', 'bottom', 'top', 'wspace', 'hspace')}
+        self.artists = {}
+
+
+def get_template(kind: str, figsize: tuple) -> Template:
+    """
+    Get this thread's template for a kind of chart, e.g. 'line', at a figure size in inches.
+    """
+    templates = getattr(_local, 'templates', None)
+    if templates is None:
+        templates = _local.templates = {}
+    key = (kind, tuple(figsize))
+    template = templates.get(key)
+    if template is None:
+        template = templates[key] = Template(figsize)
+    return template
+
+
+def _begin(kind: str, figsize: tuple) -> Template:
+    template = get_template(kind, figsize)
+    # Undo what the previous chart changed: the color cycle and tight_layout's margins.
+    template.axes.set_prop_cycle(None)
+    template.figure.subplots_adjust(**template.subplotpars)
+    return template
+
+
+def _finish(template: Template, labels: list, title: str, xlabel: str, ylabel: str, rotation: float, ha: str,
+            grid: bool | dict, tight: bool, buffer: BytesIO | None) -> BytesIO:
+    ax = template.axes
+    ax.relim()
+    ax.autoscale_view()
+    # Category labels sit at 0, 1, 2... like the categorical axes pyplot builds for strings.
+    ax.set_xticks(range(len(labels)), labels, rotation=rotation, ha=ha)
+    ax.grid(False)
+    if grid:
+        # Start from the default style, as a previous chart may have drawn a dashed grid.
+        style = {'linestyle': rcParams['grid.linestyle'], 'alpha': rcParams['grid.alpha']}
+        ax.grid(True, **{**style, **(grid if isinstance(grid, dict) else {})})
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    if tight:
+        template.figure.tight_layout()
+    return save_figure(buffer, template.figure)
+
+
+def _line(template: Template, values: list, color: str | None, alpha: float | None):
+    line = template.artists.get('line')
+    if line is None:
+        line, = template.axes.plot([], [], marker='o', linestyle='-')
+        template.artists['line'] = line
+    line.set_data(range(len(values)), values)
+    line.set_color(color or 'C0')
+    line.set_alpha(alpha)
+    return line
+
+
+def line_chart(labels: list, values: list, title: str, xlabel: str, ylabel: str, figsize: tuple = (10, 6),
+               color: str | None = 'skyblue', rotation: float = 45, ha: str = 'right', grid: bool | dict = True,
+               tight: bool = True, buffer: BytesIO | None = None) -> BytesIO:
+    """
+    Draw values over category labels as a line with markers.
+
+    Args:
+    - labels (list): Category labels along the x axis.
+    - values (list): One value per label.
+    - title (str), xlabel (str), ylabel (str): Texts of the chart.
+    - figsize (tuple): Figure size in inches.
+    - color (str): Line color. The first color of the cycle when None.
+    - rotation (float), ha (str): Rotation and horizontal alignment of the x tick labels.
+    - grid (bool | dict): Whether to draw a grid, or the keyword arguments of `Axes.grid`.
+    - tight (bool): Whether to fit the layout with tight_layout.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
+
+    Returns:
+    - buffer (BytesIO): The PNG of the chart.
+    """
+    template = _begin('line', figsize)
+    _line(template, values, color, None)
+    return _finish(template, labels, title, xlabel, ylabel, rotation, ha, grid, tight, buffer)
+
+
+def area_chart(labels: list, values: list, title: str, xlabel: str, ylabel: str, figsize: tuple = (10, 6),
+               color: str = 'skyblue', rotation: float = 45, ha: str = 'right', grid: bool | dict = True,
+               tight: bool = True, buffer: BytesIO | None = None) -> BytesIO:
+    """
+    Draw values over category labels as a filled area under a line, see `line_chart`.
+    """
+    template = _begin('area', figsize)
+    ax = template.axes
+    positions = range(len(values))
+    # Filled areas cannot be updated in place before matplotlib 3.10, so the fill is redrawn.
+    fill = template.artists.pop('fill', None)
+    if fill is not None:
+        fill.remove()
+    template.artists['fill'] = ax.fill_between(positions, values, color=color, alpha=0.4)
+    _line(template, values, color, 0.8)
+    return _finish(template, labels, title, xlabel, ylabel, rotation, ha, grid, tight, buffer)
+
+
+def bar_chart(labels: list, values: list, title: str, xlabel: str, ylabel: str, figsize: tuple = (10, 6),
+              color: str | list = 'skyblue', rotation: float = 45, ha: str = 'center', grid: bool | dict = False,
+              tight: bool = True, buffer: BytesIO | None = None) -> BytesIO:
+    """
+    Draw values over category labels as vertical bars, see `line_chart`.
+
+    Args:
+    - color (str | list): Bar color, or colors used in turn.
+    """
+    template = _begin('bar', figsize)
+    colors = color if isinstance(color, list) else [color]
+    bars = template.artists.setdefault('bars', [])
+    for bar in bars[len(values):]:
+        bar.remove()
+    del bars[len(values):]
+    for index, (bar, value) in enumerate(zip(bars, values)):
+        bar.set_height(value)
+        bar.set_facecolor(colors[index % len(colors)])
+    if len(values) > len(bars):
+        start = len(bars)
+        extra = template.axes.bar(range(start, len(values)), values[start:],
+                                  color=[colors[index % len(colors)] for index in range(start, len(values))])
+        bars += extra.patches
+    return _finish(template, labels, title, xlabel, ylabel, rotation, ha, grid, tight, buffer)
+
+
+def ranked_palette(count: int, name: str = 'viridis') -> list:
+    """
+    Get `count` evenly spaced colors of a colormap, muted like seaborn's bar colors.
+
+    Matches the palette seaborn's barplot draws at its default saturation.
+    """
+    colors = colormaps[name](np.linspace(0, 1, count + 2)[1:-1])[:, :3]
+    muted = []
+    for red, green, blue in colors:
+        hue, lightness, saturation = colorsys.rgb_to_hls(red, green, blue)
+        muted.append(colorsys.hls_to_rgb(hue, lightness, saturation * 0.75))
+    return muted
+
+
+def ranked_bar_chart(labels: list, values: list, title: str, xlabel: str, ylabel: str, horizontal: bool = True,
+                     figsize: tuple = (10, 6), palette: str = 'viridis', buffer: BytesIO | None = None) -> BytesIO:
+    """
+    Draw a ranking as bars colored along a colormap, in the style of seaborn's barplot.
+
+    Args:
+    - labels (list): Ranked labels, the first drawn at the top or on the left.
+    - values (list): One value per label.
+    - title (str), xlabel (str), ylabel (str): Texts of the chart.
+    - horizontal (bool): Whether the bars grow to the right from labels on the y axis.
+    - figsize (tuple): Figure size in inches.
+    - palette (str): Name of the colormap the bar colors are taken from.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
+
+    Returns:
+    - buffer (BytesIO): The PNG of the chart.
+    """
+    template = _begin('barh' if horizontal else 'ranked_bar', figsize)
+    ax = template.axes
+    count = len(values)
+    colors = ranked_palette(count, palette)
+    bars = template.artists.setdefault('bars', [])
+    for bar in bars[count:]:
+        bar.remove()
+    del bars[count:]
+    if count > len(bars):
+        start = len(bars)
+        draw = ax.barh if horizontal else ax.bar
+        bars += draw(range(start, count), values[start:], 0.8).patches
+    for index, (bar, value) in enumerate(zip(bars, values)):
+        if horizontal:
+            bar.set_width(value)
+        else:
+            bar.set_height(value)
+        bar.set_facecolor(colors[index])
+
+    if horizontal:
+        ax.set_yticks(range(count), labels)
+        ax.set_ylim(count - 0.5, -0.5)
+    else:
+        ax.set_xticks(range(count), labels)
+        ax.set_xlim(-0.5, count - 0.5)
+    ax.relim()
+    ax.autoscale_view()
+    ax.set_xlabel(xlabel)
+    ax.set_ylabel(ylabel)
+    ax.set_title(title)
+    return save_figure(buffer, template.figure)
+
+
+def pie_chart(labels: list, values: list, title: str, figsize: tuple = (8, 8), colors: list | None = None,
+              buffer: BytesIO | None = None) -> BytesIO:
+    """
+    Draw the share of each label in a pie, with percentages.
+
+    Args:
+    - labels (list): Labels of the wedges.
+    - values (list): One value per label.
+    - title (str): Title of the chart.
+    - figsize (tuple): Figure size in inches.
+    - colors (list): Wedge colors. The color cycle when None.
+    - buffer (BytesIO): Optional buffer to reuse for the PNG.
+
+    Returns:
+    - buffer (BytesIO): The PNG of the chart.
+    """
+    template = _begin('pie', figsize)
+    ax = template.axes
+    # Wedges and their texts depend on every value, so they are the only artists redrawn.
+    for artist in template.artists.pop('pie', ()):
+        artist.remove()
+    # Removing artists leaves their extent in the data limits, which `axis('equal')` reads.
+    ax.relim()
+    wedges, texts, autotexts = ax.pie(values, labels=labels, autopct='%1.1f%%', startangle=140, colors=colors)
+    template.artists['pie'] = [*wedges, *texts, *autotexts]
+    ax.axis('equal')
+    ax.set_title(title)
+    return save_figure(buffer, template.figure)
@@ -0,0 +1,32 @@
+from io import BytesIO
+
+from matplotlib import pyplot as plt
+
+
+def save_figure(buffer: BytesIO | None = None, figure=None) -> BytesIO:
+    """
+    Save the current figure as a PNG into an in-memory buffer and close the figure.
+
+    Args:
+    - buffer (BytesIO): Buffer to reuse. Its previous content is discarded. A new
+      buffer is created when not given.
+    - figure (Figure): A figure to save instead of the current one. It is left open
+      so it can be drawn again, e.g. a chart template.
+
+    Returns:
+    - buffer (BytesIO): The buffer holding the PNG, positioned at the start.
+    """
+    if buffer is None:
+        buffer = BytesIO()
+    else:
+        buffer.seek(0)
+        buffer.truncate()
+
+    if figure is None:
+        plt.savefig(buffer, format='png')
+        plt.close()
+    else:
+        figure.savefig(buffer, format='png')
+
+    buffer.seek(0)
+    return buffer
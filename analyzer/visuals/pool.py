@@ -0,0 +1,199 @@
+import importlib
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Callable
+
+from analyzer.metrics import max_rss
+
+
+class RenderQueueFull(Exception):
+    """
+    Raised when a chart is submitted while the render queue is full.
+    """
+
+
+class RenderFuture(Future):
+    """
+    A future for the PNG bytes of a chart that also reports what rendering it cost in the
+    worker process.
+    """
+    cpu_seconds = 0.0
+    rss_growth_bytes = 0
+
+
+def resolve(render: Callable | str) -> Callable:
+    """
+    Get a render function from its dotted name, importing its module on first use.
+
+    Args:
+    - render (callable | str): A function, or a name like 'analyzer.visuals.active_hours.visualize_bar_hours'.
+
+    Returns:
+    - render (callable): The function.
+    """
+    if callable(render):
+        return render
+    module, name = render.rsplit('.', 1)
+    return getattr(importlib.import_module(module), name)
+
+
+def _render(render: Callable | str, data, kwargs: dict) -> tuple[bytes, float, int]:
+    memory, cpu = max_rss(), time.process_time()
+    png = resolve(render)(data, **kwargs).getvalue()
+    return png, time.process_time() - cpu, max(0, max_rss() - memory)
+
+
+def _resolve(done: Future, future: RenderFuture) -> None:
+    if done.cancelled():
+        future.set_exception(CancelledError())
+    elif done.exception() is not None:
+        future.set_exception(done.exception())
+    else:
+        png, future.cpu_seconds, future.rss_growth_bytes = done.result()
+        future.set_result(png)
+
+
+class RenderPool:
+    """
+    A pool of worker processes that render charts off the calling thread.
+
+    At most `max_pending` charts can be queued or rendering at once; further
+    submissions wait up to `timeout` seconds for a slot and then raise `RenderQueueFull`,
+    so a burst of requests cannot pile up unbounded work.
+
+    When a worker dies, e.g. killed for running out of memory, the charts it was drawing
+    fail with `BrokenProcessPool` and the next submission starts new workers.
+    """
+
+    def __init__(self, max_workers: int | None = None, max_pending: int = 32):
+        """
+        Args:
+        - max_workers (int): Number of worker processes. Defaults to the number of CPUs.
+        - max_pending (int): Maximum number of charts queued or rendering at once.
+        """
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._executor = None
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._pending_lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Forking a process that runs network threads is unsafe, so start clean workers.
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._executor
+
+    def _discard(self, executor: ProcessPoolExecutor) -> None:
+        """
+        Forget a broken executor, so the next submission starts new workers.
+        """
+        with self._lock:
+            if self._executor is executor:
+                self._executor = None
+
+    def submit(self, render: Callable | str, data, timeout: float = 0, **kwargs) -> RenderFuture:
+        """
+        Render a chart in a worker process.
+
+        Args:
+        - render (callable | str): A module-level visualize_* function returning a PNG buffer,
+          or its dotted name. Names are imported only in the worker, so the caller never
+          loads matplotlib.
+        - data (dict | ChatStats): The data passed to `render`.
+        - timeout (float): Seconds to wait for a free slot when the queue is full.
+        - kwargs: Extra keyword arguments for `render`, e.g. top_n.
+
+        Returns:
+        - future (RenderFuture): Resolves to the PNG bytes of the chart.
+
+        Raises:
+        - RenderQueueFull: If no slot became free within `timeout`.
+        - BrokenProcessPool: If new workers could not be started either.
+        """
+        acquired = self._slots.acquire(timeout=timeout) if timeout else self._slots.acquire(blocking=False)
+        if not acquired:
+            raise RenderQueueFull(f'{self.max_pending} charts are already pending')
+        with self._pending_lock:
+            self._pending += 1
+        try:
+            executor = self._get_executor()
+            try:
+                done = executor.submit(_render, render, data, kwargs)
+            except BrokenProcessPool:
+                self._discard(executor)
+                executor.shutdown(wait=False)
+                executor = self._get_executor()
+                done = executor.submit(_render, render, data, kwargs)
+        except BaseException:
+            self._release(None)
+            raise
+        future = RenderFuture()
+        future.set_running_or_notify_cancel()
+        done.add_done_callback(self._release)
+        done.add_done_callback(lambda _: self._check(done, executor))
+        done.add_done_callback(lambda _: _resolve(done, future))
+        return future
+
+    def _release(self, done: Future | None) -> None:
+        with self._pending_lock:
+            self._pending -= 1
+        self._slots.release()
+
+    def _check(self, done: Future, executor: ProcessPoolExecutor) -> None:
+        if not done.cancelled() and isinstance(done.exception(), BrokenProcessPool):
+            self._discard(executor)
+
+    def pending(self) -> int:
+        """
+        Get the number of charts queued or rendering.
+        """
+        with self._pending_lock:
+            return self._pending
+
+    def idle(self) -> bool:
+        """
+        Whether a worker process is free to start a chart right away.
+        """
+        return self.pending() < (self.max_workers or os.cpu_count() or 1)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Stop the worker processes.
+        """
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=wait, cancel_futures=not wait)
+                self._executor = None
+
+
+def when_all_done(futures: list[Future], callback: Callable[[list[Future]], None]) -> None:
+    """
+    Call `callback(futures)` once, as soon as every future has finished.
+
+    The callback runs on the thread that completes the last future, or right away on
+    the calling thread if they are all done already.
+    """
+    remaining = [len(futures)]
+    lock = threading.Lock()
+
+    def done(_):
+        with lock:
+            remaining[0] -= 1
+            last = remaining[0] == 0
+        if last:
+            callback(futures)
+
+    if not futures:
+        callback(futures)
+    for future in futures:
+        future.add_done_callback(done)
@@ -0,0 +1,168 @@
+"""
+Generate synthetic Telegram chat exports for benchmarking.
+
+The export is written one message at a time, so even 10M-message files are produced in
+constant memory. Sender activity and word frequencies follow a Zipf distribution, like
+real chats where a few members and words dominate.
+
+Usage:
+    python -m benchmarks.generate --messages 100000 -o benchmarks/fixtures/export_100k.json
+"""
+import argparse
+import json
+import random
+from datetime import datetime, timezone
+from itertools import accumulate
+
+VOCABULARY = (
+    'the be to of and a in that have i it for not on with he as you do at this but his by '
+    'from they we say her she or an will my one all would there their what so up out if '
+    'about who get which go me when make can like time no just him know take people into '
+    'year your good some could them see other than then now look only come its over think '
+    'also back after use two how our work first well way even new want because any these '
+    'give day most us telegram group message chat bot python data chart reply forward edit '
+    'channel link photo video sticker voice meeting tomorrow today thanks please question '
+    'answer project code release update version bug fix test deploy server client api user'
+).split()
+
+ENTITY_TYPES = ('bold', 'italic', 'link', 'mention', 'hashtag', 'code')
+
+
+def _cumulative_zipf(n: int, exponent: float = 1.1) -> list:
+    return list(accumulate(1 / (rank ** exponent) for rank in range(1, n + 1)))
+
+
+def _text(rng: random.Random, word_weights: list, max_words: int) -> str:
+    return ' '.join(rng.choices(VOCABULARY, cum_weights=word_weights, k=rng.randint(0, max_words)))
+
+
+def _rich_text(rng: random.Random, word_weights: list, max_words: int) -> tuple[list, list]:
+    """
+    Build a formatted text the way exports store it: plain strings mixed with entity dicts.
+    """
+    text, entities = [], []
+    for _ in range(rng.randint(1, 3)):
+        plain = _text(rng, word_weights, max_words // 2) + ' '
+        entity_type = rng.choice(ENTITY_TYPES)
+        entity = {'type': entity_type, 'text': _text(rng, word_weights, 3) or 'link'}
+        if entity_type == 'link':
+            entity['text'] = 'https://example.com/' + entity['text'].replace(' ', '-')
+        text += [plain, entity]
+        entities += [{'type': 'plain', 'text': plain}, entity]
+    return text, entities
+
+
+def generate_messages(count: int, senders: int = 200, sources: int = 50, forward_ratio: float = 0.15,
+                      reply_ratio: float = 0.25, edit_ratio: float = 0.05, rich_ratio: float = 0.1,
+                      service_ratio: float = 0.02, deleted_ratio: float = 0.01, max_words: int = 20,
+                      start: datetime = datetime(2019, 1, 1, tzinfo=timezone.utc), days: int = 1500,
+                      seed: int = 0):
+    """
+    Yield synthetic export messages in chronological order.
+
+    Args:
+    - count (int): Number of messages.
+    - senders (int): Number of distinct senders.
+    - sources (int): Number of distinct forward sources.
+    - forward_ratio (float): Share of messages that are forwarded.
+    - reply_ratio (float): Share of messages that are replies.
+    - edit_ratio (float): Share of messages that were edited.
+    - rich_ratio (float): Share of messages whose text is a list of strings and entities.
+    - service_ratio (float): Share of service messages, e.g. pins and joins.
+    - deleted_ratio (float): Share of messages from deleted accounts, whose sender is null.
+    - max_words (int): Maximum number of words in a plain text.
+    - start (datetime): Date of the first message.
+    - days (int): Number of days the messages span.
+    - seed (int): Seed for the random generator, so the same arguments give the same export.
+
+    Returns:
+    - messages (Iterator): The messages, as dictionaries.
+    """
+    rng = random.Random(seed)
+    sender_names = [f'Member {i}' for i in range(1, senders + 1)]
+    sender_weights = _cumulative_zipf(senders)
+    source_names = [f'Channel {i}' for i in range(1, sources + 1)]
+    source_weights = _cumulative_zipf(sources)
+    word_weights = _cumulative_zipf(len(VOCABULARY))
+    step = days * 86400 / max(count, 1)
+    origin = start.timestamp()
+
+    for message_id in range(1, count + 1):
+        timestamp = int(origin + (message_id - 1) * step + rng.random() * step)
+        date = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        message = {'id': message_id, 'type': 'message', 'date': date, 'date_unixtime': str(timestamp)}
+
+        index = rng.choices(range(senders), cum_weights=sender_weights)[0]
+        name = None if rng.random() < deleted_ratio else sender_names[index]
+        if rng.random() < service_ratio:
+            message.update(type='service', actor=name, actor_id=f'user{index}',
+                           action=rng.choice(('pin_message', 'invite_members', 'join_group_by_link')),
+                           text='', text_entities=[])
+            yield message
+            continue
+
+        message['from'] = name
+        message['from_id'] = f'user{index}'
+        if rng.random() < forward_ratio:
+            message['forwarded_from'] = None if rng.random() < deleted_ratio else rng.choices(source_names, cum_weights=source_weights)[0]
+        if message_id > 1 and rng.random() < reply_ratio:
+            message['reply_to_message_id'] = rng.randint(max(1, message_id - 500), message_id - 1)
+        if rng.random() < edit_ratio:
+            edited = timestamp + rng.randint(10, 3600)
+            message['edited'] = datetime.fromtimestamp(edited, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+            message['edited_unixtime'] = str(edited)
+
+        if rng.random() < rich_ratio:
+            message['text'], message['text_entities'] = _rich_text(rng, word_weights, max_words)
+        else:
+            text = _text(rng, word_weights, max_words)
+            message['text'] = text
+            message['text_entities'] = [{'type': 'plain', 'text': text}] if text else []
+        yield message
+
+
+def write_export(file_path: str, count: int, name: str = 'Benchmark Group', chat_type: str = 'private_supergroup',
+                 chat_id: int = 1000000001, **options) -> None:
+    """
+    Write a synthetic export to disk, one message at a time.
+
+    Args:
+    - file_path (str): Where to write the export.
+    - count (int): Number of messages.
+    - name (str): The chat name.
+    - chat_type (str): The chat type.
+    - chat_id (int): The chat id.
+    - options: Passed to `generate_messages`.
+    """
+    with open(file_path, 'w', encoding='utf-8') as f:
+        f.write('{\n "name": %s,\n "type": %s,\n "id": %d,\n "messages": [' % (
+            json.dumps(name, ensure_ascii=False), json.dumps(chat_type), chat_id))
+        separator = '\n  '
+        for message in generate_messages(count, **options):
+            f.write(separator)
+            f.write(json.dumps(message, ensure_ascii=False))
+            separator = ',\n  '
+        f.write('\n ]\n}\n')
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Generate a synthetic Telegram chat export.')
+    parser.add_argument('--messages', type=int, default=100000, help='Number of messages.')
+    parser.add_argument('--senders', type=int, default=200, help='Number of distinct senders.')
+    parser.add_argument('--sources', type=int, default=50, help='Number of distinct forward sources.')
+    parser.add_argument('--forward-ratio', type=float, default=0.15, help='Share of forwarded messages.')
+    parser.add_argument('--reply-ratio', type=float, default=0.25, help='Share of replies.')
+    parser.add_argument('--edit-ratio', type=float, default=0.05, help='Share of edited messages.')
+    parser.add_argument('--rich-ratio', type=float, default=0.1, help='Share of messages with formatted text.')
+    parser.add_argument('--seed', type=int, default=0, help='Random seed.')
+    parser.add_argument('-o', '--output', required=True, help='Where to write the export.')
+    args = parser.parse_args()
+
+    write_export(args.output, args.messages, senders=args.senders, sources=args.sources,
+                 forward_ratio=args.forward_ratio, reply_ratio=args.reply_ratio, edit_ratio=args.edit_ratio,
+                 rich_ratio=args.rich_ratio, seed=args.seed)
+    print(f'Wrote {args.messages} messages to {args.output}')
+
+
+if __name__ == '__main__':
+    main()
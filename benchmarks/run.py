@@ -0,0 +1,232 @@
+"""
+Time every analysis in analyzer.tools and every chart in analyzer.visuals against synthetic exports.
+
+Each benchmark reports its best wall time over `--repeat` runs, its throughput in messages
+per second and, unless `--no-memory` is given, its peak traced memory. Charts are drawn from
+statistics built beforehand, so they report no throughput. tracemalloc only sees this
+process, so the parallel loaders report no peak memory. Results can be saved
+as a baseline and later runs compared against it; timings slower than the baseline by more
+than `--threshold` are reported as regressions and make the run exit with status 1.
+
+Usage:
+    python -m benchmarks.run --messages 10000 100000 --charts --save-baseline
+    python -m benchmarks.run --messages 10000 100000 --charts
+"""
+import argparse
+import gc
+import importlib
+import inspect
+import json
+import os
+import pkgutil
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Callable
+
+from benchmarks.generate import write_export
+
+FIXTURE_DIR = os.path.join(os.path.dirname(__file__), 'fixtures')
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+
+# Functions that take something other than a whole export.
+SKIPPED = {'load_json', 'extract_date_info'}
+# Benchmarks that do most of their work in worker processes, out of tracemalloc's sight.
+MULTIPROCESS = {'load.load_stats_parallel', 'compute.chat_stats_parallel'}
+
+
+def fixture_path(count: int) -> str:
+    """
+    Get the path of the synthetic export with `count` messages, generating it on first use.
+    """
+    path = os.path.join(FIXTURE_DIR, f'export_{count}.json')
+    if not os.path.exists(path):
+        os.makedirs(FIXTURE_DIR, exist_ok=True)
+        print(f'Generating {path}...', file=sys.stderr)
+        write_export(path + '.tmp', count)
+        os.replace(path + '.tmp', path)
+    return path
+
+
+def measure(fn: Callable, repeat: int, memory: bool) -> dict:
+    """
+    Run `fn` `repeat` times and report its best wall time and, optionally, its peak memory.
+    """
+    best = float('inf')
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+
+    result = {'seconds': best}
+    if memory:
+        gc.collect()
+        tracemalloc.start()
+        try:
+            fn()
+            result['peak_bytes'] = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+def tools_benchmarks(data: dict, table) -> dict:
+    """
+    Collect a call for every analysis in analyzer.tools, keyed by function name.
+
+    Row-based functions get the loaded export, so each call scans every message into its
+    statistics and then reads its result from them. Columnar variants get the message table.
+    """
+    from analyzer import tools
+
+    benchmarks = {}
+    for name, fn in inspect.getmembers(tools, inspect.isfunction):
+        if fn.__module__ != tools.__name__ or name.startswith('_') or name in SKIPPED:
+            continue
+        argument = table if name.endswith('_columnar') else data
+        benchmarks[f'tools.{name}'] = lambda fn=fn, argument=argument: fn(argument)
+    return benchmarks
+
+
+def chart_benchmarks(stats) -> dict:
+    """
+    Collect a call for every visualize_* function in analyzer.visuals, keyed by dotted name.
+
+    Charts are drawn from statistics built once, like the bot does, so they measure rendering.
+    """
+    import matplotlib
+    matplotlib.use('Agg')
+    import analyzer.visuals
+
+    benchmarks = {}
+    for module_info in pkgutil.iter_modules(analyzer.visuals.__path__):
+        module = importlib.import_module(f'analyzer.visuals.{module_info.name}')
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and name.startswith('visualize'):
+                benchmarks[f'visuals.{module_info.name}.{name}'] = lambda fn=fn: fn(stats)
+    return benchmarks
+
+
+def run_fixture(path: str, repeat: int, memory: bool, charts: bool, only: str | None) -> dict:
+    """
+    Run every benchmark against one export.
+
+    Returns:
+    - results (dict): Benchmark name -> measurements, including messages per second.
+    """
+    from analyzer.columnar import MessageTable, load_table
+    from analyzer.parallel import chat_stats_parallel, load_stats_parallel
+    from analyzer.stats import ChatStats
+    from analyzer.stream import load_stats
+    from analyzer.tools import load_json
+
+    data = load_json(path)
+    count = len(data['messages'])
+    table = MessageTable.from_data(data)
+
+    benchmarks = {
+        'load.load_json': lambda: load_json(path),
+        'load.load_stats': lambda: load_stats(path),
+        'load.load_stats_parallel': lambda: load_stats_parallel(path),
+        'load.load_table': lambda: load_table(path),
+        'compute.ChatStats.from_data': lambda: ChatStats.from_data(data),
+        'compute.chat_stats_parallel': lambda: chat_stats_parallel(data),
+        'compute.MessageTable.from_data': lambda: MessageTable.from_data(data),
+    }
+    benchmarks.update(tools_benchmarks(data, table))
+    if charts:
+        benchmarks.update(chart_benchmarks(ChatStats.from_data(data)))
+
+    results = {}
+    for name, fn in benchmarks.items():
+        if only and only not in name:
+            continue
+        result = measure(fn, repeat, memory and name not in MULTIPROCESS)
+        if not name.startswith('visuals.'):
+            result['messages_per_second'] = count / result['seconds'] if result['seconds'] else None
+        results[name] = result
+        print(format_row(name, result), file=sys.stderr)
+    return results
+
+
+def format_row(name: str, result: dict, baseline: dict | None = None) -> str:
+    row = f'{name:<70} {result["seconds"] * 1000:>10.2f} ms'
+    if result.get('messages_per_second'):
+        row += f' {result["messages_per_second"]:>14,.0f} msg/s'
+    if 'peak_bytes' in result:
+        row += f' {result["peak_bytes"] / 2 ** 20:>9.1f} MB'
+    if baseline:
+        row += f' {result["seconds"] / baseline["seconds"]:>7.2f}x'
+    return row
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """
+    Find benchmarks slower than the baseline by more than `threshold`.
+
+    Returns:
+    - regressions (list): (fixture, benchmark, baseline seconds, seconds) tuples.
+    """
+    regressions = []
+    for fixture, benchmarks in results.items():
+        for name, result in benchmarks.items():
+            previous = baseline.get(fixture, {}).get(name)
+            if previous and result['seconds'] > previous['seconds'] * (1 + threshold):
+                regressions.append((fixture, name, previous['seconds'], result['seconds']))
+    return regressions
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description='Benchmark the analyses and charts on synthetic exports.')
+    parser.add_argument('--messages', type=int, nargs='+', default=[10000, 100000],
+                        help='Export sizes to benchmark. Fixtures are generated on first use.')
+    parser.add_argument('--fixture', nargs='*', default=[], help='Existing export files to benchmark as well.')
+    parser.add_argument('--repeat', type=int, default=3, help='Runs per benchmark; the best time is kept.')
+    parser.add_argument('--charts', action='store_true', help='Also benchmark every chart.')
+    parser.add_argument('--no-memory', action='store_true', help='Skip the traced peak memory run.')
+    parser.add_argument('--only', help='Only run benchmarks whose name contains this text.')
+    parser.add_argument('--baseline', default=BASELINE_FILE, help='Baseline file to compare against.')
+    parser.add_argument('--save-baseline', action='store_true', help='Store these results as the baseline.')
+    parser.add_argument('--threshold', type=float, default=0.2, help='Allowed slowdown before reporting a regression.')
+    parser.add_argument('--json', help='Also write the results to this file.')
+    args = parser.parse_args()
+
+    paths = [fixture_path(count) for count in args.messages] + args.fixture
+    results = {}
+    for path in paths:
+        print(f'== {path}', file=sys.stderr)
+        results[os.path.basename(path)] = run_fixture(path, args.repeat, not args.no_memory, args.charts, args.only)
+
+    report = {'python': platform.python_version(), 'machine': platform.machine(), 'results': results}
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f'Saved baseline to {args.baseline}')
+        return
+
+    if not os.path.exists(args.baseline):
+        print(f'No baseline at {args.baseline}; run with --save-baseline to create one.')
+        return
+
+    with open(args.baseline) as f:
+        baseline = json.load(f)['results']
+    for fixture, benchmarks in results.items():
+        print(f'== {fixture}')
+        for name, result in benchmarks.items():
+            print(format_row(name, result, baseline.get(fixture, {}).get(name)))
+
+    regressions = compare(results, baseline, args.threshold)
+    for fixture, name, before, after in regressions:
+        print(f'REGRESSION {fixture} {name}: {before * 1000:.2f} ms -> {after * 1000:.2f} ms')
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
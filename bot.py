@@ -1,18 +1,33 @@
 import os
+import pickle
+import random
+import sys
+import threading
 import time
+import traceback
+from collections import Counter
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime, timedelta
-from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
+from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton, InputMediaPhoto
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
 from telegram.ext import (
     Updater,
     CommandHandler,
     CallbackContext,
     MessageHandler,
     Filters,
-    CallbackQueryHandler
+    CallbackQueryHandler,
+    PicklePersistence
 )
 
+from analyzer.cache import LRUCache, deep_size, result_key
+from analyzer.concurrency import Job, KeyedExecutor, QueueFull
+from analyzer.metrics import Metrics, serve
+from analyzer.prefetch import Transitions
+from analyzer.ranking import RANK_LIMIT
+from analyzer.snapshot import file_digest, load_export
 from analyzer.tools import (
-    load_json,
     chat_info,
     get_oldest_message,
     get_latest_message,
@@ -30,45 +45,75 @@ from analyzer.tools import (
     get_most_active_months_all_time,
     get_most_active_months_by_year
 )
-from analyzer.visuals.active_senders import (visualize_bar_chart,
-                                             visualize_pie_chart,
-                                             visualize_area_chart,
-                                             visualize_line__chart,
-                                             visualize_vertical_chart
-                                             )
-from analyzer.visuals.active_weekdays import (
-    visualize_most_active_weekdays_bar,
-
-    visualize_most_active_weekdays_pie)
-
-from analyzer.visuals.forwarders import (
-    visualize_forwarders_vertical_bar_chart,
-    visualize_forwarders_bar_chart,
-    visualize_forwarders_line_chart,
-    visualize_forwarders_pie_chart,
-    visualize_forwarders_area_chart
-)
+from analyzer.visuals.pool import RenderPool, RenderQueueFull, when_all_done
 
-from analyzer.visuals.repliers import (
-    visualize_bar_chart_repliers,
-    visualize_vertical_bar_chart_repliers,
-    visualize_pie_chart_repliers,
-    visualize_area_chart_repliers,
-    visualize_line_chart_repliers
+export_cache = LRUCache(
+    max_bytes=int(os.getenv('EXPORT_CACHE_BYTES', 512 * 1024 * 1024)),
+    ttl=float(os.getenv('EXPORT_CACHE_TTL', 1800))
 )
-from analyzer.visuals.editors import (
-    visualize_pie_chart_editors,
-    visualize_vertical_bar_chart_editors,
-    visualize_bar_chart_editors,
-    visualize_area_chart_editors,
-    visualize_line_chart_editors
+# Reply texts and chart images, keyed by export digest, analysis and parameters.
+result_cache = LRUCache(
+    max_bytes=int(os.getenv('RESULT_CACHE_BYTES', 256 * 1024 * 1024)),
+    ttl=float(os.getenv('RESULT_CACHE_TTL', 86400))
 )
-
-from analyzer.visuals.forward_sources import *
-from analyzer.visuals.common_words import visualize_most_common_words
-from analyzer.visuals.active_hours import *
-from analyzer.visuals.active_months import *
-from analyzer.visuals.active_years import *
+# Charts are drawn in worker processes so rendering never blocks the dispatcher threads.
+render_pool = RenderPool(
+    max_workers=int(os.getenv('RENDER_WORKERS', 0)) or None,
+    max_pending=int(os.getenv('RENDER_QUEUE_SIZE', 32))
+)
+_chart_jobs = {}
+metrics = Metrics(log_requests=os.getenv('METRICS_LOG', '1') != '0')
+# Handlers run concurrently across users but in order for each user. HANDLER_WORKERS=0
+# runs them on the dispatcher threads as before.
+HANDLER_WORKERS = int(os.getenv('HANDLER_WORKERS', min(32, (os.cpu_count() or 1) + 4)))
+handler_executor = KeyedExecutor(
+    max_workers=HANDLER_WORKERS or 1,
+    max_pending=int(os.getenv('HANDLER_QUEUE_SIZE', 256)),
+    timeout=float(os.getenv('HANDLER_QUEUE_TIMEOUT', 1))
+)
+_chart_jobs_lock = threading.RLock()
+# Reply texts of every analysis are built on these threads as soon as an export is uploaded,
+# so most button presses find them ready.
+precompute_executor = ThreadPoolExecutor(
+    max_workers=int(os.getenv('PRECOMPUTE_WORKERS', 2)) or 1,
+    thread_name_prefix='precompute'
+)
+_text_jobs = {}
+_text_jobs_lock = threading.Lock()
+# Presses per callback_data since start, to precompute the most popular analyses first.
+button_counts = Counter()
+_button_counts_lock = threading.Lock()
+# The public Bot API only serves files up to 20 MB. Exports are streamed, so the limit
+# can be raised when the bot talks to a local Bot API server (BOT_API_URL).
+MAX_FILE_SIZE = int(os.getenv('MAX_FILE_SIZE', 20971520))
+# Charts likely to be asked for next are rendered ahead of time while render workers are
+# idle, with at most PREFETCH_MAX_RENDERS of them in flight.
+PREFETCH_MAX_RENDERS = int(os.getenv('PREFETCH_MAX_RENDERS', 8))
+PREFETCH_MIN_PROBABILITY = float(os.getenv('PREFETCH_MIN_PROBABILITY', 0.3))
+_speculative_renders = 0
+# Charts whose speculative render failed, e.g. a pie chart with nothing to draw, so they
+# are not prefetched again. Each entry counts as one byte.
+_failed_renders = LRUCache(max_bytes=4096, ttl=None)
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+# Times a chart delivery is retried after a flood wait or a network error.
+SEND_RETRIES = int(os.getenv('SEND_RETRIES', 3))
+# The Bot API sends at most 10 photos per media group.
+MEDIA_GROUP_SIZE = 10
+# The charts rank at most this many rows, so only these are sent to the render workers.
+CHART_TOP_N = 10
+
+
+def get_export(file_path: str | None, digest: str, owner):
+    """
+    Get the statistics of an uploaded export, from memory, its on-disk snapshot or the file itself.
+
+    Older exports of the same chat are only reused when `owner` uploaded them too.
+    """
+    return export_cache.get_or_load(
+        digest,
+        lambda: load_export(file_path, SNAPSHOT_DIR, digest, owner),
+        size=deep_size
+    )
 
 
 def start(update: Update, context: CallbackContext) -> None:
@@ -156,15 +201,18 @@ def visualize(update: Update, context: CallbackContext) -> None:
 def handle_document(update: Update, context: CallbackContext) -> None:
     context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
     document = update.message.document
-    if document.file_size > 20971520:
-        update.message.reply_text("The file size exceeds the limit. Please upload a file smaller than 20 MB.")
+    if document.file_size > MAX_FILE_SIZE:
+        update.message.reply_text(
+            f"The file size exceeds the limit. Please upload a file smaller than {MAX_FILE_SIZE // 1048576} MB.")
         return
     if document.mime_type == 'application/json':
-
-        file_id = document.file_id
-        file = context.bot.get_file(file_id)
-        file_path = file.download()
-        data = load_json(file_path)
+        trace = metrics.trace('upload', user=update.effective_user.id, file_size=document.file_size)
+        with trace.stage('load'):
+            file_id = document.file_id
+            file = context.bot.get_file(file_id)
+            file_path = file.download()
+            digest = file_digest(file_path)
+            data = get_export(file_path, digest, update.effective_user.id)
         if data:
             buttons = [
                 InlineKeyboardButton("ChatInfo", callback_data='chat_info'),
@@ -186,717 +234,579 @@ def handle_document(update: Update, context: CallbackContext) -> None:
 
             keyboard = [buttons[i:i + 3] for i in range(0, len(buttons), 3)]
             reply_markup = InlineKeyboardMarkup(keyboard)
-            update.message.reply_text('Please select a functionality:', reply_markup=reply_markup)
+            precompute(data, digest)
+            with trace.stage('send'):
+                update.message.reply_text('Please select a functionality:', reply_markup=reply_markup)
             context.user_data['file_path'] = file_path
+            context.user_data['digest'] = digest
+            transitions.record(update.effective_user.id, 'upload')
+            trace.finish()
         else:
             update.message.reply_text("Failed to process the JSON file.")
+            trace.finish('failed')
     else:
         update.message.reply_text("Only JSON files are supported. Please send a JSON file.")
 
 
+def chat_info_text(data) -> str:
+    chat_info_dict = chat_info(data)
+    return (
+        f"Chat Name: {chat_info_dict['name']}\n"
+        f"Chat Type: {chat_info_dict['type']}\n"
+        f"Chat ID: {chat_info_dict['id']}\n"
+        f"Messages Count: {chat_info_dict['messages_count']}"
+    )
+
+
+def oldest_message_text(data) -> str:
+    oldest_date = get_oldest_message(data)['date']
+    formatted_date = f"{oldest_date['day']}/{oldest_date['month']}/{oldest_date['year']}"
+    return f"The oldest message in the chat was sent on {formatted_date}."
+
+
+def latest_message_text(data) -> str:
+    latest_date = get_latest_message(data)['date']
+    formatted_date = f"{latest_date['day']}/{latest_date['month']}/{latest_date['year']}"
+    return f"The latest message in the chat was sent on {formatted_date}."
+
+
+def rank_senders_text(data) -> str:
+    senders = get_senders(data, RANK_LIMIT)
+    senders_text = "Rank of Top 100 Senders:\n"
+    for index, sender in enumerate(senders, start=1):
+        senders_text += f"{index}. {sender['sender']} - Messages: {sender['messages']}\n"
+    return senders_text
+
+
+def rank_forwarders_text(data) -> str:
+    all_forwarders = count_forwarded_messages(data)
+    forwarders = get_forwarders(data)
+    forwarders_text = "Rank of Top 100 Forwarders:\n"
+    for index, (forwarder, count) in enumerate(forwarders.items(), start=1):
+        forwarders_text += f"{index}. {forwarder} - Forwarded Messages: {count}\n"
+    return f"Total forwarded messages: {all_forwarders}\n\n{forwarders_text}"
+
+
+def forward_sources_text(data) -> str:
+    forward_sources = get_forward_sources(data)
+    forward_sources_text = "Rank of Top 100 Forward Sources:\n"
+    for index, (forward_source, count) in enumerate(forward_sources.items(), start=1):
+        forward_sources_text += f"{index}. {forward_source} - Forwarded Messages: {count}\n"
+    return forward_sources_text
+
+
+def rank_repliers_text(data) -> str:
+    total_repliers = count_replies(data)
+    repliers_ranking = get_repliers(data)
+    repliers_text = f"Total replies: {total_repliers}\n\nRank of Top 100 Repliers:\n"
+    for index, (replier, count) in enumerate(repliers_ranking.items(), start=1):
+        repliers_text += f"{index}. {replier} - Replies Count: {count}\n"
+    return repliers_text
+
+
+def rank_editors_text(data) -> str:
+    total_edited_messages = count_edited_messages(data)
+    editors_ranking = get_editors(data)
+    editors_text = f"Total edited messages: {total_edited_messages}\n\nRank of Top 100 Editors:\n"
+    for index, (editor, count) in enumerate(editors_ranking.items(), start=1):
+        editors_text += f"{index}. {editor} - Edited Messages Count: {count}\n"
+    return editors_text
+
+
+def most_common_words_text(data) -> str:
+    most_common_words_list = get_most_common_words(data)
+    words_text = "Top 10 most common words:\n"
+    words_text += "{:<3} {:<15} {:<10}\n".format("No.", "Word", "Occurrence")
+    for index, word_info in enumerate(most_common_words_list, start=1):
+        words_text += f"{index:<3} {word_info['word']:<15} {word_info['occurrence']:<10}\n"
+    return words_text
+
+
+def most_active_hours_text(data) -> str:
+    active_hours = get_most_active_hours(data)
+    hours, counts = zip(*active_hours)
+    ethiopian_hours = [(datetime.strptime(str(hour), '%H') + timedelta(hours=3)).strftime('%I %p') for hour
+                       in hours]
+
+    hours_text = "Most active hours:\n"
+    for rank, (hour, count) in enumerate(zip(ethiopian_hours, counts), start=1):
+        hours_text += f"{rank}. {hour}: {count} Messages\n"
+    return hours_text
+
+
+def most_active_weekdays_text(data) -> str:
+    active_weekdays = get_most_active_weekdays(data)
+
+    weekdays_text = "Most active weekdays:\n\n"
+    for weekday, count in active_weekdays:
+        weekdays_text += f"{weekday}: {count} Messages\n"
+    return weekdays_text
+
+
+def most_active_months_text(data) -> str:
+    active_months = get_most_active_months(data)[:100]
+
+    months_text = "Most active months:\n\n"
+    for month, count in active_months:
+        months_text += f"{month}: {count} Messages\n"
+    return months_text
+
+
+def most_active_year_text(data) -> str:
+    active_years = get_most_active_year(data)[:100]
+
+    years_text = "Most active years:\n\n"
+    for year, count in active_years:
+        years_text += f"{year}: {count} Messages\n"
+    return years_text
+
+
+def most_active_months_all_time_text(data) -> str:
+    active_months_list = get_most_active_months_all_time(data)
+
+    months_text = "Most active months of all time:\n"
+    for index, month_info in enumerate(active_months_list, start=1):
+        months_text += f"{index}. {month_info['name']}: {month_info['messages']}\n"
+    return months_text
+
+
+def most_active_months_by_year_text(data) -> str:
+    active_months_by_year = get_most_active_months_by_year(data)
+
+    response_text = "Most active months by year:\n"
+    for year, months in active_months_by_year.items():
+        response_text += f"\n{year}:\n"
+        for index, month_info in enumerate(months, start=1):
+            response_text += f"    {index}. {month_info['name']}: {month_info['messages']}\n"
+    return response_text
+
+
+# callback_data -> (text builder, follow-up button as (label, callback_data) or None)
+ANALYSES = {
+    'chat_info': (chat_info_text, None),
+    'oldest_message': (oldest_message_text, None),
+    'latest_message': (latest_message_text, None),
+    'rank_senders': (rank_senders_text, ("Visualize Senders", 'visualize_senders')),
+    'rank_forwarders': (rank_forwarders_text, ("Visualize Forwarders", 'visualize_forwarders')),
+    'forward_sources': (forward_sources_text, ("Visualize Sources", 'visualize_sources')),
+    'rank_repliers': (rank_repliers_text, ("Visualize Repliers", 'visualize_repliers')),
+    'rank_editors': (rank_editors_text, ("Visualize Editors", 'visualize_editors')),
+    'most_common_words': (most_common_words_text, ("Visualize Words", 'visualize_words')),
+    'most_active_hours': (most_active_hours_text, ("Visualize Hours", 'visualize_hours')),
+    'most_active_weekdays': (most_active_weekdays_text, ("Visualize Weekdays", 'visualize_weekdays')),
+    'most_active_months': (most_active_months_text, ("Visualize Months", 'visualize_months')),
+    'most_active_year': (most_active_year_text, ("Visualize Years", 'visualize_years')),
+    'most_active_months_all_time': (most_active_months_all_time_text,
+                                    ("Visualize AllTimeMonths", 'visualize_months_all')),
+    'most_active_months_by_year': (most_active_months_by_year_text,
+                                   ("Visualize MonthsByYear", 'visualize_months_year')),
+}
+
+# callback_data -> charts sent in order, as (dotted name of the render function, caption).
+# The visuals are only imported by the render workers.
+CHARTS = {
+    'visualize_senders': [
+        ('analyzer.visuals.active_senders.visualize_bar_chart', 'Top 10 most active users based on the number of messages they sent.'),
+        ('analyzer.visuals.active_senders.visualize_pie_chart', 'Proportion of messages sent by each sender using a pie chart.'),
+        ('analyzer.visuals.active_senders.visualize_area_chart', 'Area chart '),
+        ('analyzer.visuals.active_senders.visualize_line__chart', None),
+    ],
+    'visualize_weekdays': [
+        ('analyzer.visuals.active_weekdays.visualize_most_active_weekdays_bar', 'The most active weekdays bar chart.'),
+        ('analyzer.visuals.active_weekdays.visualize_most_active_weekdays_pie', 'The most active weekdays pie chart.'),
+    ],
+    'visualize_forwarders': [
+        ('analyzer.visuals.forwarders.visualize_forwarders_bar_chart', 'The most active forwarders bar chart.'),
+        ('analyzer.visuals.forwarders.visualize_forwarders_pie_chart', 'The most active forwarders pie chart.'),
+        ('analyzer.visuals.forwarders.visualize_forwarders_line_chart', 'The most active forwarders line chart.'),
+        ('analyzer.visuals.forwarders.visualize_forwarders_vertical_bar_chart', 'The most active forwarders vertical bar chart.'),
+        ('analyzer.visuals.forwarders.visualize_forwarders_area_chart', 'The most active forwarders area chart.'),
+    ],
+    'visualize_repliers': [
+        ('analyzer.visuals.repliers.visualize_bar_chart_repliers', 'The most active repliers bar chart.'),
+        ('analyzer.visuals.repliers.visualize_pie_chart_repliers', 'The most active repliers pie chart.'),
+        ('analyzer.visuals.repliers.visualize_line_chart_repliers', 'The most active repliers line chart.'),
+        ('analyzer.visuals.repliers.visualize_vertical_bar_chart_repliers', 'The most active repliers vertical bar chart.'),
+        ('analyzer.visuals.repliers.visualize_area_chart_repliers', 'The most active repliers area chart.'),
+    ],
+    'visualize_editors': [
+        ('analyzer.visuals.editors.visualize_bar_chart_editors', 'The most active editors bar chart.'),
+        ('analyzer.visuals.editors.visualize_pie_chart_editors', 'The most active editors pie chart.'),
+        ('analyzer.visuals.editors.visualize_line_chart_editors', 'The most active editors line chart.'),
+        ('analyzer.visuals.editors.visualize_vertical_bar_chart_editors', 'The most active editors vertical bar chart.'),
+        ('analyzer.visuals.editors.visualize_area_chart_editors', 'The most active editors area chart.'),
+    ],
+    'visualize_sources': [
+        ('analyzer.visuals.forward_sources.visualize_bar_chart_sources', 'Top forward sources bar chart based on the number of messages they sent.'),
+        ('analyzer.visuals.forward_sources.visualize_pie_chart_sources', 'Proportion of messages forward sources  using a pie chart.'),
+        ('analyzer.visuals.forward_sources.visualize_area_chart_sources', 'Area chart '),
+        ('analyzer.visuals.forward_sources.visualize_line_chart_sources', None),
+    ],
+    'visualize_words': [
+        ('analyzer.visuals.common_words.visualize_most_common_words', 'Top 10 most common words in the chat.'),
+    ],
+    'visualize_hours': [
+        ('analyzer.visuals.active_hours.visualize_bar_hours', 'Active hours bar chart.'),
+        ('analyzer.visuals.active_hours.visualize_line_hours', 'Active hours line chart.'),
+    ],
+    'visualize_months': [
+        ('analyzer.visuals.active_months.visualize_most_active_months_trend', 'Active months trend chart.'),
+        ('analyzer.visuals.active_months.visualize_top_10_most_active_months', 'Top 10 most active months.'),
+    ],
+    'visualize_months_year': [
+        ('analyzer.visuals.active_months.visualize_most_active_months_by_year', 'Active months by year.'),
+    ],
+    'visualize_months_all': [
+        ('analyzer.visuals.active_months.visualize_bar_chart_months', 'Active months bar chart.'),
+        ('analyzer.visuals.active_months.visualize_line_chart_months', 'Active months line chart.'),
+        ('analyzer.visuals.active_months.visualize_pie_chart_months', 'Active months pie chart.'),
+        ('analyzer.visuals.active_months.visualize_area_chart_months', 'Active months area chart.'),
+    ],
+    'visualize_years': [
+        ('analyzer.visuals.active_years.visualize_message_trend_over_year', 'Active years bar chart.'),
+        ('analyzer.visuals.active_years.visualize_message_trend_over_year_bar', 'Active years bar chart.'),
+    ],
+}
+
+# Which button users press after which, starting from the chart button offered after each analysis.
+transitions = Transitions(prior={
+    analysis: follow_up[1] for analysis, (_, follow_up) in ANALYSES.items() if follow_up
+})
+
+
+def popular_analyses() -> list:
+    """
+    Get the analyses ordered by how often their buttons were pressed, most popular first.
+    """
+    with _button_counts_lock:
+        return sorted(ANALYSES, key=lambda analysis: -button_counts[analysis])
+
+
+def text_job(data, digest: str, analysis: str) -> Job:
+    """
+    Get the job building the reply text of an analysis, creating it unless one is already in flight.
+    """
+    key = result_key(digest, analysis)
+    with _text_jobs_lock:
+        job = _text_jobs.get(key)
+        if job is None:
+            build_text, _ = ANALYSES[analysis]
+            job = _text_jobs[key] = Job(build_text, data)
+            job.add_done_callback(lambda done: _finish_text(key, done))
+    return job
+
+
+def _finish_text(key: tuple, job: Job) -> None:
+    if not job.cancelled() and job.exception() is None:
+        result_cache.put(key, job.result(), sys.getsizeof(job.result()))
+    with _text_jobs_lock:
+        _text_jobs.pop(key, None)
+
+
+def precompute(data, digest: str) -> None:
+    """
+    Queue the reply texts of every analysis of an export in the background, most popular first.
+    """
+    for analysis in popular_analyses():
+        if result_cache.get(result_key(digest, analysis)) is None:
+            precompute_executor.submit(text_job(data, digest, analysis).run)
+
+
+def analysis_text(data, digest: str, analysis: str) -> str:
+    """
+    Get the reply text of an analysis, computing it only once per export content.
+
+    A text still being precomputed is waited for; one still queued is built right away
+    on the calling thread instead.
+    """
+    text = result_cache.get(result_key(digest, analysis))
+    if text is not None:
+        return text
+    return text_job(data, digest, analysis).run_or_wait()
+
+
+def chart_data(data, digest: str):
+    """
+    Get the reduced statistics the render workers draw charts from, built once per export content.
+    """
+    key = result_key(digest, 'chart_view', top_n=CHART_TOP_N)
+    view = result_cache.get(key)
+    if view is None:
+        view = data.chart_view(CHART_TOP_N)
+        result_cache.put(key, view, len(pickle.dumps(view)))
+    return view
+
+
+def chart_future(data, digest: str, render: str) -> Future:
+    """
+    Get a future for the PNG of a chart, rendering it in the pool only once per export content.
+
+    Raises RenderQueueFull when the render queue is full, and BrokenProcessPool when no
+    render worker could be started.
+    """
+    key = result_key(digest, render)
+    png = result_cache.get(key)
+    if png is not None:
+        future = Future()
+        future.set_result(png)
+        return future
+
+    with _chart_jobs_lock:
+        future = _chart_jobs.get(key)
+        if future is None:
+            future = render_pool.submit(render, chart_data(data, digest))
+            _chart_jobs[key] = future
+            future.add_done_callback(lambda done: _finish_chart(key, done))
+    return future
+
+
+def _finish_chart(key: tuple, future: Future) -> None:
+    with _chart_jobs_lock:
+        _chart_jobs.pop(key, None)
+    if not future.cancelled() and future.exception() is None:
+        result_cache.put(key, future.result(), len(future.result()))
+
+
+def prefetch_charts(data, digest: str, callback: str) -> None:
+    """
+    Render the charts of the buttons likely to be pressed after `callback`, while render
+    workers are idle and fewer than PREFETCH_MAX_RENDERS speculative renders are in flight.
+    Each successful speculative render schedules the next chart; charts that failed to
+    render are not prefetched again.
+    """
+    global _speculative_renders
+    for following, _ in transitions.predict(callback, PREFETCH_MIN_PROBABILITY):
+        for render, _ in CHARTS.get(following, ()):
+            key = result_key(digest, render)
+            if key in result_cache or key in _failed_renders:
+                continue
+            with _chart_jobs_lock:
+                if key in _chart_jobs:
+                    continue
+                if _speculative_renders >= PREFETCH_MAX_RENDERS or not render_pool.idle():
+                    return
+                try:
+                    future = chart_future(data, digest, render)
+                except (RenderQueueFull, BrokenProcessPool):
+                    return
+                _speculative_renders += 1
+            future.add_done_callback(lambda done, key=key: _finish_speculative(data, digest, callback, key, done))
+
+
+def _finish_speculative(data, digest: str, callback: str, key: tuple, future: Future) -> None:
+    global _speculative_renders
+    with _chart_jobs_lock:
+        _speculative_renders -= 1
+    if future.cancelled() or future.exception() is not None:
+        _failed_renders.put(key, True, 1)
+        return
+    prefetch_charts(data, digest, callback)
+
+
+def with_retries(send, *args, **kwargs):
+    """
+    Call a Bot API method, retrying it up to SEND_RETRIES times.
+
+    A flood wait (RetryAfter) is retried after the delay Telegram asks for. Other network
+    errors are retried after 1, 2, 4... seconds with jitter. Timeouts and bad requests are
+    raised at once, since a timed out upload may have gone through.
+    """
+    for attempt in range(SEND_RETRIES + 1):
+        try:
+            return send(*args, **kwargs)
+        except RetryAfter as e:
+            if attempt == SEND_RETRIES:
+                raise
+            time.sleep(e.retry_after + random.uniform(0, 1))
+        except (TimedOut, BadRequest):
+            raise
+        except NetworkError:
+            if attempt == SEND_RETRIES:
+                raise
+            time.sleep(2 ** attempt * random.uniform(0.5, 1.5))
+
+
+def send_charts(bot, chat_id: int, charts: list, trace) -> None:
+    """
+    Send the charts of one button as a single media group, each photo with its caption.
+    """
+    photos = [(future.result(), caption) for future, caption in charts
+              if not future.cancelled() and future.exception() is None]
+    failed = len(charts) - len(photos)
+    try:
+        with trace.stage('send'):
+            for start in range(0, len(photos), MEDIA_GROUP_SIZE):
+                group = photos[start:start + MEDIA_GROUP_SIZE]
+                if len(group) == 1:
+                    png, caption = group[0]
+                    with_retries(bot.send_photo, chat_id=chat_id, photo=png, caption=caption)
+                else:
+                    media = [InputMediaPhoto(png, caption=caption) for png, caption in group]
+                    with_retries(bot.send_media_group, chat_id=chat_id, media=media)
+            if failed:
+                text = "Failed to draw a chart." if failed == 1 else f"Failed to draw {failed} charts."
+                with_retries(bot.send_message, chat_id=chat_id, text=text)
+    except BaseException:
+        trace.finish('error')
+        raise
+    trace.finish('error' if failed else 'ok')
+
+
+def _record_render(trace, charts: list, started: float) -> None:
+    futures = [future for future, _ in charts]
+    trace.add(
+        'render',
+        time.perf_counter() - started,
+        sum(getattr(future, 'cpu_seconds', 0.0) for future in futures),
+        max((getattr(future, 'rss_growth_bytes', 0) for future in futures), default=0)
+    )
+
+
 def button_press(update: Update, context: CallbackContext) -> None:
     query = update.callback_query
     query.answer()
-    if query.data == 'chat_info':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                chat_info_dict = chat_info(data)
-                chat_info_text = (
-                    f"Chat Name: {chat_info_dict['name']}\n"
-                    f"Chat Type: {chat_info_dict['type']}\n"
-                    f"Chat ID: {chat_info_dict['id']}\n"
-                    f"Messages Count: {chat_info_dict['messages_count']}"
-                )
-                query.message.reply_text(chat_info_text)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'oldest_message':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                oldest_date = get_oldest_message(data)['date']
-                formatted_date = f"{oldest_date['day']}/{oldest_date['month']}/{oldest_date['year']}"
-                query.message.reply_text(f"The oldest message in the chat was sent on {formatted_date}.")
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'latest_message':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                latest_date = get_latest_message(data)['date']
-                formatted_date = f"{latest_date['day']}/{latest_date['month']}/{latest_date['year']}"
-                query.message.reply_text(f"The latest message in the chat was sent on {formatted_date}.")
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'rank_senders':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                senders = get_senders(data)[:100]
-                senders_text = "Rank of Top 100 Senders:\n"
-                for index, sender in enumerate(senders, start=1):
-                    senders_text += f"{index}. {sender['sender']} - Messages: {sender['messages']}\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Senders", callback_data='visualize_senders')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(senders_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'rank_forwarders':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                all_forwarders = count_forwarded_messages(data)
-                forwarders = get_forwarders(data)
-                forwarders_text = "Rank of Top 100 Forwarders:\n"
-                for index, (forwarder, count) in enumerate(forwarders.items(), start=1):
-                    forwarders_text += f"{index}. {forwarder} - Forwarded Messages: {count}\n"
-                reply_text = f"Total forwarded messages: {all_forwarders}\n\n{forwarders_text}"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Forwarders", callback_data='visualize_forwarders')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(reply_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'forward_sources':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                forward_sources = get_forward_sources(data)
-                forward_sources_text = "Rank of Top 100 Forward Sources:\n"
-                for index, (forward_source, count) in enumerate(forward_sources.items(), start=1):
-                    forward_sources_text += f"{index}. {forward_source} - Forwarded Messages: {count}\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Sources", callback_data='visualize_sources')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(forward_sources_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'rank_repliers':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                total_repliers = count_replies(data)
-                repliers_ranking = get_repliers(data)
-                repliers_text = f"Total replies: {total_repliers}\n\nRank of Top 100 Repliers:\n"
-                for index, (replier, count) in enumerate(repliers_ranking.items(), start=1):
-                    repliers_text += f"{index}. {replier} - Replies Count: {count}\n"
-
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Repliers", callback_data='visualize_repliers')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(repliers_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'rank_editors':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                total_edited_messages = count_edited_messages(data)
-                editors_ranking = get_editors(data)
-                editors_text = f"Total edited messages: {total_edited_messages}\n\nRank of Top 100 Editors:\n"
-                for index, (editor, count) in enumerate(editors_ranking.items(), start=1):
-                    editors_text += f"{index}. {editor} - Edited Messages Count: {count}\n"
-
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Editors", callback_data='visualize_editors')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(editors_text, reply_markup=reply_markup)
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'most_common_words':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                most_common_words_list = get_most_common_words(data)
-                words_text = "Top 10 most common words:\n"
-                words_text += "{:<3} {:<15} {:<10}\n".format("No.", "Word", "Occurrence")
-                for index, word_info in enumerate(most_common_words_list, start=1):
-                    words_text += f"{index:<3} {word_info['word']:<15} {word_info['occurrence']:<10}\n"
-
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Words", callback_data='visualize_words')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(words_text, reply_markup=reply_markup)
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'most_active_hours':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_hours = get_most_active_hours(data)
-                hours, counts = zip(*active_hours)
-                ethiopian_hours = [(datetime.strptime(str(hour), '%H') + timedelta(hours=3)).strftime('%I %p') for hour
-                                   in hours]
-
-                hours_text = "Most active hours:\n"
-                for rank, (hour, count) in enumerate(zip(ethiopian_hours, counts), start=1):
-                    hours_text += f"{rank}. {hour}: {count} Messages\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Hours", callback_data='visualize_hours')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(hours_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'most_active_weekdays':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_weekdays = get_most_active_weekdays(data)
-
-                weekdays_text = "Most active weekdays:\n\n"
-                for weekday, count in active_weekdays:
-                    weekdays_text += f"{weekday}: {count} Messages\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Weekdays", callback_data='visualize_weekdays')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(weekdays_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'most_active_months':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_months = get_most_active_months(data)
-
-                active_months = active_months[:100]
-
-                months_text = "Most active months:\n\n"
-                for month, count in active_months:
-                    months_text += f"{month}: {count} Messages\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Months", callback_data='visualize_months')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(months_text, reply_markup=reply_markup, )
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'most_active_year':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_years = get_most_active_year(data)
-
-                active_years = active_years[:100]
-
-                years_text = "Most active years:\n\n"
-                for year, count in active_years:
-                    years_text += f"{year}: {count} Messages\n"
-
-                keyboard = [
-                    [InlineKeyboardButton("Visualize Years", callback_data='visualize_years')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-
-                query.message.reply_text(years_text, reply_markup=reply_markup, )
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'most_active_months_all_time':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_months_list = get_most_active_months_all_time(data)
-
-                months_text = "Most active months of all time:\n"
-                for index, month_info in enumerate(active_months_list, start=1):
-                    months_text += f"{index}. {month_info['name']}: {month_info['messages']}\n"
-
-                keyboard = [
-                    [InlineKeyboardButton("Visualize AllTimeMonths", callback_data='visualize_months_all')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(months_text, reply_markup=reply_markup, )
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'most_active_months_by_year':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='typing')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                active_months_by_year = get_most_active_months_by_year(data)
-
-                response_text = "Most active months by year:\n"
-                for year, months in active_months_by_year.items():
-                    response_text += f"\n{year}:\n"
-                    for index, month_info in enumerate(months, start=1):
-                        response_text += f"    {index}. {month_info['name']}: {month_info['messages']}\n"
-                keyboard = [
-                    [InlineKeyboardButton("Visualize MonthsByYear", callback_data='visualize_months_year')],
-                ]
-                reply_markup = InlineKeyboardMarkup(keyboard)
-                query.message.reply_text(response_text, reply_markup=reply_markup)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_senders':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_bar_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='Top 10 most active users based on the number of messages they sent.')
-                os.remove(bar_chart_file)
-                pie_chart_file = visualize_pie_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='Proportion of messages sent by each sender using a pie chart.')
-                os.remove(pie_chart_file)
-                area_chart_file = visualize_area_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'),
-                    caption='Area chart ')
-                os.remove(area_chart_file)
-                line_chart_file = visualize_line__chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'), )
-                os.remove(line_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_weekdays':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_most_active_weekdays_bar(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='The most active weekdays bar chart.')
-                os.remove(bar_chart_file)
-                pie_chart_file = visualize_most_active_weekdays_pie(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='The most active weekdays pie chart.')
-                os.remove(pie_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_forwarders':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_forwarders_bar_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='The most active forwarders bar chart.')
-                os.remove(bar_chart_file)
-                pie_chart_file = visualize_forwarders_pie_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='The most active forwarders pie chart.')
-                os.remove(pie_chart_file)
-                line_chart_file = visualize_forwarders_line_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'),
-                    caption='The most active forwarders line chart.')
-                os.remove(line_chart_file)
-
-                vertical_chart_file = visualize_forwarders_vertical_bar_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(vertical_chart_file, 'rb'),
-                    caption='The most active forwarders vertical bar chart.')
-                os.remove(vertical_chart_file)
-
-                area_chart_file = visualize_forwarders_area_chart(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'),
-                    caption='The most active forwarders area chart.')
-                os.remove(area_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_repliers':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_bar_chart_repliers(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='The most active repliers bar chart.')
-                os.remove(bar_chart_file)
-
-                pie_chart_file = visualize_pie_chart_repliers(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='The most active repliers pie chart.')
-                os.remove(pie_chart_file)
-
-                line_chart_file = visualize_line_chart_repliers(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'),
-                    caption='The most active repliers line chart.')
-                os.remove(line_chart_file)
-
-                vertical_chart_file = visualize_vertical_bar_chart_repliers(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(vertical_chart_file, 'rb'),
-                    caption='The most active repliers vertical bar chart.')
-                os.remove(vertical_chart_file)
-
-                area_chart_file = visualize_area_chart_repliers(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'),
-                    caption='The most active repliers area chart.')
-                os.remove(area_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_editors':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_bar_chart_editors(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='The most active editors bar chart.')
-                os.remove(bar_chart_file)
-
-                pie_chart_file = visualize_pie_chart_editors(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='The most active editors pie chart.')
-                os.remove(pie_chart_file)
-
-                line_chart_file = visualize_line_chart_editors(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'),
-                    caption='The most active editors line chart.')
-                os.remove(line_chart_file)
-
-                vertical_chart_file = visualize_vertical_bar_chart_editors(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(vertical_chart_file, 'rb'),
-                    caption='The most active editors vertical bar chart.')
-                os.remove(vertical_chart_file)
-
-                area_chart_file = visualize_area_chart_editors(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'),
-                    caption='The most active editors area chart.')
-                os.remove(area_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_sources':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_bar_chart_sources(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='Top forward sources bar chart based on the number of messages they sent.')
-                os.remove(bar_chart_file)
-
-                pie_chart_file = visualize_pie_chart_sources(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'),
-                    caption='Proportion of messages forward sources  using a pie chart.')
-                os.remove(pie_chart_file)
-
-                area_chart_file = visualize_area_chart_sources(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'),
-                    caption='Area chart ')
-                os.remove(area_chart_file)
-
-                line_chart_file = visualize_line_chart_sources(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'), )
-                os.remove(line_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_words':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_most_common_words(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='Top 10 most common words in the chat.')
-                os.remove(bar_chart_file)
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-    elif query.data == 'visualize_hours':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                bar_chart_file = visualize_bar_hours(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='Active hours bar chart.')
-                os.remove(bar_chart_file)
-
-                line_chart_file = visualize_line_hours(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'), caption='Active hours line chart.')
-                os.remove(line_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_months':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-                months_trend_file = visualize_most_active_months_trend(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(months_trend_file, 'rb'), caption='Active months trend chart.')
-                os.remove(months_trend_file)
-
-                top_10_months_file = visualize_top_10_most_active_months(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(top_10_months_file, 'rb'), caption='Top 10 most active months.')
-                os.remove(top_10_months_file)
-
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_months_year':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-
-                months_per_year_file = visualize_most_active_months_by_year(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(months_per_year_file, 'rb'), caption='Active months by year.')
-                os.remove(months_per_year_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_months_all':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-
-                bar_chart_file = visualize_bar_chart_months(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(bar_chart_file, 'rb'),
-                    caption='Active months bar chart.')
-                os.remove(bar_chart_file)
-
-                line_chart_file = visualize_line_chart_months(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(line_chart_file, 'rb'), caption='Active months line chart.')
-                os.remove(line_chart_file)
-
-                pie_chart_file = visualize_pie_chart_months(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(pie_chart_file, 'rb'), caption='Active months pie chart.')
-                os.remove(pie_chart_file)
-
-                area_chart_file = visualize_area_chart_months(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(area_chart_file, 'rb'), caption='Active months area chart.')
-                os.remove(area_chart_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
-
-    elif query.data == 'visualize_years':
-        context.bot.send_chat_action(chat_id=update.effective_chat.id, action='upload_photo')
-        file_path = context.user_data.get('file_path')
-        if file_path:
-            data = load_json(file_path)
-            if data:
-
-                trend_chart_year = visualize_message_trend_over_year(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(trend_chart_year, 'rb'),
-                    caption='Active years bar chart.')
-                os.remove(trend_chart_year)
-
-                trend_bar_file = visualize_message_trend_over_year_bar(data)
-                context.bot.send_photo(
-                    chat_id=update.effective_chat.id,
-                    photo=open(trend_bar_file, 'rb'), caption='Active years bar chart.')
-                os.remove(trend_bar_file)
-            else:
-                query.message.reply_text("Failed to process the JSON file.")
-        else:
-            query.message.reply_text("No JSON file found.")
+    if query.data not in ANALYSES and query.data not in CHARTS:
+        query.message.reply_text("Invalid option selected.")
+        return
+    with _button_counts_lock:
+        button_counts[query.data] += 1
+    transitions.record(update.effective_user.id, query.data)
+
+    trace = metrics.trace(query.data, user=update.effective_user.id)
+    try:
+        _button_press(update, context, trace)
+    except BaseException:
+        trace.finish('error')
+        raise
 
+
+def _button_press(update: Update, context: CallbackContext, trace) -> None:
+    query = update.callback_query
+    action = 'upload_photo' if query.data in CHARTS else 'typing'
+    context.bot.send_chat_action(chat_id=update.effective_chat.id, action=action)
+    digest = context.user_data.get('digest')
+    if not digest:
+        query.message.reply_text("No JSON file found.")
+        trace.finish('no_file')
+        return
+    with trace.stage('load'):
+        data = get_export(context.user_data.get('file_path'), digest, update.effective_user.id)
+    if not data:
+        query.message.reply_text("Failed to process the JSON file.")
+        trace.finish('failed')
+        return
+
+    if query.data in ANALYSES:
+        _, follow_up = ANALYSES[query.data]
+        reply_markup = None
+        if follow_up:
+            label, callback_data = follow_up
+            reply_markup = InlineKeyboardMarkup([[InlineKeyboardButton(label, callback_data=callback_data)]])
+        with trace.stage('compute'):
+            text = analysis_text(data, digest, query.data)
+        prefetch_charts(data, digest, query.data)
+        with trace.stage('send'):
+            query.message.reply_text(text, reply_markup=reply_markup)
+        trace.finish()
     else:
-        query.message.reply_text("Invalid option selected.")
+        started = time.perf_counter()
+        try:
+            charts = [(chart_future(data, digest, render), caption) for render, caption in CHARTS[query.data]]
+        except RenderQueueFull:
+            query.message.reply_text("Too many charts are being drawn right now. Please try again in a moment.")
+            trace.finish('busy')
+            return
+        except BrokenProcessPool:
+            query.message.reply_text("Failed to draw the charts. Please try again.")
+            trace.finish('error')
+            return
+        chat_id = update.effective_chat.id
+
+        def deliver(futures):
+            _record_render(trace, charts, started)
+            context.dispatcher.run_async(send_charts, context.bot, chat_id, charts, trace)
+
+        when_all_done([future for future, _ in charts], deliver)
+        prefetch_charts(data, digest, query.data)
+
+
+def _report_error(future: Future) -> None:
+    if not future.cancelled() and future.exception() is not None:
+        traceback.print_exception(future.exception())
+
+
+def per_user(handler):
+    """
+    Wrap a handler so it runs on the handler executor, serialized per user.
+
+    Updates from the same user are handled one at a time in the order they arrived, so
+    their user_data is never touched by two threads at once. When the executor is full
+    the user is asked to retry.
+
+    The dispatcher saves user_data as soon as `submit` returns, before the handler ran,
+    so it is saved again once the handler is done, like `run_async` does.
+    """
+    if not HANDLER_WORKERS:
+        return handler
+
+    def run(update: Update, context: CallbackContext) -> None:
+        try:
+            handler(update, context)
+        finally:
+            context.dispatcher.update_persistence(update)
+
+    def submit(update: Update, context: CallbackContext) -> None:
+        user = update.effective_user or update.effective_chat
+        try:
+            handler_executor.submit(user.id if user else None, run, update, context).add_done_callback(_report_error)
+        except QueueFull:
+            if update.callback_query:
+                update.callback_query.answer("The bot is busy right now. Please try again in a moment.")
+            elif update.effective_message:
+                update.effective_message.reply_text("The bot is busy right now. Please try again in a moment.")
+
+    return submit
 
 
 def main() -> None:
-    updater = Updater(os.getenv('TOKEN'))
+    updater = Updater(
+        os.getenv('TOKEN'),
+        base_url=os.getenv('BOT_API_URL'),
+        base_file_url=os.getenv('BOT_API_FILE_URL'),
+        persistence=PicklePersistence(
+            filename=os.getenv('PERSISTENCE_FILE', 'bot_data.pickle'),
+            store_chat_data=False,
+            store_bot_data=False
+        )
+    )
     dispatcher = updater.dispatcher
-    dispatcher.add_handler(CommandHandler('start', start))
-    dispatcher.add_handler(CommandHandler('help', help))
-    dispatcher.add_handler(CommandHandler('visualize', visualize))
-    dispatcher.add_handler(MessageHandler(Filters.document, handle_document))
-    dispatcher.add_handler(MessageHandler(Filters.photo, filter_photos))
-    dispatcher.add_handler(MessageHandler(Filters.video, filter_videos))
-    dispatcher.add_handler(MessageHandler(Filters.audio, filter_audios))
-    dispatcher.add_handler(MessageHandler(Filters.voice, filter_voice))
-    dispatcher.add_handler(MessageHandler(Filters.location, filter_location))
-    dispatcher.add_handler(MessageHandler(Filters.contact, filter_contact))
-    dispatcher.add_handler(MessageHandler(Filters.sticker, filter_sticker))
-    dispatcher.add_handler(MessageHandler(Filters.poll, filter_poll))
-    dispatcher.add_handler(CallbackQueryHandler(button_press))
-
-    dispatcher.add_handler(MessageHandler(Filters.command, unknown_command))
-    dispatcher.add_handler(MessageHandler(Filters.text, unknown_text))
+    metrics_port = int(os.getenv('METRICS_PORT', 0))
+    if metrics_port:
+        serve(metrics, metrics_port, os.getenv('METRICS_HOST', '127.0.0.1'))
+    dispatcher.add_handler(CommandHandler('start', per_user(start)))
+    dispatcher.add_handler(CommandHandler('help', per_user(help)))
+    dispatcher.add_handler(CommandHandler('visualize', per_user(visualize)))
+    dispatcher.add_handler(MessageHandler(Filters.document, per_user(handle_document)))
+    dispatcher.add_handler(MessageHandler(Filters.photo, per_user(filter_photos)))
+    dispatcher.add_handler(MessageHandler(Filters.video, per_user(filter_videos)))
+    dispatcher.add_handler(MessageHandler(Filters.audio, per_user(filter_audios)))
+    dispatcher.add_handler(MessageHandler(Filters.voice, per_user(filter_voice)))
+    dispatcher.add_handler(MessageHandler(Filters.location, per_user(filter_location)))
+    dispatcher.add_handler(MessageHandler(Filters.contact, per_user(filter_contact)))
+    dispatcher.add_handler(MessageHandler(Filters.sticker, per_user(filter_sticker)))
+    dispatcher.add_handler(MessageHandler(Filters.poll, per_user(filter_poll)))
+    dispatcher.add_handler(CallbackQueryHandler(per_user(button_press)))
+
+    dispatcher.add_handler(MessageHandler(Filters.command, per_user(unknown_command)))
+    dispatcher.add_handler(MessageHandler(Filters.text, per_user(unknown_text)))
     updater.start_polling()
     updater.idle()
+    # Stop speculative renders so finishing charts do not schedule new ones during shutdown.
+    global PREFETCH_MAX_RENDERS
+    PREFETCH_MAX_RENDERS = 0
+    handler_executor.shutdown()
+    precompute_executor.shutdown(wait=False, cancel_futures=True)
+    render_pool.shutdown()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,13 @@
+import pytest
+
+from tests.exports import make_export, write_json
+
+
+@pytest.fixture(scope='session')
+def export() -> dict:
+    return make_export()
+
+
+@pytest.fixture(scope='session')
+def export_file(export, tmp_path_factory) -> str:
+    return write_json(tmp_path_factory.mktemp('exports') / 'result.json', export)
@@ -0,0 +1,127 @@
+"""
+Synthetic exports shared by the tests, and helpers to compare what is computed from them.
+"""
+import inspect
+import json
+import random
+from datetime import datetime, timezone
+
+from analyzer import tools
+from tests import baseline_tools
+
+WORDS = ('the chat python data chart reply forward edit group message bot and to of a in '
+         'meeting today thanks question answer release update fix test server').split()
+
+# Messages the generator never writes: non-ASCII text, text that looks like JSON and
+# formatted text made of entity dicts, so parsers meet them at every chunk boundary.
+EXTRA_MESSAGES = [
+    {'id': 3001, 'type': 'message', 'date': '2024-03-01T10:00:00', 'date_unixtime': '1709287200',
+     'from': 'Ĉiu Ŝanĝo 🎉', 'from_id': 'user900', 'text': 'Ĉu vi parolas? «quoted» \\ "escaped"',
+     'text_entities': [{'type': 'plain', 'text': 'Ĉu vi parolas? «quoted» \\ "escaped"'}]},
+    {'id': 3002, 'type': 'message', 'date': '2024-03-01T10:05:00', 'date_unixtime': '1709287500',
+     'from': 'Member 1', 'from_id': 'user0', 'text': '{"id": 7, "messages": [1, 2]} not a message',
+     'text_entities': [{'type': 'plain', 'text': '{"id": 7, "messages": [1, 2]} not a message'}]},
+    {'id': 3003, 'type': 'message', 'date': '2024-03-01T10:06:00', 'date_unixtime': '1709287560',
+     'from': 'Member 2', 'from_id': 'user1', 'reply_to_message_id': 3002,
+     'text': ['see ', {'type': 'link', 'text': 'https://example.com'}, ' for details'],
+     'text_entities': [{'type': 'plain', 'text': 'see '}, {'type': 'link', 'text': 'https://example.com'},
+                       {'type': 'plain', 'text': ' for details'}]},
+]
+
+
+def _text(rng: random.Random) -> str:
+    # Early words are picked far more often, like in real chats.
+    return ' '.join(rng.choices(WORDS, weights=[1 / rank for rank in range(1, len(WORDS) + 1)], k=rng.randint(0, 12)))
+
+
+def generate_messages(count: int, senders: int = 40, sources: int = 15, seed: int = 7) -> list:
+    """
+    Generate `count` messages in date order, with forwards, replies, edits, formatted
+    texts, service messages and deleted accounts. A few senders write most messages.
+    """
+    rng = random.Random(seed)
+    sender_weights = [1 / rank for rank in range(1, senders + 1)]
+    source_weights = [1 / rank for rank in range(1, sources + 1)]
+    # The messages span 1500 days from 2019-01-01 whatever their number.
+    step = 1500 * 86400 // max(count, 1)
+    messages = []
+    for message_id in range(1, count + 1):
+        timestamp = 1546300800 + (message_id - 1) * step + rng.randrange(step)
+        date = datetime.fromtimestamp(timestamp, timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        message = {'id': message_id, 'type': 'message', 'date': date, 'date_unixtime': str(timestamp)}
+        index = rng.choices(range(senders), weights=sender_weights)[0]
+        name = None if rng.random() < 0.01 else f'Member {index + 1}'
+        if rng.random() < 0.02:
+            message.update(type='service', actor=name, actor_id=f'user{index}', action='pin_message',
+                           text='', text_entities=[])
+            messages.append(message)
+            continue
+        message['from'] = name
+        message['from_id'] = f'user{index}'
+        if rng.random() < 0.15:
+            source = rng.choices(range(sources), weights=source_weights)[0]
+            message['forwarded_from'] = None if rng.random() < 0.05 else f'Channel {source + 1}'
+        if message_id > 1 and rng.random() < 0.25:
+            message['reply_to_message_id'] = rng.randint(max(1, message_id - 500), message_id - 1)
+        if rng.random() < 0.05:
+            message['edited'] = datetime.fromtimestamp(timestamp + rng.randint(10, 3600),
+                                                       timezone.utc).strftime('%Y-%m-%dT%H:%M:%S')
+        text = _text(rng)
+        if rng.random() < 0.1:
+            link = {'type': 'link', 'text': 'https://example.com/' + rng.choice(WORDS)}
+            message['text'] = [text + ' ', link, {'type': 'bold', 'text': rng.choice(WORDS)}]
+            message['text_entities'] = [{'type': 'plain', 'text': text + ' '}, link, message['text'][2]]
+        else:
+            message['text'] = text
+            message['text_entities'] = [{'type': 'plain', 'text': text}] if text else []
+        messages.append(message)
+    return messages
+
+
+def make_export(count: int = 3000, seed: int = 7) -> dict:
+    """
+    Build a synthetic export with `count` generated messages and a few hand-written ones.
+    """
+    messages = generate_messages(count, seed=seed)
+    messages.extend(json.loads(json.dumps(EXTRA_MESSAGES)))
+    return {'name': 'Test Group', 'type': 'private_supergroup', 'id': 1000000001, 'messages': messages}
+
+
+def write_json(path, data: dict) -> str:
+    """
+    Write an export the way Telegram Desktop does and return its path.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, ensure_ascii=False, indent=1)
+    return str(path)
+
+
+# Every analysis of the original tools module, by name.
+ANALYSES = sorted(
+    name for name, fn in inspect.getmembers(baseline_tools, inspect.isfunction)
+    if fn.__module__ == baseline_tools.__name__ and name not in ('load_json', 'extract_date_info')
+)
+# Analyses that return messages rather than statistics, so they need the loaded export.
+MESSAGE_LISTS = {'get_forwarded_messages', 'get_replies', 'get_edited_messages'}
+
+
+def analyses(stats) -> dict:
+    """
+    Get every statistic the tools module computes from `stats`, by function name.
+    """
+    return {name: getattr(tools, name)(stats) for name in ANALYSES if name not in MESSAGE_LISTS}
+
+
+def state(stats) -> dict:
+    """
+    Get everything `stats` has counted, to compare two ways of building the same statistics.
+    """
+    stats.flush()
+    return {
+        **analyses(stats),
+        'words': list(stats.words.items()),
+        'user_text_lengths': dict(stats.user_text_lengths),
+        'user_message_counts': dict(stats.user_message_counts),
+        'last_message_id': stats.last_message_id,
+        'last_edit': stats.last_edit,
+    }
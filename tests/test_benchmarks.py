@@ -0,0 +1,34 @@
+import json
+
+from benchmarks.generate import generate_messages, write_export
+from benchmarks.run import compare, run_fixture
+
+
+def test_generate_is_deterministic():
+    assert list(generate_messages(500, seed=3)) == list(generate_messages(500, seed=3))
+    assert list(generate_messages(500, seed=3)) != list(generate_messages(500, seed=4))
+
+
+def test_write_export(tmp_path):
+    path = tmp_path / 'export.json'
+    write_export(str(path), 300, name='Ĉambro', seed=5)
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    assert (data['name'], data['type']) == ('Ĉambro', 'private_supergroup')
+    assert data['messages'] == list(generate_messages(300, seed=5))
+    assert [message['id'] for message in data['messages']] == list(range(1, 301))
+
+
+def test_run_fixture(tmp_path):
+    path = tmp_path / 'export.json'
+    write_export(str(path), 200)
+    results = run_fixture(str(path), repeat=1, memory=True, charts=False, only=None)
+    assert results['tools.get_senders']['messages_per_second'] > 0
+    assert 'peak_bytes' in results['load.load_stats']
+    assert 'peak_bytes' not in results['load.load_stats_parallel']
+
+
+def test_compare():
+    baseline = {'a.json': {'fast': {'seconds': 1.0}, 'slow': {'seconds': 1.0}}}
+    results = {'a.json': {'fast': {'seconds': 1.1}, 'slow': {'seconds': 1.5}, 'new': {'seconds': 9.0}}}
+    assert compare(results, baseline, 0.2) == [('a.json', 'slow', 1.0, 1.5)]
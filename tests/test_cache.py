@@ -0,0 +1,90 @@
+import sys
+import threading
+import time
+
+from analyzer import cache
+from analyzer.cache import LRUCache
+
+
+def test_evicts_least_recently_used():
+    lru = LRUCache(max_bytes=10, ttl=None)
+    lru.put('a', 1, size=4)
+    lru.put('b', 2, size=4)
+    assert lru.get('a') == 1
+    lru.put('c', 3, size=4)
+    assert 'b' not in lru
+    assert lru.get('a') == 1 and lru.get('c') == 3
+    assert lru.stats()['bytes'] == 8
+    assert lru.evictions == 1
+
+
+def test_skips_values_over_budget():
+    lru = LRUCache(max_bytes=10, ttl=None)
+    lru.put('a', 1, size=4)
+    lru.put('big', 2, size=11)
+    assert 'big' not in lru
+    assert lru.get('a') == 1
+
+
+def test_expires_entries(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(cache.time, 'monotonic', lambda: now[0])
+    lru = LRUCache(ttl=60)
+    lru.put('a', 1, size=4)
+    now[0] += 59
+    assert lru.get('a') == 1
+    now[0] += 2
+    assert lru.get('a', 'missing') == 'missing'
+    assert lru.expirations == 1
+    assert lru.stats()['bytes'] == 0
+
+
+def test_get_or_load_loads_once():
+    lru = LRUCache(ttl=None)
+    calls = []
+    started = threading.Event()
+
+    def loader():
+        calls.append(1)
+        started.set()
+        time.sleep(0.1)
+        return 'value'
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(lru.get_or_load('key', loader))) for _ in range(8)]
+    threads[0].start()
+    started.wait()
+    for thread in threads[1:]:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == ['value'] * 8
+    assert len(calls) == 1
+
+
+def test_get_or_load_does_not_cache_none():
+    lru = LRUCache(ttl=None)
+    assert lru.get_or_load('key', lambda: None) is None
+    assert 'key' not in lru
+    assert lru.get_or_load('key', lambda: 'value', size=len) == 'value'
+    assert lru.stats()['bytes'] == 5
+
+
+def test_deep_size():
+    class Holder:
+        def __init__(self, items):
+            self.items = items
+
+    items = [str(number) * 100 for number in range(10)]
+    assert cache.deep_size(items) == sys.getsizeof(items) + sum(sys.getsizeof(item) for item in items)
+    holder = Holder({'a': items, 'b': items})
+    assert cache.deep_size(holder) > cache.deep_size(items) + sys.getsizeof(holder)
+    # Objects reachable twice are counted once.
+    assert cache.deep_size([holder, holder]) == sys.getsizeof([holder, holder]) + cache.deep_size(holder)
+
+
+def test_result_key():
+    assert cache.result_key('abc', 'senders', top_n=10, page=2) == cache.result_key('abc', 'senders', page=2, top_n=10)
+    assert cache.result_key('abc', 'senders', top_n=10) != cache.result_key('abc', 'senders', top_n=20)
+    assert cache.result_key('abc', 'senders') != cache.result_key('abd', 'senders')
+    hash(cache.result_key('abc', 'senders', top_n=10))
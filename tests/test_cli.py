@@ -0,0 +1,56 @@
+import csv
+import json
+import os
+
+from analyzer.cli import REPORT, find_exports, main, report_dirs
+from analyzer.stats import ChatStats
+from tests.exports import make_export, write_json
+
+
+def read_summary(output) -> list:
+    with open(os.path.join(output, 'summary.csv'), newline='', encoding='utf-8') as f:
+        return list(csv.DictReader(f))
+
+
+def test_find_exports(tmp_path):
+    (tmp_path / 'nested').mkdir()
+    for name in ('b.json', 'nested/a.JSON', 'notes.txt'):
+        (tmp_path / name).write_text('{}', encoding='utf-8')
+    assert find_exports([str(tmp_path), 'extra.json']) == sorted(
+        [str(tmp_path / 'b.json'), str(tmp_path / 'nested' / 'a.JSON'), 'extra.json'])
+
+
+def test_report_dirs():
+    assert report_dirs(['a/result.json', 'b/result.json', 'c/other.json'], 'out') == [
+        os.path.join('out', 'result'), os.path.join('out', 'result-2'), os.path.join('out', 'other')]
+
+
+def test_main(tmp_path, capsys):
+    export = make_export(500, seed=1)
+    (tmp_path / 'exports').mkdir()
+    write_json(tmp_path / 'exports' / 'first.json', export)
+    write_json(tmp_path / 'exports' / 'second.json', make_export(200, seed=2))
+    (tmp_path / 'exports' / 'broken.json').write_text('{"messages": [', encoding='utf-8')
+    output = str(tmp_path / 'reports')
+
+    assert main([str(tmp_path / 'exports'), '-o', output, '-j', '2', '--format', 'json', 'csv']) == 1
+    assert 'Analyzed 2 of 3 exports' in capsys.readouterr().out
+
+    summary = read_summary(output)
+    assert [os.path.basename(row['export']) for row in summary] == ['broken.json', 'first.json', 'second.json']
+    assert summary[0]['error'] and not summary[1]['error']
+    assert summary[1]['messages'] == str(len(export['messages']))
+
+    with open(os.path.join(output, 'first', 'report.json'), encoding='utf-8') as f:
+        report = json.load(f)
+    stats = ChatStats.from_data(export)
+    expected = json.loads(json.dumps({name: function(stats) for name, function in REPORT}, default=str))
+    assert report == expected
+    assert os.path.exists(os.path.join(output, 'first', 'csv', 'senders.csv'))
+
+
+def test_main_single_export(tmp_path):
+    path = write_json(tmp_path / 'result.json', make_export(300, seed=3))
+    output = str(tmp_path / 'reports')
+    assert main([path, '-o', output, '-j', '2']) == 0
+    assert read_summary(output)[0]['messages'] == '303'
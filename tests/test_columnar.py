@@ -0,0 +1,38 @@
+import copy
+import inspect
+
+import pytest
+
+from analyzer import tools
+from analyzer.columnar import MessageTable, load_table
+
+COLUMNAR = sorted(name for name, fn in inspect.getmembers(tools, inspect.isfunction) if name.endswith('_columnar'))
+
+
+@pytest.mark.parametrize('name', COLUMNAR)
+def test_matches_row_analysis(export, name):
+    table = MessageTable.from_data(export)
+    expected = getattr(tools, name[:-len('_columnar')])(copy.deepcopy(export))
+    assert getattr(tools, name)(table) == expected
+
+
+@pytest.mark.parametrize('name', ['get_forwarders', 'get_forward_sources', 'get_repliers', 'get_editors'])
+@pytest.mark.parametrize('top_n', [0, 3, 1000])
+def test_top_n(export, name, top_n):
+    table = MessageTable.from_data(export)
+    expected = getattr(tools, name)(copy.deepcopy(export), top_n)
+    assert getattr(tools, f'{name}_columnar')(table, top_n) == expected
+
+
+@pytest.mark.parametrize('name', COLUMNAR)
+def test_empty_table(name):
+    data = {'messages': []}
+    table = MessageTable.from_data(data)
+    assert len(table) == 0
+    assert getattr(tools, name)(table) == getattr(tools, name[:-len('_columnar')])(data)
+
+
+def test_load_table(export, export_file):
+    table = load_table(export_file)
+    assert len(table) == len(export['messages'])
+    assert tools.get_senders_columnar(table) == tools.get_senders_columnar(MessageTable.from_data(export))
@@ -0,0 +1,83 @@
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from analyzer.concurrency import KeyedExecutor, QueueFull
+
+
+@pytest.fixture
+def executor():
+    executor = KeyedExecutor(max_workers=4)
+    yield executor
+    executor.shutdown()
+
+
+def test_same_key_runs_in_order(executor):
+    order = {key: [] for key in range(3)}
+    running = {key: 0 for key in range(3)}
+    overlaps = []
+
+    def task(key, index):
+        running[key] += 1
+        overlaps.append(running[key])
+        time.sleep(0.001 * (index % 3))
+        order[key].append(index)
+        running[key] -= 1
+
+    futures = [executor.submit(index % 3, task, index % 3, index) for index in range(60)]
+    for future in futures:
+        future.result(timeout=10)
+    assert order == {key: list(range(key, 60, 3)) for key in range(3)}
+    assert max(overlaps) == 1
+    assert executor.pending() == 0
+
+
+def test_different_keys_run_concurrently(executor):
+    barrier = threading.Barrier(3, timeout=5)
+    futures = [executor.submit(key, barrier.wait) for key in range(3)]
+    assert sorted(future.result(timeout=10) for future in futures) == [0, 1, 2]
+
+
+def test_errors_do_not_block_the_key(executor):
+    failed = executor.submit('user', lambda: 1 / 0)
+    after = executor.submit('user', lambda: 'next')
+    with pytest.raises(ZeroDivisionError):
+        failed.result(timeout=10)
+    assert after.result(timeout=10) == 'next'
+
+
+def test_queue_full():
+    executor = KeyedExecutor(max_workers=1, max_pending=2)
+    release = threading.Event()
+    futures = [executor.submit('user', release.wait), executor.submit('user', release.wait)]
+    with pytest.raises(QueueFull):
+        executor.submit('other', release.wait)
+    release.set()
+    for future in futures:
+        assert future.result(timeout=10)
+    executor.shutdown()
+
+
+def test_per_user_saves_user_data_after_handler(monkeypatch, executor):
+    import bot
+
+    monkeypatch.setattr(bot, 'HANDLER_WORKERS', 4)
+    monkeypatch.setattr(bot, 'handler_executor', executor)
+    events = []
+    done = threading.Event()
+
+    def handler(update, context):
+        context.user_data['seen'] = True
+        events.append('handled')
+
+    def update_persistence(update):
+        events.append(('saved', dict(context.user_data)))
+        done.set()
+
+    context = SimpleNamespace(user_data={}, dispatcher=SimpleNamespace(update_persistence=update_persistence))
+    update = SimpleNamespace(effective_user=SimpleNamespace(id=7), effective_chat=None, callback_query=None)
+    bot.per_user(handler)(update, context)
+    assert done.wait(10)
+    assert events == ['handled', ('saved', {'seen': True})]
@@ -0,0 +1,87 @@
+import copy
+
+import pytest
+
+from analyzer.snapshot import build_snapshot, load_chat_snapshot
+from analyzer.stats import RECENT_MESSAGES, ChatStats
+from tests.exports import make_export, state, write_json
+
+COUNT = RECENT_MESSAGES + 1000
+OWNER = 42
+
+
+@pytest.fixture(scope='module')
+def full() -> dict:
+    export = make_export(COUNT, seed=11)
+    # Keep ids contiguous so a message's id gives its position.
+    for index, message in enumerate(export['messages'], start=1):
+        message['id'] = index
+    return export
+
+
+def edited(export: dict, ids: list) -> dict:
+    export = copy.deepcopy(export)
+    for message_id in ids:
+        message = export['messages'][message_id - 1]
+        message['edited'] = f'2030-01-01T00:00:0{message_id % 10}'
+        message['text'] = 'python python edit'
+    return export
+
+
+def fold(tmp_path, older: dict, newer: dict, owner=OWNER) -> ChatStats:
+    root = str(tmp_path / 'snapshots')
+    build_snapshot(write_json(tmp_path / 'older.json', older), root, 'older', OWNER)
+    return build_snapshot(write_json(tmp_path / 'newer.json', newer), root, 'newer', owner)
+
+
+def cut(export: dict, messages: list) -> dict:
+    return dict(export, messages=messages)
+
+
+@pytest.mark.parametrize('case', ['append', 'recent edits', 'old edit', 'deleted', 'date range', 'same'])
+def test_fold_matches_full_analysis(tmp_path, full, case):
+    older = cut(full, full['messages'][:COUNT - 500])
+    last = COUNT - 500
+    newer = {
+        'append': full,
+        'recent edits': edited(full, [last - 10, last - 1000, last, last + 1]),
+        'old edit': edited(full, [5, last - 10]),
+        'deleted': cut(full, full['messages'][:100] + full['messages'][101:]),
+        'date range': cut(full, full['messages'][1000:]),
+        'same': older,
+    }[case]
+    assert state(fold(tmp_path, older, newer)) == state(ChatStats.from_data(copy.deepcopy(newer)))
+
+
+def test_older_export_keeps_chat_snapshot(tmp_path, full):
+    older = cut(full, full['messages'][:COUNT - 500])
+    stats = fold(tmp_path, full, older)
+    assert state(stats) == state(ChatStats.from_data(copy.deepcopy(older)))
+    assert load_chat_snapshot(str(tmp_path / 'snapshots'), OWNER, full['id']).last_message_id == len(full['messages'])
+
+
+def test_chat_snapshot_is_a_copy(tmp_path, full):
+    root = str(tmp_path / 'snapshots')
+    first = build_snapshot(write_json(tmp_path / 'older.json', full), root, 'older', OWNER)
+    load_chat_snapshot(root, OWNER, full['id']).add({'id': len(full['messages']) + 1, 'from': 'Member 1', 'text': 'later'})
+    assert state(load_chat_snapshot(root, OWNER, full['id'])) == state(first)
+
+
+def conversation(sender: str, text: str) -> dict:
+    messages = [
+        {'id': index, 'type': 'message', 'date': f'2024-01-0{index}T10:00:00', 'from': sender,
+         'from_id': f'user{len(sender)}', 'text': text}
+        for index in range(1, 4)
+    ]
+    return {'name': 'Chat', 'type': 'personal_chat', 'id': 7, 'messages': messages}
+
+
+@pytest.mark.parametrize('owner', [OWNER, OWNER + 1])
+def test_other_export_with_same_ids_is_not_folded(tmp_path, owner):
+    older = conversation('Alice', 'secret plans launch')
+    newer = conversation('Bob', 'hello world')
+    newer['messages'].append(dict(newer['messages'][-1], id=4, date='2024-01-04T10:00:00'))
+    stats = fold(tmp_path, older, newer, owner)
+    assert state(stats) == state(ChatStats.from_data(copy.deepcopy(newer)))
+    assert 'Alice' not in stats.user_message_counts
+    assert 'secret' not in dict(stats.words.items())
@@ -0,0 +1,84 @@
+import copy
+import json
+import os
+
+import pytest
+
+from analyzer.cli import main
+from analyzer.stats import ChatStats, merge_stats
+from tests.exports import state, write_json
+
+
+def shards(export: dict, cuts: list) -> list:
+    bounds = [0, *cuts, len(export['messages'])]
+    return [dict(export, messages=export['messages'][start:end]) for start, end in zip(bounds, bounds[1:])]
+
+
+@pytest.mark.parametrize('cuts', [[1], [1500], [10, 11, 2990], [0, 3003]])
+def test_merge_in_order_matches_whole(export, cuts):
+    parts = [ChatStats.from_data(copy.deepcopy(shard)) for shard in shards(export, cuts)]
+    # Empty shards have no oldest or latest message to report.
+    before = [state(part) for part in parts if part.messages_count]
+    combined = merge_stats(parts)
+    assert state(combined) == state(ChatStats.from_data(copy.deepcopy(export)))
+    assert [state(part) for part in parts if part.messages_count] == before
+    assert (combined.name, combined.type, combined.id) == (export['name'], export['type'], export['id'])
+
+
+def test_merge_is_associative(export):
+    a, b, c = (ChatStats.from_data(copy.deepcopy(shard)) for shard in shards(export, [700, 2100]))
+    left = merge_stats([merge_stats([a, b]), c])
+    right = merge_stats([a, merge_stats([b, c])])
+    assert state(left) == state(right)
+
+
+def test_merge_chats(export):
+    other = dict(copy.deepcopy(export), name='Other', id=5)
+    combined = merge_stats([ChatStats.from_data(export), ChatStats.from_data(other)])
+    assert (combined.name, combined.type, combined.id) == ('Test Group + Other', export['type'], 'combined')
+    assert combined.messages_count == 2 * len(export['messages'])
+    assert merge_stats([ChatStats.from_data(export)], name='Renamed').name == 'Renamed'
+
+
+def test_merge_sketches(export):
+    parts = [ChatStats.from_data(shard, sketch_size=50) for shard in shards(export, [1500])]
+    combined = merge_stats(parts)
+    truth = ChatStats.from_data(export).words
+    assert combined.words.capacity == 50
+    for word, count, error in combined.words.heavy_hitters():
+        assert count - error <= truth[word] <= count
+    with pytest.raises(ValueError):
+        ChatStats.from_data(export).merge(ChatStats.from_data(export, sketch_size=50))
+
+
+def test_revise_applies_edits(export):
+    stats = ChatStats.from_data(copy.deepcopy(export))
+    edited = copy.deepcopy(export)
+    for message in edited['messages'][-50::7]:
+        message['edited'] = '2030-01-01T00:00:00'
+        message['text'] = ['python ', {'type': 'bold', 'text': 'edit'}]
+        assert stats.revise(copy.deepcopy(message))
+    assert state(stats) == state(ChatStats.from_data(edited))
+
+
+def test_revise_rejects_unknown_messages(export):
+    stats = ChatStats.from_data(copy.deepcopy(export))
+    before = state(stats)
+    assert not stats.revise({'id': 10 ** 9, 'edited': '2030-01-01T00:00:00', 'text': 'new'})
+    assert not ChatStats.from_data(export, sketch_size=50).revise(dict(export['messages'][-1], text='new'))
+    assert state(stats) == before
+
+
+def test_cli_combine(tmp_path, export):
+    directory = tmp_path / 'parts'
+    directory.mkdir()
+    for index, shard in enumerate(shards(export, [1000, 2000])):
+        write_json(directory / f'part{index}.json', shard)
+    output = str(tmp_path / 'reports')
+    assert main([str(directory), '-o', output, '-j', '2', '--combine']) == 0
+    write_json(tmp_path / 'whole.json', export)
+    assert main([str(tmp_path / 'whole.json'), '-o', str(tmp_path / 'whole'), '-j', '1']) == 0
+    with open(os.path.join(output, 'combined', 'report.json'), encoding='utf-8') as f:
+        combined = json.load(f)
+    with open(tmp_path / 'whole' / 'whole' / 'report.json', encoding='utf-8') as f:
+        assert combined == json.load(f)
@@ -0,0 +1,69 @@
+import json
+import time
+from urllib.error import HTTPError
+from urllib.request import urlopen
+
+import pytest
+
+from analyzer.metrics import Metrics, Usage, serve
+
+
+def test_usage_measures_block():
+    with Usage() as usage:
+        deadline = time.thread_time() + 0.02
+        while time.thread_time() < deadline:
+            pass
+    assert usage.cpu >= 0.02
+    assert usage.wall >= 0.019
+
+
+def test_usage_rss_growth(monkeypatch):
+    peaks = iter([1000, 5000])
+    monkeypatch.setattr('analyzer.metrics.max_rss', lambda: next(peaks))
+    with Usage() as usage:
+        pass
+    assert usage.rss_growth_bytes == 4000
+
+
+def test_trace_logs_and_records_stages(capsys):
+    metrics = Metrics(buckets=(0.1, 1))
+    trace = metrics.trace('rank_senders', user=7)
+    with trace.stage('compute'):
+        pass
+    trace.add('render', wall=0.5, cpu=0.4, rss_growth_bytes=100)
+    trace.add('render', wall=2.0, cpu=1.0, rss_growth_bytes=50)
+    trace.finish()
+    trace.finish('error')
+
+    lines = capsys.readouterr().out.splitlines()
+    assert len(lines) == 1
+    record = json.loads(lines[0])
+    assert (record['handler'], record['outcome'], record['user']) == ('rank_senders', 'ok', 7)
+    assert record['stages']['render'] == {'wall': 2.5, 'cpu': 1.4, 'rss_growth_bytes': 100}
+
+    exposition = metrics.exposition()
+    assert 'analyzer_requests_total{handler="rank_senders",outcome="ok"} 1' in exposition
+    assert 'analyzer_stage_seconds_bucket{handler="rank_senders",stage="render",le="1"} 1' in exposition
+    assert 'analyzer_stage_seconds_bucket{handler="rank_senders",stage="render",le="+Inf"} 2' in exposition
+    assert 'analyzer_stage_rss_growth_bytes{handler="rank_senders",stage="render"} 100' in exposition
+
+
+def test_labels_are_escaped():
+    metrics = Metrics()
+    metrics.count_request('say "hi"\n', 'ok')
+    assert 'handler="say \\"hi\\"\\n"' in metrics.exposition()
+
+
+def test_serve():
+    metrics = Metrics(log_requests=False)
+    metrics.count_request('start', 'ok')
+    server = serve(metrics, 0)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}'
+        with urlopen(f'{url}/metrics', timeout=5) as response:
+            assert 'analyzer_requests_total{handler="start",outcome="ok"} 1' in response.read().decode()
+        with pytest.raises(HTTPError):
+            urlopen(f'{url}/other', timeout=5)
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,68 @@
+import copy
+import json
+
+import pytest
+
+from analyzer import parallel
+from analyzer.parallel import chat_stats_parallel, load_stats_parallel
+from analyzer.stats import ChatStats
+from analyzer.stream import load_stats
+from tests.exports import state, write_json
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch):
+    monkeypatch.setattr(parallel, 'MIN_CHUNK_BYTES', 1 << 14)
+    monkeypatch.setattr(parallel, 'MIN_CHUNK_MESSAGES', 100)
+
+
+def no_fallback(*args):
+    raise AssertionError('read in one pass')
+
+
+@pytest.mark.parametrize('workers', [2, 3, 7])
+def test_load_stats_parallel_matches_serial(monkeypatch, export_file, workers):
+    monkeypatch.setattr(parallel, 'load_stats', no_fallback)
+    stats = load_stats_parallel(export_file, workers)
+    expected = load_stats(export_file)
+    assert state(stats) == state(expected)
+    assert (stats.name, stats.type, stats.id) == (expected.name, expected.type, expected.id)
+
+
+def test_load_stats_parallel_reads_keys_after_messages(monkeypatch, tmp_path, export):
+    data = {'messages': export['messages'], 'name': 'After', 'id': 5}
+    path = tmp_path / 'result.json'
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding='utf-8')
+    monkeypatch.setattr(parallel, 'load_stats', no_fallback)
+    stats = load_stats_parallel(str(path), 4)
+    monkeypatch.undo()
+    assert (stats.name, stats.id) == ('After', 5)
+    assert state(stats) == state(load_stats(str(path)))
+
+
+def test_load_stats_parallel_other_key_order(tmp_path, export):
+    # Without "id" first the ranges cannot be found, and the export is read in one pass.
+    messages = [dict(sorted(message.items())) for message in export['messages']]
+    path = write_json(tmp_path / 'result.json', dict(export, messages=messages))
+    assert state(load_stats_parallel(path, 4)) == state(load_stats(path))
+
+
+def test_load_stats_parallel_invalid(tmp_path, export, capsys):
+    path = tmp_path / 'result.json'
+    text = json.dumps(export, ensure_ascii=False, indent=1)
+    path.write_text(text[:len(text) * 2 // 3], encoding='utf-8')
+    assert load_stats_parallel(str(path), 4) is None
+    assert load_stats_parallel(str(tmp_path / 'missing.json'), 4) is None
+    assert 'An error occurred' in capsys.readouterr().out
+
+
+@pytest.mark.parametrize('workers', [2, 5])
+@pytest.mark.parametrize('sketch_size', [None, 50])
+def test_chat_stats_parallel_matches_serial(export, workers, sketch_size):
+    stats = chat_stats_parallel(copy.deepcopy(export), workers, sketch_size)
+    expected = ChatStats.from_data(copy.deepcopy(export))
+    if sketch_size is None:
+        assert state(stats) == state(expected)
+    else:
+        assert stats.words.capacity == sketch_size
+        assert stats.messages_count == expected.messages_count
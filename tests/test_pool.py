@@ -0,0 +1,100 @@
+import os
+import pickle
+import threading
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO
+
+import matplotlib
+import pytest
+
+matplotlib.use('Agg')
+
+from analyzer.stats import ChatStats
+from analyzer.visuals.pool import RenderPool, RenderQueueFull, resolve, when_all_done
+from tests.test_visuals import PNG_SIGNATURE, chart_functions
+
+
+def crash(data):
+    os._exit(1)
+
+
+def fail(data):
+    raise ValueError(data)
+
+
+def slow(data):
+    time.sleep(data)
+    return BytesIO(b'done')
+
+
+@pytest.fixture
+def pool():
+    pool = RenderPool(max_workers=1, max_pending=2)
+    yield pool
+    pool.shutdown()
+
+
+@pytest.fixture(scope='module')
+def stats(export) -> ChatStats:
+    return ChatStats.from_data(export)
+
+
+def test_renders_by_name(pool, stats):
+    future = pool.submit('analyzer.visuals.active_senders.visualize_bar_chart', stats.chart_view(), timeout=5)
+    assert future.result(timeout=60).startswith(PNG_SIGNATURE)
+    assert future.cpu_seconds > 0
+    assert pool.pending() == 0
+
+
+def test_resolve():
+    assert resolve(fail) is fail
+    assert resolve('tests.test_pool.fail') is fail
+
+
+def test_forwards_errors(pool):
+    with pytest.raises(ValueError):
+        pool.submit(fail, 'bad data').result(timeout=60)
+    assert pool.pending() == 0
+
+
+def test_recovers_from_dead_worker(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.submit(crash, None).result(timeout=60)
+    assert pool.submit(slow, 0).result(timeout=60) == b'done'
+
+
+def test_queue_full(pool):
+    first = pool.submit(slow, 1)
+    second = pool.submit(slow, 0)
+    with pytest.raises(RenderQueueFull):
+        pool.submit(slow, 0)
+    assert pool.pending() == 2 and not pool.idle()
+    first.result(timeout=60)
+    second.result(timeout=60)
+    assert pool.pending() == 0
+
+
+def test_when_all_done():
+    calls = []
+    when_all_done([], calls.append)
+    assert calls == [[]]
+
+    futures = [Future(), Future()]
+    when_all_done(futures, calls.append)
+    futures[0].set_result(1)
+    assert len(calls) == 1
+    thread = threading.Thread(target=futures[1].set_result, args=(2,))
+    thread.start()
+    thread.join()
+    assert calls[1] is futures
+
+
+def test_chart_view_is_small(stats):
+    assert len(pickle.dumps(stats.chart_view())) * 10 < len(pickle.dumps(stats))
+
+
+@pytest.mark.parametrize('chart', chart_functions())
+def test_chart_view_draws_same_charts(chart, stats):
+    assert chart(stats.chart_view()).getvalue() == chart(stats).getvalue()
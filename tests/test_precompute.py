@@ -0,0 +1,70 @@
+import threading
+import time
+from concurrent.futures import CancelledError
+
+import pytest
+
+import bot
+from analyzer.cache import LRUCache
+from analyzer.concurrency import Job
+from analyzer.stats import ChatStats
+
+
+def test_job_runs_once():
+    calls = []
+    started, release = threading.Event(), threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return 'done'
+
+    job = Job(work)
+    worker = threading.Thread(target=job.run)
+    worker.start()
+    started.wait(5)
+    waiter = threading.Thread(target=lambda: calls.append(job.run_or_wait(5)))
+    waiter.start()
+    release.set()
+    worker.join()
+    waiter.join()
+    job.run()
+    assert calls == [1, 'done']
+
+
+def test_job_errors_and_cancellation():
+    job = Job(lambda: 1 / 0)
+    with pytest.raises(ZeroDivisionError):
+        job.run_or_wait()
+
+    job = Job(lambda: 'never')
+    assert job.cancel()
+    with pytest.raises(CancelledError):
+        job.run_or_wait()
+
+
+@pytest.fixture
+def result_cache(monkeypatch):
+    cache = LRUCache(ttl=None)
+    monkeypatch.setattr(bot, 'result_cache', cache)
+    return cache
+
+
+def test_precompute_fills_cache(result_cache, export):
+    stats = ChatStats.from_data(export)
+    bot.precompute(stats, 'digest')
+    deadline = time.monotonic() + 30
+    while len(result_cache) < len(bot.ANALYSES) and time.monotonic() < deadline:
+        time.sleep(0.01)
+    misses = result_cache.misses
+    for analysis, (build_text, _) in bot.ANALYSES.items():
+        assert bot.analysis_text(stats, 'digest', analysis) == build_text(stats)
+    assert result_cache.misses == misses
+
+
+def test_analysis_text_without_precompute(result_cache, export):
+    stats = ChatStats.from_data(export)
+    text = bot.analysis_text(stats, 'digest', 'rank_senders')
+    assert text == bot.rank_senders_text(stats)
+    assert result_cache.get(bot.result_key('digest', 'rank_senders')) == text
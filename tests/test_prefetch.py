@@ -0,0 +1,95 @@
+from concurrent.futures import Future
+
+import pytest
+
+import bot
+from analyzer.cache import LRUCache
+from analyzer.prefetch import Transitions
+from analyzer.stats import ChatStats
+
+
+def test_prior_before_observations():
+    transitions = Transitions(prior={'rank_senders': 'visualize_senders'})
+    assert transitions.predict('rank_senders') == [('visualize_senders', 1.0)]
+    assert transitions.predict('unknown') == []
+
+
+def test_counts_transitions_per_user():
+    transitions = Transitions(prior={'a': 'b'}, prior_weight=1)
+    for user, presses in ((1, 'acac'), (2, 'ac'), (3, 'ab')):
+        for press in presses:
+            transitions.record(user, press)
+    # a -> c three times, a -> b once observed and once from the prior; c -> a once.
+    assert transitions.probabilities('a') == {'c': 0.6, 'b': 0.4}
+    assert transitions.predict('a', min_probability=0.5) == [('c', 0.6)]
+    assert transitions.predict('a', min_probability=0, limit=1) == [('c', 0.6)]
+    assert transitions.probabilities('c') == {'a': 1.0}
+
+
+def test_forgets_least_recent_users():
+    transitions = Transitions(max_users=2)
+    for user in (1, 2, 3):
+        transitions.record(user, 'a')
+    transitions.record(1, 'b')
+    assert transitions.probabilities('a') == {}
+    transitions.record(3, 'b')
+    assert transitions.probabilities('a') == {'b': 1.0}
+
+
+class FakePool:
+    def __init__(self, error: Exception | None = None):
+        self.rendered = []
+        self.error = error
+
+    def idle(self) -> bool:
+        return True
+
+    def submit(self, render, data, **kwargs) -> Future:
+        self.rendered.append(render)
+        future = Future()
+        if self.error is not None:
+            future.set_exception(self.error)
+        else:
+            future.set_result(b'png')
+        return future
+
+
+@pytest.fixture
+def pool(monkeypatch):
+    pool = FakePool()
+    monkeypatch.setattr(bot, 'render_pool', pool)
+    monkeypatch.setattr(bot, 'result_cache', LRUCache(ttl=None))
+    monkeypatch.setattr(bot, '_failed_renders', LRUCache(max_bytes=4096, ttl=None))
+    monkeypatch.setattr(bot, 'transitions', Transitions(prior={'rank_senders': 'visualize_senders'}))
+    return pool
+
+
+def test_prefetch_charts(pool, export):
+    stats = ChatStats.from_data(export)
+    bot.prefetch_charts(stats, 'digest', 'rank_senders')
+    expected = [render for render, _ in bot.CHARTS['visualize_senders']]
+    assert pool.rendered == expected
+    assert all(bot.result_cache.get(bot.result_key('digest', render)) == b'png' for render in expected)
+    assert bot._speculative_renders == 0
+
+    # Cached charts are not drawn again.
+    bot.prefetch_charts(stats, 'digest', 'rank_senders')
+    assert pool.rendered == expected
+
+
+def test_prefetch_respects_limit(pool, monkeypatch, export):
+    monkeypatch.setattr(bot, 'PREFETCH_MAX_RENDERS', 0)
+    bot.prefetch_charts(ChatStats.from_data(export), 'digest', 'rank_senders')
+    assert pool.rendered == []
+
+
+def test_failed_renders_are_not_prefetched_again(pool, export):
+    pool.error = ValueError('All wedge sizes are zero')
+    stats = ChatStats.from_data(export)
+    bot.prefetch_charts(stats, 'digest', 'rank_senders')
+    expected = [render for render, _ in bot.CHARTS['visualize_senders']]
+    assert pool.rendered == expected
+    assert bot._speculative_renders == 0
+
+    bot.prefetch_charts(stats, 'digest', 'rank_senders')
+    assert pool.rendered == expected
@@ -0,0 +1,24 @@
+import random
+from collections import Counter
+
+import pytest
+
+from analyzer.ranking import top_k
+
+
+@pytest.mark.parametrize('k', [None, 0, 1, 3, 10, 99, 1000])
+def test_matches_stable_sort(k):
+    rng = random.Random(k)
+    counts = Counter({f'key{index}': rng.randint(1, 8) for index in range(100)})
+    expected = sorted(counts.items(), key=lambda item: item[1], reverse=True)[:k]
+    assert top_k(counts, k) == expected
+    assert top_k(list(counts.items()), k) == expected
+    assert top_k(iter(counts.items()), k) == expected
+
+
+def test_matches_most_common():
+    counts = Counter('mississippi river')
+    assert top_k(counts, 3) == counts.most_common(3)
+    assert top_k(counts) == counts.most_common()
+    assert top_k({}, 5) == []
+    assert top_k(counts, -1) == []
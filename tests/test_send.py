@@ -0,0 +1,90 @@
+from concurrent.futures import Future
+
+import pytest
+from telegram.error import BadRequest, NetworkError, RetryAfter, TimedOut
+
+import bot
+from analyzer.metrics import Metrics
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    sleeps = []
+    monkeypatch.setattr(bot.time, 'sleep', sleeps.append)
+    monkeypatch.setattr(bot, 'SEND_RETRIES', 2)
+    return sleeps
+
+
+def flaky(errors: list):
+    calls = []
+
+    def send(*args, **kwargs):
+        calls.append((args, kwargs))
+        if errors:
+            raise errors.pop(0)
+        return 'sent'
+    return send, calls
+
+
+def test_retries_network_errors(sleeps):
+    send, calls = flaky([RetryAfter(3), NetworkError('reset')])
+    assert bot.with_retries(send, chat_id=1) == 'sent'
+    assert len(calls) == 3
+    # The flood wait Telegram asked for, then the second backoff step.
+    assert 3 <= sleeps[0] <= 4 and 1 <= sleeps[1] <= 3
+
+
+def test_gives_up_after_retries(sleeps):
+    send, calls = flaky([NetworkError('reset')] * 3)
+    with pytest.raises(NetworkError):
+        bot.with_retries(send)
+    assert len(calls) == 3
+
+
+@pytest.mark.parametrize('error', [TimedOut(), BadRequest('bad photo')])
+def test_does_not_retry_timeouts_or_bad_requests(sleeps, error):
+    send, calls = flaky([error])
+    with pytest.raises(type(error)):
+        bot.with_retries(send)
+    assert len(calls) == 1 and not sleeps
+
+
+class FakeBot:
+    def __init__(self):
+        self.sent = []
+
+    def send_photo(self, chat_id, photo, caption=None):
+        self.sent.append(('photo', photo, caption))
+
+    def send_media_group(self, chat_id, media):
+        self.sent.append(('group', [(item.caption, item.media.input_file_content) for item in media]))
+
+    def send_message(self, chat_id, text):
+        self.sent.append(('message', text))
+
+
+def chart(png: bytes | None) -> Future:
+    future = Future()
+    if png is None:
+        future.set_exception(RuntimeError('render failed'))
+    else:
+        future.set_result(png)
+    return future
+
+
+def test_send_charts_in_media_groups():
+    fake = FakeBot()
+    charts = [(chart(b'png%d' % index), f'chart {index}') for index in range(11)]
+    bot.send_charts(fake, 1, charts, Metrics(log_requests=False).trace('visualize_senders'))
+    assert [entry[0] for entry in fake.sent] == ['group', 'photo']
+    assert fake.sent[0][1][0] == ('chart 0', b'png0') and len(fake.sent[0][1]) == 10
+    assert fake.sent[1] == ('photo', b'png10', 'chart 10')
+
+
+def test_send_charts_reports_failures():
+    fake = FakeBot()
+    metrics = Metrics(log_requests=False)
+    charts = [(chart(b'png'), 'ok'), (chart(None), 'failed'), (chart(None), 'failed')]
+    bot.send_charts(fake, 1, charts, metrics.trace('visualize_senders'))
+    assert fake.sent == [('photo', b'png', 'ok'), ('message', 'Failed to draw 2 charts.')]
+    assert 'outcome="error"' in metrics.exposition()
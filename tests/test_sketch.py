@@ -0,0 +1,108 @@
+import json
+import pickle
+import random
+from collections import Counter
+
+import pytest
+
+from analyzer import tools
+from analyzer.cli import write_report
+from analyzer.sketch import SpaceSaving
+from analyzer.stats import ChatStats
+
+
+def zipf_stream(count: int, keys: int, seed: int) -> list:
+    rng = random.Random(seed)
+    weights = [1 / rank for rank in range(1, keys + 1)]
+    return rng.choices([f'key{index}' for index in range(keys)], weights=weights, k=count)
+
+
+def assert_bounds(sketch: SpaceSaving, truth: Counter) -> None:
+    assert sketch.total == sum(truth.values())
+    for key, count, error in sketch.heavy_hitters():
+        assert count - error <= truth[key] <= count
+    # Every key seen more than total / capacity times is tracked.
+    for key, count in truth.items():
+        if count > sketch.total / sketch.capacity:
+            assert key in sketch
+
+
+@pytest.mark.parametrize('capacity', [1, 10, 50])
+def test_bounds(capacity):
+    stream = zipf_stream(20000, 500, seed=capacity)
+    sketch = SpaceSaving(capacity)
+    sketch.update(stream[:10000])
+    for key in stream[10000:]:
+        sketch[key] += 1
+    assert len(sketch) == capacity
+    assert_bounds(sketch, Counter(stream))
+
+
+def test_exact_below_capacity():
+    stream = zipf_stream(5000, 100, seed=1)
+    sketch = SpaceSaving(100)
+    sketch.update(stream)
+    assert sketch.most_common() == Counter(stream).most_common()
+    assert all(error == 0 for _, _, error in sketch.heavy_hitters())
+
+
+@pytest.mark.parametrize('capacity', [10, 50])
+def test_merge_bounds(capacity):
+    shards = [zipf_stream(8000, 400, seed=seed) for seed in range(3)]
+    sketches = []
+    for shard in shards:
+        sketch = SpaceSaving(capacity)
+        sketch.update(shard)
+        sketches.append(sketch)
+    merged = sketches[0]
+    for sketch in sketches[1:]:
+        merged.merge(sketch)
+    assert len(merged) <= capacity
+    assert_bounds(merged, Counter(key for shard in shards for key in shard))
+
+
+def test_pickle_keeps_counting():
+    sketch = SpaceSaving(10)
+    sketch.update(zipf_stream(1000, 50, seed=2))
+    copy = pickle.loads(pickle.dumps(sketch))
+    assert copy.heavy_hitters() == sketch.heavy_hitters()
+    for key in zipf_stream(1000, 50, seed=3):
+        copy.add(key)
+        sketch.add(key)
+    assert copy.heavy_hitters() == sketch.heavy_hitters()
+
+
+def test_capacity_must_be_positive():
+    with pytest.raises(ValueError):
+        SpaceSaving(0)
+
+
+def test_heavy_hitters(export):
+    exact = ChatStats.from_data(export)
+    approximate = ChatStats.from_data(export, sketch_size=20)
+    truth = dict(exact.words)
+    assert all(row['error'] == 0 for row in tools.get_heavy_hitters(exact, 'words', None))
+    for row in tools.get_heavy_hitters(approximate, 'words', 10):
+        assert row['count'] - row['error'] <= truth[row['key']] <= row['count']
+    with pytest.raises(ValueError):
+        tools.get_heavy_hitters(exact, 'hours')
+
+
+def test_large_sketch_is_exact(export):
+    exact = ChatStats.from_data(export)
+    approximate = ChatStats.from_data(export, sketch_size=100000)
+    for counter in ('senders', 'forward_sources', 'words'):
+        assert getattr(approximate, counter).most_common() == getattr(exact, counter).most_common()
+
+
+def test_report_bounds(tmp_path, export):
+    write_report(ChatStats.from_data(export, sketch_size=20), str(tmp_path / 'sketch'), ('json', 'csv'))
+    with open(tmp_path / 'sketch' / 'report.json', encoding='utf-8') as f:
+        report = json.load(f)
+    assert len(report['most_common_words_bounds']) == 10
+    assert {'key', 'count', 'error'} == set(report['senders_bounds'][0])
+    assert (tmp_path / 'sketch' / 'csv' / 'forward_sources_bounds.csv').exists()
+
+    write_report(ChatStats.from_data(export), str(tmp_path / 'exact'))
+    with open(tmp_path / 'exact' / 'report.json', encoding='utf-8') as f:
+        assert 'senders_bounds' not in json.load(f)
@@ -0,0 +1,57 @@
+import json
+import os
+
+from analyzer.snapshot import SNAPSHOT_VERSION, file_digest, load_export, load_snapshot, save_snapshot
+from analyzer.stats import ChatStats
+from tests.exports import state, write_json
+
+
+def test_save_and_load(tmp_path, export):
+    stats = ChatStats.from_data(export)
+    save_snapshot(str(tmp_path), 'abc', stats)
+    assert state(load_snapshot(str(tmp_path), 'abc')) == state(stats)
+    assert sorted(os.listdir(tmp_path)) == ['abc']
+
+
+def test_missing_or_outdated_snapshot(tmp_path, export):
+    root = str(tmp_path)
+    assert load_snapshot(root, 'abc') is None
+
+    save_snapshot(root, 'abc', ChatStats.from_data(export))
+    with open(tmp_path / 'abc' / 'meta.json', 'w', encoding='utf-8') as f:
+        json.dump({'version': SNAPSHOT_VERSION - 1}, f)
+    assert load_snapshot(root, 'abc') is None
+
+    save_snapshot(root, 'abc', ChatStats.from_data(export))
+    (tmp_path / 'abc' / 'stats.pickle').write_bytes(b'truncated')
+    assert load_snapshot(root, 'abc') is None
+
+
+def test_load_export_builds_then_reuses_snapshot(tmp_path, export, export_file):
+    root = str(tmp_path / 'snapshots')
+    digest = file_digest(export_file)
+    stats = load_export(export_file, root)
+    assert state(stats) == state(ChatStats.from_data(export))
+    assert (stats.name, stats.type, stats.id) == (export['name'], export['type'], export['id'])
+    # Once snapshotted, the export is not needed any more.
+    assert state(load_export(None, root, digest)) == state(stats)
+
+
+def test_load_export_skips_unparseable_dates(tmp_path):
+    messages = [{'id': 1, 'type': 'message', 'date': '2024-01-01T10:00:00', 'from': 'Alice', 'text': 'hi'},
+                {'id': 2, 'type': 'message', 'date': 'yesterday', 'from': 'Bob', 'text': 'hello'}]
+    path = write_json(tmp_path / 'result.json', {'name': 'Chat', 'messages': messages})
+    stats = load_export(path, str(tmp_path / 'snapshots'))
+    assert stats.messages_count == 2
+    assert stats.hours == {10: 1}
+    assert dict(stats.user_activity['Alice']['Hour']) == {10: 1}
+    assert 'Bob' not in stats.user_activity
+
+
+def test_load_export_invalid(tmp_path, capsys):
+    path = tmp_path / 'result.json'
+    path.write_text('{"messages": [1]}', encoding='utf-8')
+    assert load_export(str(path), str(tmp_path / 'snapshots')) is None
+    assert load_export(str(tmp_path / 'missing.json'), str(tmp_path / 'snapshots')) is None
+    assert load_export(None, str(tmp_path / 'snapshots'), 'abc') is None
+    assert 'An error occurred' in capsys.readouterr().out
@@ -0,0 +1,65 @@
+import json
+
+import pytest
+
+from analyzer.stats import ChatStats
+from analyzer.stream import iter_messages, load_stats
+from tests.exports import analyses, make_export, write_json
+
+
+@pytest.fixture(scope='module')
+def small_export_file(tmp_path_factory) -> str:
+    # Reading one character at a time is slow, so tiny chunks get a smaller export.
+    return write_json(tmp_path_factory.mktemp('exports') / 'result.json', make_export(300))
+
+
+@pytest.mark.parametrize('chunk_size', [1, 2, 3, 7, 1 << 16])
+def test_iter_messages_matches_json_load(small_export_file, chunk_size):
+    with open(small_export_file, encoding='utf-8') as f:
+        expected = json.load(f)
+    header = {}
+    messages = list(iter_messages(small_export_file, header, chunk_size=chunk_size))
+    assert messages == expected['messages']
+    assert header == {key: value for key, value in expected.items() if key != 'messages'}
+
+
+@pytest.mark.parametrize('text', [
+    '{}',
+    '{"messages": []}',
+    '{ "name" : "x" , "messages" : [ ] , "id" : 3 }',
+    '{"messages": [{"id": 1}, {"id": 2}], "name": "after"}',
+    '\n{\n "messages": [\n  {"id": 1, "text": "]},{"}\n ]\n}\n',
+])
+@pytest.mark.parametrize('chunk_size', [1, 2, 5])
+def test_iter_messages_layouts(tmp_path, text, chunk_size):
+    path = tmp_path / 'result.json'
+    path.write_text(text, encoding='utf-8')
+    expected = json.loads(text)
+    header = {}
+    assert list(iter_messages(str(path), header, chunk_size=chunk_size)) == expected.get('messages', [])
+    assert header == {key: value for key, value in expected.items() if key != 'messages'}
+
+
+def test_load_stats_matches_loaded_export(export, export_file):
+    stats = load_stats(export_file)
+    assert (stats.name, stats.type, stats.id) == (export['name'], export['type'], export['id'])
+    assert analyses(stats) == analyses(ChatStats.from_data(export))
+
+
+@pytest.mark.parametrize('text', [
+    '{"messages": [1, 2]}',
+    '{"messages": [{"id": 1, "date": "2024-01-01T00:00:00"}, "text"]}',
+    '{"messages": [{"id": 1, "date": "2024-01-01T00:00:00"} {"id": 2}]}',
+    '{"messages": [{"id": 1, "date": "2024-01-01T00:00:00"},',
+    '[]',
+])
+def test_load_stats_invalid(tmp_path, capsys, text):
+    path = tmp_path / 'result.json'
+    path.write_text(text, encoding='utf-8')
+    assert load_stats(str(path)) is None
+    assert 'An error occurred' in capsys.readouterr().out
+
+
+def test_load_stats_missing_file(tmp_path):
+    assert load_stats(str(tmp_path / 'missing.json')) is None
+
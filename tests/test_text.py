@@ -0,0 +1,57 @@
+import os
+import re
+import subprocess
+import sys
+from collections import Counter
+
+import pytest
+
+from analyzer.text import WordCounter, get_stopwords, message_text
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def test_stopwords_are_bundled():
+    stop_words = get_stopwords()
+    assert len(stop_words) == 179
+    assert {'the', 'and', "don't", 'itself'} <= stop_words
+    assert 'python' not in stop_words
+
+
+def test_bot_does_not_load_plotting_libraries():
+    code = ("import sys, bot; "
+            "print(sorted({name.split('.')[0] for name in sys.modules} & {'matplotlib', 'seaborn', 'nltk', 'pandas'}))")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == '[]'
+
+
+def count_one_by_one(texts) -> Counter:
+    stop_words = get_stopwords()
+    counts = Counter()
+    for text in texts:
+        words = re.findall(r'\b[a-zA-Z]+\b', message_text(text).lower())
+        counts.update(word for word in words if word not in stop_words)
+    return counts
+
+
+TEXTS = ['The quick brown fox', 'fox, FOX and the dog', '', ['bold ', {'type': 'bold', 'text': 'ignored'}, ' dog'],
+         {'type': 'link'}, 'Ĉu dog?\nquick', 'zebra']
+
+
+@pytest.mark.parametrize('batch_size', [1, 2, 3, 4096])
+def test_word_counter_matches_one_by_one(batch_size):
+    counter = WordCounter(batch_size=batch_size)
+    counter.update(TEXTS * 3)
+    expected = count_one_by_one(TEXTS * 3)
+    assert list(counter.counts.items()) == list(expected.items())
+    assert counter.counts.most_common() == expected.most_common()
+
+
+def test_word_counter_subtract():
+    counter = WordCounter()
+    counter.update(TEXTS)
+    counter.add('pending fox')
+    counter.subtract('quick fox fox the')
+    expected = count_one_by_one(TEXTS + ['pending fox'])
+    expected.subtract({'quick': 1, 'fox': 2})
+    assert dict(counter.counts) == {word: count for word, count in expected.items() if count > 0}
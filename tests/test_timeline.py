@@ -0,0 +1,62 @@
+from collections import Counter
+from datetime import datetime, timedelta
+
+import numpy as np
+
+from analyzer.stats import ChatStats
+from analyzer.timeline import (NAT, TimeBuckets, count_into, day_label, first_seen_counts, grouped_first_seen_counts,
+                               month_label, month_name_label, to_epoch, weekday_label, year_label)
+
+
+def sample_dates() -> list:
+    # Every few hours across leap years, month ends and the years around the epoch.
+    start = datetime(1968, 12, 28, 23, 59, 59)
+    return [(start + timedelta(hours=7 * i, seconds=i)).strftime('%Y-%m-%dT%H:%M:%S') for i in range(25000)]
+
+
+def test_buckets_match_datetime():
+    dates = sample_dates()
+    buckets = TimeBuckets(to_epoch(dates))
+    # The labels are applied to plain ints, as `count_into` does.
+    fields = zip(buckets.hour.tolist(), buckets.day.tolist(), buckets.weekday.tolist(), buckets.month.tolist(),
+                 buckets.year.tolist(), buckets.month_of_year.tolist())
+    for date, (hour, day, weekday, month, year, month_of_year) in zip(dates, fields):
+        parsed = datetime.fromisoformat(date)
+        assert hour == parsed.hour
+        assert day_label(day) == parsed.strftime('%Y-%m-%d')
+        assert weekday_label(weekday) == parsed.strftime('%A')
+        assert month_label(month) == parsed.strftime('%Y-%m')
+        assert year_label(year) == parsed.strftime('%Y')
+        assert month_name_label(month_of_year) == parsed.strftime('%b')
+
+
+def test_unparseable_dates_are_nat():
+    seconds = to_epoch(['1970-01-02T00:00:00', 'yesterday', '', '1970-01-01T00:01:00'])
+    assert seconds.tolist() == [86400, NAT, NAT, 60]
+
+
+def test_stats_skip_unparseable_dates():
+    stats = ChatStats.from_data({'messages': [
+        {'id': 1, 'type': 'message', 'date': '2024-01-01T10:00:00', 'from': 'Alice', 'text': 'hi'},
+        {'id': 2, 'type': 'message', 'date': 'yesterday', 'from': 'Bob', 'text': 'hello'},
+    ]})
+    stats.flush()
+    assert stats.hours == {10: 1}
+    assert list(stats.user_activity) == ['Alice']
+
+
+def test_first_seen_counts_keeps_counter_order():
+    keys = np.array([5, 3, 5, 9, 3, 3, 1])
+    counter = Counter()
+    count_into(counter, keys)
+    assert list(counter.items()) == list(Counter(keys.tolist()).items())
+    values, counts = first_seen_counts(keys[:0])
+    assert values.size == 0 and counts.size == 0
+
+
+def test_grouped_first_seen_counts():
+    groups = np.array([1, 0, 1, 1, 2, 0])
+    keys = np.array([23, 4, 23, 0, 4, 4])
+    expected = Counter(zip(groups.tolist(), keys.tolist()))
+    result = grouped_first_seen_counts(groups, keys)
+    assert list(zip(*(array.tolist() for array in result))) == [(g, k, c) for (g, k), c in expected.items()]
@@ -0,0 +1,47 @@
+import copy
+
+import pytest
+
+from analyzer import tools
+from analyzer.stats import ChatStats, chat_stats
+from tests import baseline_tools
+from tests.exports import ANALYSES, analyses
+
+
+@pytest.mark.parametrize('name', ANALYSES)
+def test_matches_baseline(export, name):
+    expected = getattr(baseline_tools, name)(copy.deepcopy(export))
+    assert getattr(tools, name)(copy.deepcopy(export)) == expected
+
+
+@pytest.mark.parametrize('name', ANALYSES)
+def test_empty_export_matches_baseline(name):
+    if name in ('get_oldest_message', 'get_latest_message'):
+        pytest.skip('the baseline cannot parse its placeholder date')
+    data = {'name': 'Empty', 'type': 'personal_chat', 'id': 1, 'messages': []}
+    assert getattr(tools, name)(copy.deepcopy(data)) == getattr(baseline_tools, name)(copy.deepcopy(data))
+
+
+def test_load_json_matches_baseline(export_file):
+    assert tools.load_json(export_file) == baseline_tools.load_json(export_file)
+
+
+def test_load_json_invalid(tmp_path):
+    path = tmp_path / 'broken.json'
+    path.write_text('{"messages": [', encoding='utf-8')
+    assert tools.load_json(str(path)) is None
+    assert tools.load_json(str(tmp_path / 'missing.json')) is None
+
+
+def test_changed_export_is_analyzed_again(export):
+    data = copy.deepcopy(export)
+    before = tools.count_forwarded_messages(data)
+    data['messages'].append({'id': 9999, 'type': 'message', 'date': '2024-04-01T00:00:00',
+                             'from': 'Member 1', 'forwarded_from': 'Channel 1', 'text': 'again'})
+    assert tools.count_forwarded_messages(data) == before + 1
+
+
+def test_chat_stats_reuses_stats(export):
+    stats = ChatStats.from_data(export)
+    assert chat_stats(stats) is stats
+    assert analyses(stats) == analyses(copy.deepcopy(export))
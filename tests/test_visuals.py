@@ -0,0 +1,89 @@
+import copy
+import importlib
+import inspect
+import os
+import pkgutil
+import subprocess
+import sys
+import threading
+from io import BytesIO
+
+import matplotlib
+import pytest
+
+matplotlib.use('Agg')
+
+import analyzer.visuals
+from analyzer.stats import ChatStats
+from analyzer.visuals.engine import ranked_palette
+from tests.exports import make_export
+
+PNG_SIGNATURE = b'\x89PNG\r\n\x1a\n'
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def chart_functions() -> list:
+    charts = []
+    for module_info in pkgutil.iter_modules(analyzer.visuals.__path__):
+        module = importlib.import_module(f'analyzer.visuals.{module_info.name}')
+        for name, fn in inspect.getmembers(module, inspect.isfunction):
+            if fn.__module__ == module.__name__ and name.startswith('visualize'):
+                charts.append(pytest.param(fn, id=f'{module_info.name}.{name}'))
+    return charts
+
+
+@pytest.fixture(scope='module')
+def stats(export) -> ChatStats:
+    return ChatStats.from_data(export)
+
+
+@pytest.mark.parametrize('chart', chart_functions())
+def test_renders_png_buffer(chart, stats, export):
+    from matplotlib import pyplot as plt
+
+    png = chart(stats)
+    assert png.tell() == 0
+    assert png.getvalue().startswith(PNG_SIGNATURE)
+    assert chart(copy.deepcopy(export)).getvalue().startswith(PNG_SIGNATURE)
+    assert not plt.get_fignums()
+
+
+@pytest.mark.parametrize('chart', chart_functions())
+def test_reuses_buffer(chart, stats):
+    buffer = BytesIO(b'stale content' * 1000)
+    assert chart(stats, buffer=buffer) is buffer
+    assert buffer.getvalue().startswith(PNG_SIGNATURE)
+
+
+def render_on_new_thread(chart, data) -> bytes:
+    # Templates are per thread, so a new thread draws on fresh figures.
+    result = []
+    thread = threading.Thread(target=lambda: result.append(chart(data).getvalue()))
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+def test_templates_do_not_leak_between_charts(stats):
+    other = ChatStats.from_data(make_export(200, seed=3))
+    charts = [param.values[0] for param in chart_functions()]
+    for chart in charts:
+        chart(other)
+    for chart in reversed(charts):
+        assert chart(stats).getvalue() == render_on_new_thread(chart, stats), chart.__name__
+
+
+@pytest.mark.parametrize('count', [1, 6, 10])
+def test_ranked_palette_matches_seaborn(count):
+    seaborn = pytest.importorskip('seaborn')
+    expected = [seaborn.desaturate(color, 0.75) for color in seaborn.color_palette('viridis', count)]
+    assert ranked_palette(count) == pytest.approx(expected)
+
+
+def test_charts_do_not_load_seaborn():
+    code = ("import sys, matplotlib; matplotlib.use('Agg'); from analyzer.cli import chart_functions; "
+            "from tests.exports import make_export; from analyzer.stats import ChatStats; "
+            "stats = ChatStats.from_data(make_export(300)); [render(stats) for _, render in chart_functions()]; "
+            "print('seaborn' in sys.modules)")
+    result = subprocess.run([sys.executable, '-c', code], cwd=ROOT, capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == 'False'